@@ -44,7 +44,7 @@ default = {
             ],
             'initialize': {},
             'on_start': [
-                ('resolve_dns_bootstrap_addresses', )
+                ('resolve_dns_bootstrap_addresses', u"bootstrap_dns.json")
             ]
         },
         {
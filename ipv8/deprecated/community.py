@@ -7,8 +7,6 @@ Community instance.
 @organization: Technical University Delft
 @contact: dispersy@frayja.com
 """
-from random import choice
-from socket import error, gethostbyname
 import sys
 from time import time
 from traceback import format_exception
@@ -16,6 +14,9 @@ from traceback import format_exception
 from ..keyvault.crypto import ECCrypto
 from ..overlay import Overlay
 from ..peer import Peer
+from ..peerdiscovery.bootstrap import BootstrapCoordinator, BootstrapResolver
+from ..peerdiscovery.latency import lowest_latency, PendingRequests
+from ..peerdiscovery.puncture import PunctureCache
 from .payload import IntroductionRequestPayload, IntroductionResponsePayload, PuncturePayload, PunctureRequestPayload
 from .payload_headers import BinMemberAuthenticationPayload, GlobalTimeDistributionPayload
 
@@ -44,6 +45,13 @@ _DNS_ADDRESSES = [
 
 
 BOOTSTRAP_TIMEOUT = 30.0 # Timeout before we bootstrap again (bootstrap kills performance)
+MULTI_INTRODUCTION_PEERS = 20 # Ask for extra introductions while we have fewer peers than this
+
+
+# Shared by all overlays, so they learn which trackers respond from each other
+_BOOTSTRAP_COORDINATOR = BootstrapCoordinator(BOOTSTRAP_TIMEOUT)
+# Shared by all overlays, so the bootstrap servers are only resolved once per TTL
+_BOOTSTRAP_RESOLVER = BootstrapResolver()
 
 
 class PacketDecodingError(RuntimeError):
@@ -104,6 +112,10 @@ class Community(EZPackOverlay):
 
     version = '\x02'
     master_peer = ""
+    # Whether our introduction requests ask for the version of the services of the responder
+    versioned_services = False
+    # The number of introductions (1 to 4) our introduction requests ask for, while we have few peers
+    max_introductions = 4
 
     def __init__(self, my_peer, endpoint, network):
         super(Community, self).__init__(self.master_peer, my_peer, endpoint, network)
@@ -111,10 +123,14 @@ class Community(EZPackOverlay):
         self._prefix = '\x00' + self.version + self.master_peer.key.key_to_hash()
         self.logger.debug("Launching %s with prefix %s.", self.__class__.__name__, self._prefix.encode('hex'))
         self.network.register_service_provider(self.master_peer.mid, self)
-        self.network.blacklist_mids.append(my_peer.mid)
-        self.network.blacklist.extend(_DEFAULT_ADDRESSES)
+        self.network.blacklist_mids.add(my_peer.mid)
+        self.network.blacklist.update(_DEFAULT_ADDRESSES)
 
-        self.last_bootstrap = 0
+        self.bootstrap_coordinator = _BOOTSTRAP_COORDINATOR
+        # The introduction requests (and other requests) awaiting a response, to measure round-trip times
+        self.pending_requests = PendingRequests()
+        # The NAT mappings we opened ((our lan, their address) pairs) and introduced (introduced, walker) pairs
+        self.punctures = PunctureCache()
 
         self.decode_map = {
             chr(250): self.on_puncture_request,
@@ -166,19 +182,29 @@ class Community(EZPackOverlay):
                             self.deprecated_message_names[data[22]], *source_address)
 
     def bootstrap(self):
-        if time() - self.last_bootstrap < BOOTSTRAP_TIMEOUT:
+        trackers = self.bootstrap_coordinator.request_bootstrap(self, _DEFAULT_ADDRESSES)
+        if not trackers:
             return
         self.logger.debug("Bootstrapping %s, current peers %d", self.__class__.__name__, len(self.get_peers()))
-        self.last_bootstrap = time()
-        for socket_address in _DEFAULT_ADDRESSES:
+        for socket_address in trackers:
             self.walk_to(socket_address)
 
-    def resolve_dns_bootstrap_addresses(self):
-        for (address, port) in _DNS_ADDRESSES:
-            try:
-                _DEFAULT_ADDRESSES.append((gethostbyname(address), port))
-            except error:
-                self.logger.info("Unable to resolve (%s, %d)", address, port)
+    def resolve_dns_bootstrap_addresses(self, cache_path=None):
+        """
+        Resolve the DNS bootstrap addresses in the background and add them to the default addresses.
+
+        :param cache_path: the file to cache the resolved addresses in, if any
+        :return: a Deferred firing with the resolved addresses
+        """
+        def on_resolved(addresses):
+            for address in addresses:
+                if address not in _DEFAULT_ADDRESSES:
+                    _DEFAULT_ADDRESSES.append(address)
+            self.network.blacklist.update(addresses)
+            return addresses
+        if cache_path:
+            _BOOTSTRAP_RESOLVER.set_cache_path(cache_path)
+        return _BOOTSTRAP_RESOLVER.resolve(_DNS_ADDRESSES).addCallback(on_resolved)
 
     def create_introduction_request(self, socket_address):
         global_time = self.claim_global_time()
@@ -188,27 +214,64 @@ class Community(EZPackOverlay):
                                              True,
                                              u"unknown",
                                              False,
-                                             global_time).to_pack_list()
+                                             global_time,
+                                             self.versioned_services,
+                                             self.get_extra_introductions()).to_pack_list()
         auth = BinMemberAuthenticationPayload(self.my_peer.public_key.key_to_bin()).to_pack_list()
         dist = GlobalTimeDistributionPayload(global_time).to_pack_list()
 
         return self._ez_pack(self._prefix, 246, [auth, dist, payload])
 
-    def create_introduction_response(self, lan_socket_address, socket_address, identifier, introduction=None):
+    def get_extra_introductions(self):
+        """
+        Get the number of introductions to ask for on top of the regular one.
+
+        Extra introductions are only requested while we have few peers, so we converge faster after starting.
+        """
+        if self.max_introductions <= 1 or len(self.get_peers()) >= MULTI_INTRODUCTION_PEERS:
+            return 0
+        return self.max_introductions - 1
+
+    def _introduce(self, introduction, lan_socket_address, socket_address, identifier):
+        """
+        Ask an introduced peer to puncture the NAT towards the peer we introduce it to.
+
+        :return: the (lan, wan) introduction addresses of the introduced peer
+        """
+        introduction_lan = ("0.0.0.0", 0)
+        if self.address_is_lan(introduction.address[0]):
+            introduction_lan = introduction.address
+            introduction_wan = (self.my_estimated_wan[0], introduction_lan[1])
+        else:
+            introduction_wan = introduction.address
+        # Don't introduce the same peers to each other again, while their mappings should still be alive
+        pair = (introduction.address, socket_address)
+        if not self.punctures.is_alive(pair):
+            self.punctures.punctured(pair)
+            packet = self.create_puncture_request(lan_socket_address, socket_address, identifier)
+            self.endpoint.send(introduction_wan if introduction_lan == ("0.0.0.0", 0) else introduction_lan, packet)
+        return introduction_lan, introduction_wan
+
+    def create_introduction_response(self, lan_socket_address, socket_address, identifier, introduction=None,
+                                     service_version=None, extra_introductions=0):
         global_time = self.claim_global_time()
         introduction_lan = ("0.0.0.0",0)
         introduction_wan = ("0.0.0.0",0)
-        introduced = False
         other = self.network.get_verified_by_address(socket_address)
         if not introduction:
             introduction = self.get_peer_for_introduction(exclude=other)
+        extra_addresses = []
         if introduction:
-            if self.address_is_lan(introduction.address[0]):
-                introduction_lan = introduction.address
-                introduction_wan = (self.my_estimated_wan[0], introduction_lan[1])
-            else:
-                introduction_wan = introduction.address
-            introduced = True
+            introduction_lan, introduction_wan = self._introduce(introduction, lan_socket_address, socket_address,
+                                                                 identifier)
+            # Extra introductions are drawn uniformly, distinct from the regular introduction
+            introduced = [other, introduction]
+            for _ in xrange(extra_introductions):
+                extra = self.network.get_random_peer_for_service(self.master_peer.mid, introduced)
+                if extra is None:
+                    break
+                introduced.append(extra)
+                extra_addresses.append(self._introduce(extra, lan_socket_address, socket_address, identifier))
         payload = IntroductionResponsePayload(socket_address,
                                               self.my_estimated_lan,
                                               self.my_estimated_wan,
@@ -216,14 +279,12 @@ class Community(EZPackOverlay):
                                               introduction_wan,
                                               u"unknown",
                                               False,
-                                              identifier).to_pack_list()
+                                              identifier,
+                                              service_version,
+                                              extra_addresses).to_pack_list()
         auth = BinMemberAuthenticationPayload(self.my_peer.public_key.key_to_bin()).to_pack_list()
         dist = GlobalTimeDistributionPayload(global_time).to_pack_list()
 
-        if introduced:
-            packet = self.create_puncture_request(lan_socket_address, socket_address, identifier)
-            self.endpoint.send(introduction_wan if introduction_lan == ("0.0.0.0",0) else introduction_lan, packet)
-
         return self._ez_pack(self._prefix, 245, [auth, dist, payload])
 
     def create_puncture(self, lan_walker, wan_walker, identifier):
@@ -248,24 +309,39 @@ class Community(EZPackOverlay):
         self.network.add_verified_peer(peer)
         self.network.discover_services(peer, [self.master_peer.mid, ])
 
-        packet = self.create_introduction_response(payload.destination_address, source_address, payload.identifier)
+        packet = self.create_introduction_response(payload.destination_address, source_address, payload.identifier,
+                                                   extra_introductions=payload.extra_introductions)
         self.endpoint.send(source_address, packet)
 
     def on_introduction_response(self, source_address, data):
         auth, dist, payload = self._ez_unpack_auth(IntroductionResponsePayload, data)
 
         self.my_estimated_wan = payload.destination_address
+        self.bootstrap_coordinator.on_response(self, source_address)
 
         peer = Peer(auth.public_key_bin, source_address)
         self.network.add_verified_peer(peer)
         self.network.discover_services(peer, [self.master_peer.mid, ])
-        if (payload.wan_introduction_address != ("0.0.0.0", 0)) and\
-                (payload.wan_introduction_address[0] != self.my_estimated_wan[0]):
-            self.network.discover_address(Peer(auth.public_key_bin, source_address),
-                                          payload.wan_introduction_address)
-        elif (payload.lan_introduction_address != ("0.0.0.0", 0)):
-            self.network.discover_address(Peer(auth.public_key_bin, source_address),
-                                          payload.lan_introduction_address)
+        self.measure_rtt(source_address, payload.identifier)
+        introductions = [(payload.lan_introduction_address, payload.wan_introduction_address)]
+        for lan_introduction_address, wan_introduction_address in introductions + payload.extra_introductions:
+            if (wan_introduction_address != ("0.0.0.0", 0)) and\
+                    (wan_introduction_address[0] != self.my_estimated_wan[0]):
+                self.network.discover_address(peer, wan_introduction_address)
+            elif (lan_introduction_address != ("0.0.0.0", 0)):
+                self.network.discover_address(peer, lan_introduction_address)
+
+        self.introduction_response_callback(peer, dist, payload)
+
+    def introduction_response_callback(self, peer, dist, payload):
+        """
+        Process an introduction response, after the responding peer has been added to the network.
+
+        :param peer: the Peer which responded
+        :param dist: the GlobalTimeDistributionPayload of the response
+        :param payload: the IntroductionResponsePayload of the response
+        """
+        pass
 
     def on_puncture(self, source_address, data):
         auth, dist, payload = self._ez_unpack_auth(PuncturePayload, data)
@@ -281,6 +357,11 @@ class Community(EZPackOverlay):
         if payload.wan_walker_address[0] == self.my_estimated_wan[0]:
             target = payload.lan_walker_address
 
+        pair = (self.my_estimated_lan, target)
+        if self.punctures.is_alive(pair):
+            # Our NAT still lets the walker through
+            return
+        self.punctures.punctured(pair)
         packet = self.create_puncture(self.my_estimated_lan, payload.wan_walker_address, payload.identifier)
         self.endpoint.send(target, packet)
 
@@ -291,6 +372,7 @@ class Community(EZPackOverlay):
             probable_peer.last_response = time()
         if self._prefix != data[:22]:
             return
+        self.punctures.seen((self.my_estimated_lan, source_address))
         if data[22] in self.decode_map:
             try:
                 self.decode_map[data[22]](source_address, data)
@@ -300,9 +382,39 @@ class Community(EZPackOverlay):
         elif warn_unknown:
             self.logger.warning("Received unknown message: %s from (%s, %d)", ord(data[22]), *source_address)
 
+    def measure_rtt(self, source_address, identifier):
+        """
+        Update the round-trip time of a verified peer, if a response matches one of our requests.
+
+        :param source_address: the address the response was received from
+        :param identifier: the identifier echoed by the response
+        """
+        rtt = self.pending_requests.pop(source_address, identifier)
+        if rtt is not None:
+            peer = self.network.get_verified_by_address(source_address)
+            if peer:
+                peer.update_rtt(rtt)
+
+    def _send_request(self, address, packet):
+        """
+        Send a request which was just created, so its response can be matched by its identifier (the global time).
+        """
+        self.pending_requests.add(address, self.global_time % 65536)
+        self.punctures.punctured((self.my_estimated_lan, address))
+        self.endpoint.send(address, packet)
+
+    def get_keep_alive_time(self, address):
+        """
+        Get the time we should send traffic to an address, to keep the NAT mapping towards it alive.
+
+        :param address: the (ip, port) address of the peer
+        :return: the time or None if we never exchanged traffic with this address
+        """
+        return self.punctures.get_keep_alive_time((self.my_estimated_lan, address))
+
     def walk_to(self, address):
         packet = self.create_introduction_request(address)
-        self.endpoint.send(address, packet)
+        self._send_request(address, packet)
 
     def send_introduction_request(self, peer, service_id=None):
         """
@@ -313,16 +425,16 @@ class Community(EZPackOverlay):
         if service_id:
             packet = packet[:2] + service_id + packet[22:]
 
-        self.endpoint.send(peer.address, packet)
+        self._send_request(peer.address, packet)
 
     def get_new_introduction(self, from_peer=None, service_id=None):
         """
         Get a new introduction, or bootstrap if there are no available peers.
         """
         if not from_peer:
-            available = self.get_peers()
+            available = self.network.get_random_peer_for_service(self.master_peer.mid)
             if available:
-                from_peer = choice(available).address
+                from_peer = available.address
             else:
                 self.bootstrap()
                 return
@@ -332,14 +444,17 @@ class Community(EZPackOverlay):
         if service_id:
             packet = packet[:2] + service_id + packet[22:]
 
-        self.endpoint.send(from_peer, packet)
+        self._send_request(from_peer, packet)
 
     def get_peer_for_introduction(self, exclude=None):
         """
-        Return a random peer to send an introduction request to.
+        Return a random peer to introduce, preferring the lower latency peer out of two random peers.
         """
-        available = [p for p in self.get_peers() if p != exclude]
-        return choice(available) if available else None
+        first = self.network.get_random_peer_for_service(self.master_peer.mid, (exclude, ))
+        if first is None:
+            return None
+        return lowest_latency([first, self.network.get_random_peer_for_service(self.master_peer.mid,
+                                                                                (exclude, first))])
 
     def get_peers(self):
-        return self.network.get_peers_for_service(self.master_peer.key.key_to_hash())
+        return self.network.get_peers_for_service(self.master_peer.mid)
@@ -41,7 +41,7 @@ class IntroductionRequestPayload(Payload):
     optional_format_list = ['QQHHBH', 'raw']
 
     def __init__(self, destination_address, source_lan_address, source_wan_address, advice, connection_type,
-                 sync, identifier):
+                 sync, identifier, supports_service_version=False, extra_introductions=0):
         """
         Create the payload for an introduction-request message.
 
@@ -78,6 +78,12 @@ class IntroductionRequestPayload(Payload):
 
         IDENTIFIER is a number that must be given in the associated introduction-response.  This
         number allows to distinguish between multiple introduction-response messages.
+
+        SUPPORTS_SERVICE_VERSION is a boolean value, stored in the first reserved flag.  When True the
+        receiver may add the version of its services to the introduction-response.
+
+        EXTRA_INTRODUCTIONS is the number (0 to 3) of introductions the receiver may add to the
+        introduction-response, on top of the regular one.  It is stored in the other two reserved flags.
         """
         super(IntroductionRequestPayload, self).__init__()
         self._destination_address = destination_address
@@ -86,6 +92,8 @@ class IntroductionRequestPayload(Payload):
         self._advice = advice
         self._connection_type = connection_type
         self._identifier = identifier % 65536
+        self._supports_service_version = supports_service_version
+        self._extra_introductions = max(0, min(3, extra_introductions))
         if sync:
             self._time_low, self._time_high, self._modulo, self._offset, self._bloom_filter = sync
         else:
@@ -96,7 +104,9 @@ class IntroductionRequestPayload(Payload):
         data = [('4SH', inet_aton(self._destination_address[0]), self._destination_address[1]),
                 ('4SH', inet_aton(self._source_lan_address[0]), self._source_lan_address[1]),
                 ('4SH', inet_aton(self._source_wan_address[0]), self._source_wan_address[1]),
-                ('bits', encoded_connection_type[0], encoded_connection_type[1], 0, 0, 0, 0, self.sync, self._advice),
+                ('bits', encoded_connection_type[0], encoded_connection_type[1],
+                 int(self._supports_service_version), self._extra_introductions >> 1, self._extra_introductions & 1,
+                 0, self.sync, self._advice),
                 ('H', self._identifier)]
 
         # add optional sync
@@ -127,6 +137,8 @@ class IntroductionRequestPayload(Payload):
             args.append(None)
 
         args.append(identifier)
+        args.append(bool(dflag0))
+        args.append(dflag1 * 2 + dflag2)
 
         return IntroductionRequestPayload(*args)
 
@@ -182,12 +194,21 @@ class IntroductionRequestPayload(Payload):
     def identifier(self):
         return self._identifier
 
+    @property
+    def supports_service_version(self):
+        return self._supports_service_version
+
+    @property
+    def extra_introductions(self):
+        return self._extra_introductions
+
 
 class IntroductionResponsePayload(Payload):
 
     format_list = ['4SH', '4SH', '4SH', '4SH', '4SH', 'bits', 'H']
+    optional_format_list = ['I', 'raw']
 
-    def __init__(self, destination_address, source_lan_address, source_wan_address, lan_introduction_address, wan_introduction_address, connection_type, tunnel, identifier):
+    def __init__(self, destination_address, source_lan_address, source_wan_address, lan_introduction_address, wan_introduction_address, connection_type, tunnel, identifier, service_version=None, extra_introductions=()):
         """
         Create the payload for an introduction-response message.
 
@@ -218,6 +239,13 @@ class IntroductionResponsePayload(Payload):
         IDENTIFIER is a number that was given in the associated introduction-request.  This
         number allows to distinguish between multiple introduction-response messages.
 
+        SERVICE_VERSION is an optional (non-zero) number which changes whenever the services of the
+        sender change.  It is only included when the associated request supports it.
+
+        EXTRA_INTRODUCTIONS is an optional list of (LAN_INTRODUCTION_ADDRESS, WAN_INTRODUCTION_ADDRESS)
+        tuples of additional introduced nodes, when the associated request asked for them.  When
+        these are included, the SERVICE_VERSION is always included as well, 0 meaning no version.
+
         When the associated request wanted advice the sender will also sent a puncture-request
         message to either the lan_introduction_address or the wan_introduction_address
         (depending on their positions).  The introduced node must sent a puncture message to the
@@ -232,6 +260,8 @@ class IntroductionResponsePayload(Payload):
         self._connection_type = connection_type
         self._tunnel = tunnel
         self._identifier = identifier % 65536
+        self._service_version = service_version
+        self._extra_introductions = list(extra_introductions)
 
     def to_pack_list(self):
         encoded_connection_type = encode_connection_type(self._connection_type)
@@ -243,13 +273,21 @@ class IntroductionResponsePayload(Payload):
                 ('bits', encoded_connection_type[0], encoded_connection_type[1], 0, 0, 0, 0, 0, 0),
                 ('H', self._identifier)]
 
+        # add optional service version and extra introductions, 0 is reserved for no service version
+        if self._service_version is not None or self._extra_introductions:
+            data.append(('I', self._service_version or 0))
+        if self._extra_introductions:
+            data.append(('raw', "".join(inet_aton(lan[0]) + struct.pack(">H", lan[1]) +
+                                        inet_aton(wan[0]) + struct.pack(">H", wan[1])
+                                        for lan, wan in self._extra_introductions)))
+
         return data
 
     @classmethod
     def from_unpack_list(cls, destination_address, source_lan_address, source_wan_address,
                          introduction_lan_address, introduction_wan_address,
                          connection_type_0, connection_type_1, dflag0, dflag1, dflag2, dflag3, dflag4, dflag5,
-                         identifier):
+                         identifier, service_version=None, extra_introductions=None):
         args = [(inet_ntoa(destination_address[0]), destination_address[1]),
                 (inet_ntoa(source_lan_address[0]), source_lan_address[1]),
                 (inet_ntoa(source_wan_address[0]), source_wan_address[1]),
@@ -257,7 +295,15 @@ class IntroductionResponsePayload(Payload):
                 (inet_ntoa(introduction_wan_address[0]), introduction_wan_address[1]),
                 decode_connection_type(connection_type_0, connection_type_1),
                 False,
-                identifier]
+                identifier,
+                service_version or None]
+
+        if extra_introductions:
+            args.append([((inet_ntoa(extra_introductions[i:i + 4]),
+                           struct.unpack(">H", extra_introductions[i + 4:i + 6])[0]),
+                          (inet_ntoa(extra_introductions[i + 6:i + 10]),
+                           struct.unpack(">H", extra_introductions[i + 10:i + 12])[0]))
+                         for i in range(0, len(extra_introductions) - 11, 12)])
 
         return IntroductionResponsePayload(*args)
 
@@ -293,6 +339,14 @@ class IntroductionResponsePayload(Payload):
     def identifier(self):
         return self._identifier
 
+    @property
+    def service_version(self):
+        return self._service_version
+
+    @property
+    def extra_introductions(self):
+        return self._extra_introductions
+
 
 class PunctureRequestPayload(Payload):
 
@@ -1,4 +1,6 @@
+from collections import OrderedDict
 import logging
+from threading import Lock
 
 from cryptography.hazmat.primitives.asymmetric import ec
 
@@ -18,6 +20,11 @@ _CURVES = {u"very-low": (ec.SECT163K1, "M2Crypto"),
 
 logger = logging.getLogger(__name__)
 
+# The most recently used parsed public keys by their binary format, shared between all ECCrypto instances
+PUBLIC_KEY_CACHE_SIZE = 4096
+_public_key_cache = OrderedDict()
+_public_key_cache_lock = Lock()
+
 
 class ECCrypto(object):
     """
@@ -100,10 +107,21 @@ class ECCrypto(object):
         return M2CryptoSK(keystring=string)
 
     def key_from_public_bin(self, string):
-        "Get the EC from a public key in binary format."
+        "Get the EC from a public key in binary format, parsed keys are cached and shared."
+        with _public_key_cache_lock:
+            key = _public_key_cache.pop(string, None)
+            if key is not None:
+                _public_key_cache[string] = key
+                return key
         if string.startswith("LibNaCLPK:"):
-            return LibNaCLPK(string[10:])
-        return M2CryptoPK(keystring=string)
+            key = LibNaCLPK(string[10:])
+        else:
+            key = M2CryptoPK(keystring=string)
+        with _public_key_cache_lock:
+            _public_key_cache[string] = key
+            while len(_public_key_cache) > PUBLIC_KEY_CACHE_SIZE:
+                _public_key_cache.popitem(last=False)
+        return key
 
     def get_signature_length(self, ec):
         """
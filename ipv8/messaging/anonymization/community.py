@@ -17,6 +17,7 @@ from ...deprecated.payload_headers import BinMemberAuthenticationPayload, Global
 from ...messaging.deprecated.encoding import encode, decode
 from .payload import *
 from ...peer import Peer
+from ...peerdiscovery.latency import lowest_latency
 from ...requestcache import RequestCache
 from .tunnel import *
 from .tunnelcrypto import CryptoException, TunnelCrypto
@@ -305,8 +306,10 @@ class TunnelCommunity(Community):
         else:
             self.logger.info("Look for a first hop that is not an exit node and is not used before")
             first_hops = set([c.sock_addr for c in self.circuits.values()])
-            first_hop = next((c for c in self.compatible_candidates
-                              if c.address not in first_hops and c.address != required_exit.address), None)
+            eligible = [c for c in self.compatible_candidates
+                        if c.address not in first_hops and c.address != required_exit.address]
+            # Prefer the lower latency candidate out of two random candidates
+            first_hop = lowest_latency(random.sample(eligible, min(2, len(eligible))))
 
         if not first_hop:
             self.logger.info("Could not create circuit, no first hop available")
@@ -728,10 +731,12 @@ class TunnelCommunity(Community):
         auth, dist, payload = self._ez_unpack_auth(TunnelIntroductionResponsePayload, data)
 
         self.my_estimated_wan = payload.destination_address
+        self.bootstrap_coordinator.on_response(self, source_address)
 
         peer = Peer(auth.public_key_bin, source_address)
         self.network.add_verified_peer(peer)
         self.network.discover_services(peer, [self.master_peer.mid, ])
+        self.measure_rtt(source_address, payload.identifier)
         if (payload.wan_introduction_address != ("0.0.0.0", 0)) and \
                 (payload.wan_introduction_address[0] != self.my_estimated_wan[0]):
             self.network.discover_address(Peer(auth.public_key_bin, source_address),
@@ -747,16 +752,11 @@ class TunnelCommunity(Community):
         global_time = self.claim_global_time()
         introduction_lan = ("0.0.0.0", 0)
         introduction_wan = ("0.0.0.0", 0)
-        introduced = False
         other = self.network.get_verified_by_address(socket_address)
         introduction = self.get_peer_for_introduction(exclude=other)
         if introduction:
-            if self.address_is_lan(introduction.address[0]):
-                introduction_lan = introduction.address
-                introduction_wan = (self.my_estimated_wan[0], introduction_lan[1])
-            else:
-                introduction_wan = introduction.address
-            introduced = True
+            introduction_lan, introduction_wan = self._introduce(introduction, lan_socket_address, socket_address,
+                                                                 identifier)
         payload = TunnelIntroductionResponsePayload(socket_address,
                                                     self.my_estimated_lan,
                                                     self.my_estimated_wan,
@@ -769,10 +769,6 @@ class TunnelCommunity(Community):
         auth = BinMemberAuthenticationPayload(self.my_peer.public_key.key_to_bin()).to_pack_list()
         dist = GlobalTimeDistributionPayload(global_time).to_pack_list()
 
-        if introduced:
-            packet = self.create_puncture_request(lan_socket_address, socket_address, identifier)
-            self.endpoint.send(introduction_wan if introduction_lan == ("0.0.0.0", 0) else introduction_lan, packet)
-
         return self._ez_pack(self._prefix, 245, [auth, dist, payload])
 
     def on_cell(self, source_address, data):
@@ -127,6 +127,7 @@ class TunnelIntroductionRequestPayload(IntroductionRequestPayload):
 class TunnelIntroductionResponsePayload(IntroductionResponsePayload):
 
     format_list = ['?', ] + IntroductionResponsePayload.format_list
+    optional_format_list = []
 
     def __init__(self, destination_address, source_lan_address, source_wan_address,
                  lan_introduction_address, wan_introduction_address, connection_type,
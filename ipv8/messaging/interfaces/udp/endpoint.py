@@ -1,9 +1,10 @@
 import errno
-from collections import deque
+from collections import deque, OrderedDict
 import socket
 import sys
 
 from twisted.internet import protocol, reactor, error
+from twisted.internet.defer import DeferredList, maybeDeferred
 from twisted.internet.error import MessageLengthError
 
 from ..endpoint import Endpoint, EndpointClosedException
@@ -82,3 +83,121 @@ class UDPEndpoint(Endpoint, protocol.DatagramProtocol):
         Check if the underlying socket is open.
         """
         return self._listening_port and self._running
+
+
+class _BoundUDPEndpoint(UDPEndpoint):
+    """
+    A single socket of a MultiUDPEndpoint, which forwards everything it receives to its parent.
+    """
+
+    def __init__(self, parent, port, ip="0.0.0.0"):
+        UDPEndpoint.__init__(self, port, ip)
+        self.parent = parent
+
+    def datagramReceived(self, datagram, addr):
+        self.parent.on_datagram(self, datagram, addr)
+
+
+class MultiUDPEndpoint(Endpoint):
+    """
+    A single logical endpoint which listens on multiple (ip, port) sockets at once.
+
+    Outbound packets are sent over the socket a destination last reached us on. If we have never heard from a
+    destination, the socket is selected by hashing the destination address. When there are too many destinations,
+    the least recently used route is forgotten.
+    """
+
+    def __init__(self, interfaces, max_routes=10000):
+        """
+        Create a new MultiUDPEndpoint.
+
+        :param interfaces: a list of (ip, port) tuples to bind to
+        :param max_routes: the maximum amount of remembered destination to socket mappings
+        """
+        Endpoint.__init__(self)
+        if not interfaces:
+            raise ValueError("A MultiUDPEndpoint requires at least one interface")
+        self._endpoints = [_BoundUDPEndpoint(self, port, ip) for ip, port in interfaces]
+        # Map of destination to socket, least recently used first
+        self._routes = OrderedDict()
+        self.max_routes = max_routes
+
+    @property
+    def _port(self):
+        return self._endpoints[0]._port
+
+    @property
+    def endpoints(self):
+        """
+        The underlying sockets of this endpoint.
+        """
+        return self._endpoints[:]
+
+    def on_datagram(self, endpoint, datagram, addr):
+        """
+        Callback for when one of our sockets receives a datagram.
+
+        :param endpoint: the socket the datagram was received on
+        :param datagram: the received data
+        :param addr: the (IP, port) tuple of the sender
+        """
+        if self._routes.pop(addr, None) is None and len(self._routes) >= self.max_routes:
+            self._routes.popitem(last=False)
+        self._routes[addr] = endpoint
+        self.notify_listeners((addr, datagram))
+
+    def get_route(self, socket_address):
+        """
+        Get the socket to use to send to a given address.
+
+        :param socket_address: Tuple of (IP, port) which indicates the destination of the packet.
+        :return: the UDPEndpoint to send the packet with
+        """
+        endpoint = self._routes.pop(socket_address, None)
+        if endpoint and endpoint.is_open():
+            self._routes[socket_address] = endpoint
+            return endpoint
+        open_endpoints = [endpoint for endpoint in self._endpoints if endpoint.is_open()]
+        if not open_endpoints:
+            raise EndpointClosedException(self)
+        return open_endpoints[hash(socket_address) % len(open_endpoints)]
+
+    def send(self, socket_address, packet):
+        """
+        Send a packet to a given address.
+        :param socket_address: Tuple of (IP, port) which indicates the destination of the packet.
+        :param packet: The packet to send.
+        """
+        self.assert_open()
+        self.get_route(socket_address).send(socket_address, packet)
+
+    def open(self):
+        for endpoint in self._endpoints:
+            endpoint.open()
+        return True
+
+    def assert_open(self):
+        if not self.is_open():
+            raise EndpointClosedException(self)
+
+    def close(self):
+        self._routes.clear()
+        return DeferredList([maybeDeferred(endpoint.close) for endpoint in self._endpoints if endpoint.is_open()])
+
+    def get_address(self):
+        """
+        Get the address for this Endpoint, this is the address of the first socket.
+        """
+        return self._endpoints[0].get_address()
+
+    def get_addresses(self):
+        """
+        Get the addresses of all open sockets of this Endpoint.
+        """
+        return [endpoint.get_address() for endpoint in self._endpoints if endpoint.is_open()]
+
+    def is_open(self):
+        """
+        Check if at least one of the underlying sockets is open.
+        """
+        return any(endpoint.is_open() for endpoint in self._endpoints)
@@ -0,0 +1,215 @@
+from collections import deque
+from socket import inet_aton, inet_ntoa
+from struct import Struct
+
+from twisted.internet import protocol, reactor
+from twisted.internet.defer import maybeDeferred, succeed
+
+from ..endpoint import Endpoint, EndpointClosedException, EndpointListener
+
+# Every frame consists of: the remote IPv4 address, the remote port and the length of the packet
+FRAME_HEADER = Struct(">4sHI")
+# The maximum length of the packet in a frame, connections sending larger frames are dropped
+MAX_FRAME_SIZE = 2 ** 20
+
+
+def encode_frame(socket_address, packet):
+    """
+    Serialize a packet and its remote (IP, port) address into a length-prefixed frame.
+
+    :param socket_address: the remote (IP, port) tuple of this packet
+    :param packet: the packet to serialize
+    :return: the frame (str)
+    """
+    return FRAME_HEADER.pack(inet_aton(socket_address[0]), socket_address[1], len(packet)) + packet
+
+
+class FramedPacketProtocol(protocol.Protocol):
+    """
+    Stream protocol which exchanges (address, packet) tuples as length-prefixed frames.
+
+    A single read or write may contain a batch of many frames.
+    """
+
+    def __init__(self, callback, max_frame_size=MAX_FRAME_SIZE):
+        """
+        :param callback: the function to call with every received (address, packet) tuple
+        :param max_frame_size: the maximum length of a received packet, larger frames drop the connection
+        """
+        self._buffer = ""
+        self._callback = callback
+        self.max_frame_size = max_frame_size
+
+    def dataReceived(self, data):
+        self._buffer += data
+        offset = 0
+        buffer_length = len(self._buffer)
+        while buffer_length - offset >= FRAME_HEADER.size:
+            ip, port, length = FRAME_HEADER.unpack_from(self._buffer, offset)
+            if length > self.max_frame_size:
+                # Never buffer an oversized frame, the stream is either corrupt or abusive
+                self._buffer = ""
+                self.transport.loseConnection()
+                return
+            end = offset + FRAME_HEADER.size + length
+            if end > buffer_length:
+                break
+            self._callback((inet_ntoa(ip), port), self._buffer[offset + FRAME_HEADER.size:end])
+            offset = end
+        self._buffer = self._buffer[offset:]
+
+    def send_frames(self, frames):
+        """
+        Write a batch of (address, packet) tuples to the stream.
+
+        :param frames: the list of (address, packet) tuples to write
+        """
+        self.transport.writeSequence([encode_frame(address, packet) for address, packet in frames])
+
+
+class UnixEndpoint(Endpoint):
+    """
+    Endpoint for processes running next to IPv8, which sends and receives through a UnixEndpointServer.
+
+    Packets sent through this endpoint are sent by the IPv8 process, packets received by the IPv8 process are
+    delivered to the listeners of this endpoint.
+    """
+
+    def __init__(self, path, port=0):
+        """
+        Create a new UnixEndpoint.
+
+        :param path: the file path of the Unix domain socket of the UnixEndpointServer
+        :param port: the port to report to our listeners
+        """
+        Endpoint.__init__(self)
+        self._path = path
+        self._port = port
+        self._protocol = None
+        self._running = False
+        # Packets sent before the connection is established are delivered when it is
+        self._delayed_packets = deque(maxlen=1000)
+
+    def _on_connected(self, connected_protocol):
+        self._protocol = connected_protocol
+        if self._delayed_packets:
+            self._protocol.send_frames(list(self._delayed_packets))
+            self._delayed_packets.clear()
+        return connected_protocol
+
+    def _on_frame(self, socket_address, packet):
+        self.notify_listeners((socket_address, packet))
+
+    def send(self, socket_address, packet):
+        """
+        Send a packet to a given address, through the IPv8 process.
+        :param socket_address: Tuple of (IP, port) which indicates the destination of the packet.
+        :param packet: The packet to send.
+        """
+        self.assert_open()
+        if self._protocol:
+            self._protocol.send_frames([(socket_address, packet)])
+        else:
+            self._delayed_packets.append((socket_address, packet))
+
+    def send_batch(self, frames):
+        """
+        Send multiple packets at once, through the IPv8 process.
+        :param frames: a list of (socket_address, packet) tuples
+        """
+        self.assert_open()
+        if self._protocol:
+            self._protocol.send_frames(frames)
+        else:
+            self._delayed_packets.extend(frames)
+
+    def open(self):
+        deferred = protocol.ClientCreator(reactor, FramedPacketProtocol, self._on_frame).connectUNIX(self._path)
+        deferred.addCallback(self._on_connected)
+        self._running = True
+        return deferred
+
+    def assert_open(self):
+        if not self._running:
+            raise EndpointClosedException(self)
+
+    def close(self):
+        self._running = False
+        self._delayed_packets.clear()
+        if self._protocol:
+            self._protocol.transport.loseConnection()
+            self._protocol = None
+        return succeed(None)
+
+    def get_address(self):
+        """
+        Get the address for this Endpoint.
+        """
+        self.assert_open()
+        return ("127.0.0.1", self._port)
+
+    def is_open(self):
+        return self._running
+
+
+class _ServerConnection(FramedPacketProtocol):
+    """
+    A connection of a co-located process to a UnixEndpointServer.
+    """
+
+    def __init__(self, server):
+        FramedPacketProtocol.__init__(self, server.endpoint.send)
+        self.server = server
+
+    def connectionMade(self):
+        self.server.connections.append(self)
+
+    def connectionLost(self, reason=protocol.connectionDone):
+        if self in self.server.connections:
+            self.server.connections.remove(self)
+
+
+class UnixEndpointServer(EndpointListener):
+    """
+    Share an Endpoint with co-located processes over a Unix domain socket.
+
+    Every packet received on the endpoint is forwarded to all connected processes and every frame received
+    from a connected process is sent over the endpoint.
+    """
+
+    def __init__(self, endpoint, path):
+        """
+        Create a new UnixEndpointServer.
+
+        :param endpoint: the Endpoint to share
+        :param path: the file path to create the Unix domain socket at, a stale socket file is replaced
+        """
+        super(UnixEndpointServer, self).__init__(endpoint)
+        self.path = path
+        self.connections = []
+        self._listening_port = None
+
+    def on_packet(self, packet):
+        for connection in self.connections:
+            connection.send_frames([packet])
+
+    def start(self):
+        """
+        Start listening for co-located processes.
+        """
+        factory = protocol.Factory()
+        factory.protocol = lambda: _ServerConnection(self)
+        # Only our own user may connect, the lock file lets us replace the socket file of a crashed process
+        self._listening_port = reactor.listenUNIX(self.path, factory, mode=0o600, wantPID=True)
+        self.endpoint.add_listener(self)
+
+    def stop(self):
+        """
+        Stop listening for co-located processes and disconnect all of them.
+        """
+        self.endpoint.remove_listener(self)
+        for connection in self.connections[:]:
+            connection.transport.loseConnection()
+        if self._listening_port:
+            return maybeDeferred(self._listening_port.stopListening)
+        return succeed(None)
@@ -1,13 +1,21 @@
-from socket import inet_aton
-from struct import pack, unpack
+from hashlib import sha1
 from time import time
 
 from .keyvault.crypto import ECCrypto
 from .keyvault.keys import Key
 
+# The gains of the smoothed round-trip time estimator (RFC 6298)
+RTT_ALPHA = 0.125
+RTT_BETA = 0.25
+# The minimum variance term of the retransmission timeout, in seconds
+RTT_GRANULARITY = 0.01
+
 
 class Peer(object):
 
+    __slots__ = ['_key', '_public_key', '_key_bin', '_mid', '_address', '_hash', 'last_response',
+                 '_lamport_timestamp', 'srtt', 'rttvar']
+
     def __init__(self, key, address=("0.0.0.0", 0), intro=True):
         """
         Create a new Peer.
@@ -18,12 +26,19 @@ class Peer(object):
         :param intro: is this peer suggested to us (otherwise it contacted us)
         """
         if not isinstance(key, Key):
-            self.key = ECCrypto().key_from_public_bin(key)
+            self._key = ECCrypto().key_from_public_bin(key)
         else:
-            self.key = key
+            self._key = key
+        # The key never changes, so we only serialize and hash it once
+        self._public_key = self._key.pub()
+        self._key_bin = self._public_key.key_to_bin()
+        self._mid = sha1(self._key_bin).digest()
         self.address = address
         self.last_response = 0 if intro else time()
         self._lamport_timestamp = 0
+        # The smoothed round-trip time and its variation, in seconds (None until measured)
+        self.srtt = None
+        self.rttvar = None
 
     def update_clock(self, timestamp):
         """
@@ -41,26 +56,70 @@ class Peer(object):
     def get_lamport_timestamp(self):
         return self._lamport_timestamp
 
+    def update_rtt(self, rtt):
+        """
+        Add a round-trip time measurement to the smoothed estimate, as specified by RFC 6298.
+
+        :param rtt: the measured round-trip time, in seconds
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+
+    def get_timeout(self, default):
+        """
+        Get the time to wait for a response of this peer.
+
+        :param default: the timeout to use if the round-trip time of this peer has not been measured yet
+        :return: the retransmission timeout derived from the round-trip time measurements, in seconds
+        """
+        if self.srtt is None:
+            return default
+        return self.srtt + max(RTT_GRANULARITY, 4 * self.rttvar)
+
+    @property
+    def key(self):
+        return self._key
+
     @property
     def mid(self):
-        return self.key.key_to_hash()
+        return self._mid
 
     @property
     def public_key(self):
-        return self.key.pub()
+        return self._public_key
+
+    @property
+    def key_bin(self):
+        """
+        The binary format of the public key of this peer.
+        """
+        return self._key_bin
+
+    @property
+    def address(self):
+        return self._address
+
+    @address.setter
+    def address(self, value):
+        self._address = value
+        self._hash = hash((self._mid, value))
 
     def __hash__(self):
-        address = inet_aton(self.address[0]) + pack(">I", self.address[1])
-        mid = self.mid[0:8]
-        out = ""
-        for i in range(8):
-            out += chr(ord(mid[i]) ^ ord(address[i]))
-        return unpack(">Q", out)[0]
+        return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Peer):
             return False
-        return (self.public_key.key_to_bin() == other.public_key.key_to_bin()) and (self.address == other.address)
+        return (self._key_bin == other._key_bin) and (self._address == other._address)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
 
     def __str__(self):
         return 'Peer<%s:%d, %s>' % (self.address + (self.mid.encode('base64')[:-1], ))
@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+from threading import Lock
+from time import time
+from weakref import WeakKeyDictionary
+
+from twisted.internet.defer import DeferredList, succeed
+from twisted.names import client, dns
+
+from ..util import atomic_write
+
+
+class BootstrapResolver(object):
+    """
+    Resolve the DNS names of bootstrap servers without blocking, caching the results for their TTL.
+
+    The cache may be stored on disk, so known bootstrap addresses are available immediately after a restart.
+    Addresses with a TTL of 0 are never cached.
+    """
+
+    def __init__(self, cache_path=None, lookup=None, timeout=(1, 3)):
+        """
+        Create a new BootstrapResolver.
+
+        :param cache_path: the file to store the resolved addresses in, or None to only cache in memory
+        :param lookup: the function to resolve A records with, by default twisted.names.client.lookupAddress
+        :param timeout: the sequence of timeouts to use for each query
+        """
+        self.cache_path = cache_path
+        self.lookup = lookup or client.lookupAddress
+        self.timeout = timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # Map of hostname to ([ip], expiry time)
+        self._cache = {}
+        self._load()
+
+    def _load(self):
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+            for hostname, (ips, expiry) in cache.iteritems():
+                # Never replace addresses we resolved more recently
+                if expiry > self._cache.get(hostname, ([], 0))[1]:
+                    self._cache[hostname] = ([str(ip) for ip in ips], expiry)
+        except (IOError, OSError, ValueError, TypeError):
+            self.logger.warning("Unable to load the DNS cache at %s", self.cache_path)
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        try:
+            atomic_write(self.cache_path, json.dumps(self._cache))
+        except (IOError, OSError):
+            self.logger.warning("Unable to store the DNS cache at %s", self.cache_path)
+
+    def set_cache_path(self, cache_path):
+        """
+        Store the resolved addresses in a file, loading the addresses it already holds.
+
+        :param cache_path: the file to store the resolved addresses in, or None to only cache in memory
+        """
+        if cache_path != self.cache_path:
+            self.cache_path = cache_path
+            self._load()
+
+    def _on_answers(self, result, hostname):
+        answers = [answer for answer in result[0] if answer.type == dns.A]
+        if not answers:
+            return self._on_failure(None, hostname)
+        ttl = min(answer.ttl for answer in answers)
+        ips = [answer.payload.dottedQuad() for answer in answers]
+        if ttl > 0:
+            self._cache[hostname] = (ips, time() + ttl)
+        else:
+            self._cache.pop(hostname, None)
+        return ips
+
+    def _on_failure(self, failure, hostname):
+        # An expired address is better than no address at all
+        ips, _ = self._cache.get(hostname, ([], 0))
+        self.logger.info("Unable to resolve %s, using %d cached address(es)", hostname, len(ips))
+        return ips
+
+    def resolve_hostname(self, hostname):
+        """
+        Resolve a hostname, using the cache if it has not expired.
+
+        :param hostname: the hostname to resolve
+        :return: a Deferred firing with the list of IPv4 addresses of this hostname
+        """
+        ips, expiry = self._cache.get(hostname, ([], 0))
+        if ips and expiry > time():
+            return succeed(ips)
+        name = hostname.encode('idna') if isinstance(hostname, unicode) else hostname
+        deferred = self.lookup(name, timeout=self.timeout)
+        deferred.addCallback(self._on_answers, hostname)
+        deferred.addErrback(self._on_failure, hostname)
+        return deferred
+
+    def resolve(self, dns_addresses):
+        """
+        Resolve a list of (hostname, port) addresses in parallel.
+
+        :param dns_addresses: the (hostname, port) tuples to resolve
+        :return: a Deferred firing with the deduplicated list of resolved (ip, port) tuples
+        """
+        deferreds = [self.resolve_hostname(hostname) for hostname, _ in dns_addresses]
+
+        def on_resolved(results):
+            addresses = []
+            for (success, ips), (_, port) in zip(results, dns_addresses):
+                for ip in (ips if success else []):
+                    if (ip, port) not in addresses:
+                        addresses.append((ip, port))
+            self._save()
+            return addresses
+
+        return DeferredList(deferreds).addCallback(on_resolved)
+
+
+class TrackerStatistics(object):
+    """
+    The responsiveness of a single bootstrap server.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.responses = 0
+        self.latency = None
+
+    @property
+    def success_rate(self):
+        """
+        The smoothed fraction of requests this tracker responded to, untried trackers start at 0.5.
+        """
+        return (self.responses + 1) / float(self.requests + 2)
+
+    def score(self, latency_offset, timeout):
+        """
+        The desirability of this tracker: responsive trackers with a low latency score highest.
+
+        Untried trackers are assumed to be fast, trackers which never responded are assumed to time out.
+
+        :param latency_offset: the latency added to every tracker, so fast trackers do not dominate unreliable ones
+        :param timeout: the latency of trackers which never responded
+        """
+        if self.latency is not None:
+            latency = self.latency
+        else:
+            latency = timeout if self.requests else 0.0
+        return self.success_rate / (latency + latency_offset)
+
+
+class BootstrapCoordinator(object):
+    """
+    Decide which bootstrap servers every overlay should contact, and when.
+
+    The statistics of the trackers are shared by all overlays in the process, so every overlay benefits from the
+    responses the other overlays received. Overlays only bootstrap while they have no peers, at most once every
+    interval.
+    """
+
+    def __init__(self, interval=30.0, fanout=3, response_timeout=5.0, latency_offset=0.1):
+        """
+        Create a new BootstrapCoordinator.
+
+        :param interval: the minimum time between bootstraps of an overlay
+        :param fanout: the number of trackers to contact per bootstrap, once some trackers are known to respond
+        :param response_timeout: the time after which an unanswered request counts as a failure
+        :param latency_offset: the latency added to every tracker when comparing trackers
+        """
+        self.interval = interval
+        self.fanout = fanout
+        self.response_timeout = response_timeout
+        self.latency_offset = latency_offset
+        self.trackers = {}
+        self._lock = Lock()
+        # Map of overlay to [next bootstrap time, {tracker address: request time}]
+        self._overlays = WeakKeyDictionary()
+
+    def _expire(self, pending, now):
+        for address, sent in pending.items():
+            if now - sent > self.response_timeout:
+                # The request counted as a failure by not adding a response
+                del pending[address]
+
+    def select_trackers(self, addresses):
+        """
+        Choose the trackers to contact.
+
+        If no tracker has ever responded, all of them are contacted. Otherwise the best scoring trackers are chosen.
+
+        :param addresses: the addresses of the known trackers
+        :return: the list of tracker addresses to contact
+        """
+        statistics = [(self.trackers.setdefault(address, TrackerStatistics()), address) for address in addresses]
+        if not any(tracker.responses for tracker, _ in statistics):
+            return list(addresses)
+        statistics.sort(key=lambda item: item[0].score(self.latency_offset, self.response_timeout), reverse=True)
+        return [address for _, address in statistics[:self.fanout]]
+
+    def request_bootstrap(self, overlay, addresses, now=None):
+        """
+        Determine the trackers an overlay should send introduction requests to now, if any.
+
+        :param overlay: the overlay which wants to bootstrap
+        :param addresses: the addresses of the known trackers
+        :param now: the current time, by default time()
+        :return: the list of tracker addresses to contact, which may be empty
+        """
+        now = time() if now is None else now
+        with self._lock:
+            state = self._overlays.setdefault(overlay, [0, {}])
+            next_bootstrap, pending = state
+            if now < next_bootstrap:
+                return []
+            self._expire(pending, now)
+            selected = [address for address in self.select_trackers(addresses) if address not in pending]
+            for address in selected:
+                self.trackers[address].requests += 1
+                pending[address] = now
+            state[0] = now + self.interval
+            return selected
+
+    def on_response(self, overlay, address, now=None):
+        """
+        Process a response of a tracker to one of the requests of an overlay.
+
+        :param overlay: the overlay which received the response
+        :param address: the address of the tracker, or of any other peer
+        :param now: the current time, by default time()
+        """
+        now = time() if now is None else now
+        with self._lock:
+            state = self._overlays.get(overlay)
+            sent = state[1].pop(address, None) if state else None
+            if sent is None:
+                return
+            tracker = self.trackers[address]
+            tracker.responses += 1
+            latency = now - sent
+            # Exponentially weighted moving average
+            tracker.latency = latency if tracker.latency is None else 0.8 * tracker.latency + 0.2 * latency
+
+    def reset(self, overlay):
+        """
+        Allow an overlay to bootstrap again immediately.
+
+        :param overlay: the overlay to reset the interval of
+        """
+        with self._lock:
+            state = self._overlays.get(overlay)
+            if state:
+                state[0] = 0
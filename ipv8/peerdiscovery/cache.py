@@ -0,0 +1,63 @@
+import os
+
+from twisted.internet.task import LoopingCall
+
+from ..taskmanager import TaskManager
+from ..util import atomic_write
+
+
+class PeerCache(TaskManager):
+    """
+    Periodically persist the verified peers of a Network to a file, so they can be loaded after a restart.
+    """
+
+    def __init__(self, network, path):
+        """
+        Create a new PeerCache.
+
+        :param network: the Network to persist the verified peers of
+        :param path: the file path to store the peers at
+        """
+        super(PeerCache, self).__init__()
+        self.network = network
+        self.path = path
+
+    def load(self):
+        """
+        Load the stored peers into the Network, if they exist.
+
+        :return: the list of loaded peers
+        """
+        if not os.path.isfile(self.path):
+            return []
+        try:
+            with open(self.path, 'rb') as f:
+                serialization = f.read()
+        except (IOError, OSError):
+            self._logger.exception("Failed to read the peer cache at %s", self.path)
+            return []
+        return self.network.import_peers(serialization)
+
+    def save(self):
+        """
+        Atomically write the verified peers of the Network to disk.
+        """
+        try:
+            atomic_write(self.path, self.network.export_peers())
+        except (IOError, OSError):
+            self._logger.exception("Failed to write the peer cache to %s", self.path)
+
+    def start(self, interval=60.0):
+        """
+        Start saving the verified peers periodically.
+
+        :param interval: the time between saves, in seconds
+        """
+        self.register_task("save", LoopingCall(self.save), delay=interval, interval=interval)
+
+    def stop(self):
+        """
+        Stop saving periodically and perform a final save.
+        """
+        self.shutdown_task_manager()
+        self.save()
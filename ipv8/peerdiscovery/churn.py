@@ -1,29 +1,59 @@
-from random import sample
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
 from time import time
+
 from .discovery import DiscoveryStrategy
+from .network import NetworkObserver
 
 
-class RandomChurn(DiscoveryStrategy):
+class RandomChurn(DiscoveryStrategy, NetworkObserver):
     """
-    Select random peers, ping them if inactive, remove them if unresponsive.
+    Ping peers when they become inactive, remove them if they stay unresponsive.
+
+    Peers are also pinged just before the NAT mapping towards them expires, if the overlay knows when that is.
+    Every verified peer is kept in a heap, ordered by the next time its liveness should be checked.
     """
 
-    def __init__(self, overlay, sample_size=8, ping_interval=10.0, inactive_time=27.5, drop_time=57.5):
+    def __init__(self, overlay, sample_size=8, ping_interval=10.0, inactive_time=27.5, drop_time=57.5,
+                 min_ping_interval=2.0):
         """
-        Random peer removal strategy.
+        Deadline based peer removal strategy.
 
         :param overlay: the overlay to sample peers from
-        :param sample_size: the amount of peers to check at once
-        :param ping_interval: time between pings in the range of inactive_time to drop_time
+        :param sample_size: the maximum amount of due peers to check at once
+        :param ping_interval: maximum time between pings in the range of inactive_time to drop_time
         :param inactive_time: time before pings are sent to check liveness
         :param drop_time: time after which a peer is dropped
+        :param min_ping_interval: minimum time between pings, for peers with a low round-trip time
         """
         super(RandomChurn, self).__init__(overlay)
         self._pinged = {}
         self.sample_size = sample_size
         self.ping_interval = ping_interval
+        self.min_ping_interval = min_ping_interval
         self.inactive_time = inactive_time
         self.drop_time = drop_time
+        # Heap of (deadline, sequence number, peer), only the latest sequence number of a peer is valid
+        self._deadlines = []
+        self._sequence = count()
+        self._latest = {}
+        # The peers which still need to be added to the heap
+        self._added = deque()
+        with self.overlay.network.graph_lock:
+            self._added.extend(self.overlay.network.verified_peers)
+            self.overlay.network.add_observer(self)
+
+    def unload(self):
+        """
+        Stop following the verified peers of the (shared) Network.
+        """
+        self.overlay.network.remove_observer(self)
+        self._added.clear()
+
+    def on_peer_added(self, peer):
+        # This may be called from any thread, the heap is only touched when taking a step
+        self._added.append(peer)
 
     def should_drop(self, peer):
         """
@@ -41,23 +71,79 @@ class RandomChurn(DiscoveryStrategy):
             return False
         return time() > (peer.last_response + self.inactive_time)
 
+    def needs_keep_alive(self, peer):
+        """
+        Is the NAT mapping towards this peer about to expire.
+        """
+        keep_alive_time = self.overlay.get_keep_alive_time(peer.address)
+        return keep_alive_time is not None and time() >= keep_alive_time
+
+    def get_ping_interval(self, peer):
+        """
+        Get the time to wait for a pong of a peer before pinging it again.
+
+        This is the retransmission timeout derived from the round-trip time of the peer, if it has been measured.
+        """
+        return min(self.ping_interval, max(self.min_ping_interval, peer.get_timeout(self.ping_interval)))
+
+    def get_deadline(self, peer):
+        """
+        Get the next time the liveness of a peer needs to be checked.
+
+        As peers only respond more recently over time, a deadline may be early, but never late.
+        """
+        now = time()
+        if peer.last_response == 0:
+            # The peer has not responded to us yet, check again later
+            return now + self.inactive_time
+        if not self.is_inactive(peer):
+            keep_alive_time = self.overlay.get_keep_alive_time(peer.address)
+            if keep_alive_time is not None:
+                return max(now, min(peer.last_response + self.inactive_time, keep_alive_time))
+            return peer.last_response + self.inactive_time
+        if peer.address in self._pinged:
+            return max(now, min(self._pinged[peer.address] + self.get_ping_interval(peer),
+                                peer.last_response + self.drop_time))
+        return now
+
+    def _schedule(self, peer):
+        sequence = next(self._sequence)
+        self._latest[peer.mid] = sequence
+        heappush(self._deadlines, (self.get_deadline(peer), sequence, peer))
+
     def take_step(self, service_id=None):
         """
-        Select a new (set of) peer(s) to investigate liveness for.
+        Ping the peers which have become inactive and remove the peers which did not respond in time.
         """
-        # Find an inactive or droppable peer
-        sample_size = min(len(self.overlay.network.verified_peers), self.sample_size)
-        if sample_size:
-            window = sample(self.overlay.network.verified_peers, sample_size)
+        while self._added:
+            self._schedule(self._added.popleft())
 
-            for peer in window:
-                if self.should_drop(peer) and peer.address in self._pinged:
-                    self.overlay.network.remove_peer(peer)
+        now = time()
+        checked = []
+        while self._deadlines and len(checked) < self.sample_size and self._deadlines[0][0] <= now:
+            _, sequence, peer = heappop(self._deadlines)
+            if self._latest.get(peer.mid) != sequence:
+                # This peer has been scheduled again
+                continue
+            if self.overlay.network.get_verified_by_mid(peer.mid) is not peer:
+                # This peer was removed or replaced
+                del self._latest[peer.mid]
+                self._pinged.pop(peer.address, None)
+                continue
+            if self.should_drop(peer) and peer.address in self._pinged:
+                self.overlay.network.remove_peer(peer)
+                del self._latest[peer.mid]
+                del self._pinged[peer.address]
+                continue
+            if self.is_inactive(peer) or self.needs_keep_alive(peer):
+                if (peer.address in self._pinged) and \
+                        (time() > (self._pinged[peer.address] + self.get_ping_interval(peer))):
                     del self._pinged[peer.address]
-                elif self.is_inactive(peer):
-                    if (peer.address in self._pinged) and (time() > (self._pinged[peer.address] + self.ping_interval)):
-                        del self._pinged[peer.address]
-                    if peer.address not in self._pinged:
-                        self._pinged[peer.address] = time()
-                        packet = self.overlay.create_ping()
-                        self.overlay.endpoint.send(peer.address, packet)
+                if peer.address not in self._pinged:
+                    self._pinged[peer.address] = time()
+                    self.overlay.send_ping(peer)
+            checked.append(peer)
+
+        # Only reschedule now, so we don't check the same peer twice in one step
+        for peer in checked:
+            self._schedule(peer)
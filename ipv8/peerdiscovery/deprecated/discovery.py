@@ -1,10 +1,14 @@
+from collections import OrderedDict
+from time import time
+
 from ...peer import Peer
 from ...deprecated.community import Community, PacketDecodingError
 from ...deprecated.payload import IntroductionRequestPayload
 from ...deprecated.payload_headers import BinMemberAuthenticationPayload, GlobalTimeDistributionPayload
 from .discovery_payload import PingPayload, PongPayload, SimilarityRequestPayload, SimilarityResponsePayload, \
-    DiscoveryIntroductionRequestPayload
+    DiscoveryIntroductionRequestPayload, FindRequestPayload, FindResponsePayload
 from ...messaging.serialization import PackError
+from ..routing import RoutingTable
 
 
 class DiscoveryCommunity(Community):
@@ -17,16 +21,41 @@ class DiscoveryCommunity(Community):
                        "cd500624376aec875a6e3028aab784cfaf0bac6527245db8d93900d904ac2a92"
                        "2a02716ccef5a22f7968".decode("HEX"))
 
+    versioned_services = True
+    # The maximum number of service versions awaiting a similarity response
+    max_announced_versions = 1024
+    # The maximum number of find requests awaiting a response
+    max_find_requests = 1024
+    # The maximum number of find requests answered per second, per address
+    find_response_rate = 5.0
+    # The maximum number of addresses to remember the find response rate of
+    max_find_sources = 1024
+
     def __init__(self, my_peer, endpoint, network):
         super(DiscoveryCommunity, self).__init__(my_peer, endpoint, network)
 
+        # Map of peer mids to the service version they announced, while we request their services
+        self._announced_versions = OrderedDict()
+        # The Kademlia routing table of all verified peers, to look up peers by mid
+        self.routing_table = RoutingTable(my_peer.mid, network)
+        # Map of (address, identifier) of the find requests we sent to (Lookup, mid of the queried peer)
+        self._find_requests = OrderedDict()
+        # Map of address to (tokens, last refill time) of the find requests we answered, least recently used first
+        self._find_sources = OrderedDict()
+
         self.decode_map.update({
             chr(1): self.on_similarity_request,
             chr(2): self.on_similarity_response,
             chr(3): self.on_ping,
-            chr(4): self.on_pong
+            chr(4): self.on_pong,
+            chr(5): self.on_find_request,
+            chr(6): self.on_find_response
         })
 
+    def unload(self):
+        self.routing_table.unload()
+        super(DiscoveryCommunity, self).unload()
+
     def on_introduction_request(self, source_address, data):
         try:
             auth, dist, payload = self._ez_unpack_auth(DiscoveryIntroductionRequestPayload, data)
@@ -40,18 +69,27 @@ class DiscoveryCommunity(Community):
         introduce_to = getattr(payload, 'introduce_to', None)
         introduction = None
         if introduce_to:
-            peers = self.network.verified_peers[:]
-            matches = [p for p in peers if p.mid == introduce_to]
-            introduction = matches[0] if matches else None
+            introduction = self.network.get_verified_by_mid(introduce_to)
+        service_version = self.network.service_version if payload.supports_service_version else None
         packet = self.create_introduction_response(payload.destination_address, source_address, payload.identifier,
-                                                   introduction=introduction)
+                                                   introduction=introduction, service_version=service_version,
+                                                   extra_introductions=payload.extra_introductions)
         self.endpoint.send(source_address, packet)
 
-    def on_introduction_response(self, source_address, data):
-        super(DiscoveryCommunity, self).on_introduction_response(source_address, data)
+    def introduction_response_callback(self, peer, dist, payload):
+        """
+        Request the services of the responding peer, unless they did not change since we last received them.
+        """
+        if payload.service_version is not None:
+            if payload.service_version == self.network.get_service_version(peer):
+                return
+            self._announced_versions.pop(peer.mid, None)
+            self._announced_versions[peer.mid] = payload.service_version
+            if len(self._announced_versions) > self.max_announced_versions:
+                self._announced_versions.popitem(last=False)
 
         packet = self.create_similarity_request()
-        self.endpoint.send(source_address, packet)
+        self.endpoint.send(peer.address, packet)
 
     def on_similarity_request(self, source_address, data):
         auth, dist, payload = self._ez_unpack_auth(SimilarityRequestPayload, data)
@@ -62,7 +100,8 @@ class DiscoveryCommunity(Community):
     def on_similarity_response(self, source_address, data):
         auth, dist, payload = self._ez_unpack_auth(SimilarityResponsePayload, data)
 
-        self.network.discover_services(Peer(auth.public_key_bin, source_address), payload.preference_list)
+        peer = Peer(auth.public_key_bin, source_address)
+        self.network.discover_services(peer, payload.preference_list, self._announced_versions.pop(peer.mid, None))
 
     def on_ping(self, source_address, data):
         dist, payload = self._ez_unpack_noauth(PingPayload, data)
@@ -73,6 +112,45 @@ class DiscoveryCommunity(Community):
     def on_pong(self, source_address, data):
         dist, payload = self._ez_unpack_noauth(PongPayload, data)
 
+        self.measure_rtt(source_address, payload.identifier)
+
+    def on_find_request(self, source_address, data):
+        dist, payload = self._ez_unpack_noauth(FindRequestPayload, data)
+
+        if not self._take_find_token(source_address, time()):
+            # Find requests are unauthenticated, don't let them be used to flood (spoofed) addresses or our peers
+            return
+
+        nodes = [(peer.mid, peer.address)
+                 for peer in self.routing_table.closest(payload.target, exclude=(source_address, ))]
+        packet = self.create_find_response(payload.identifier, nodes)
+        self.endpoint.send(source_address, packet)
+
+    def on_find_response(self, source_address, data):
+        dist, payload = self._ez_unpack_noauth(FindResponsePayload, data)
+
+        self.measure_rtt(source_address, payload.identifier)
+        request = self._find_requests.pop((source_address, payload.identifier), None)
+        if request:
+            lookup, mid = request
+            lookup.add_nodes(payload.nodes, mid, source_address)
+
+    def _take_find_token(self, source_address, now):
+        """
+        Claim permission to answer a find request of an address, at most find_response_rate times per second.
+
+        :param source_address: the address the find request came from
+        :param now: the current time
+        :return: whether the find request may be answered
+        """
+        tokens, last_refill = self._find_sources.pop(source_address, (self.find_response_rate, now))
+        tokens = min(self.find_response_rate, tokens + (now - last_refill) * self.find_response_rate)
+        allowed = tokens >= 1
+        self._find_sources[source_address] = (tokens - 1 if allowed else tokens, now)
+        if len(self._find_sources) > self.max_find_sources:
+            self._find_sources.popitem(last=False)
+        return allowed
+
     def create_similarity_request(self):
         global_time = self.claim_global_time()
         payload = SimilarityRequestPayload(global_time,
@@ -100,8 +178,44 @@ class DiscoveryCommunity(Community):
 
         return self._ez_pack(self._prefix, 3, [dist, payload], False)
 
+    def send_ping(self, peer):
+        """
+        Send a ping to a peer, its pong will update the round-trip time of the peer.
+
+        :param peer: the Peer to ping
+        """
+        self._send_request(peer.address, self.create_ping())
+
     def create_pong(self, identifier):
         global_time = self.claim_global_time()
         payload = PongPayload(identifier).to_pack_list()
         dist = GlobalTimeDistributionPayload(global_time).to_pack_list()
         return self._ez_pack(self._prefix, 4, [dist, payload], False)
+
+    def create_find_request(self, target):
+        global_time = self.claim_global_time()
+        payload = FindRequestPayload(global_time, target).to_pack_list()
+        dist = GlobalTimeDistributionPayload(global_time).to_pack_list()
+
+        return self._ez_pack(self._prefix, 5, [dist, payload], False)
+
+    def send_find_request(self, lookup, mid, address):
+        """
+        Ask a peer for the peers it knows closest to the target of a lookup.
+
+        :param lookup: the Lookup to add the response to
+        :param mid: the mid of the peer to ask
+        :param address: the address of the peer to ask
+        """
+        packet = self.create_find_request(lookup.target)
+        self._find_requests[(address, self.global_time % 65536)] = (lookup, mid)
+        if len(self._find_requests) > self.max_find_requests:
+            self._find_requests.popitem(last=False)
+        self._send_request(address, packet)
+
+    def create_find_response(self, identifier, nodes):
+        global_time = self.claim_global_time()
+        payload = FindResponsePayload(identifier, nodes).to_pack_list()
+        dist = GlobalTimeDistributionPayload(global_time).to_pack_list()
+
+        return self._ez_pack(self._prefix, 6, [dist, payload], False)
@@ -125,15 +125,78 @@ class PongPayload(PingPayload):
     pass
 
 
+class FindRequestPayload(Payload):
+
+    format_list = ['H', '20s']
+
+    def __init__(self, identifier, target):
+        super(FindRequestPayload, self).__init__()
+        self._identifier = identifier % 65536
+        self._target = target
+
+    def to_pack_list(self):
+        data = [('H', self._identifier),
+                ('20s', self._target)]
+
+        return data
+
+    @classmethod
+    def from_unpack_list(cls, identifier, target):
+        return FindRequestPayload(identifier, target)
+
+    @property
+    def identifier(self):
+        return self._identifier
+
+    @property
+    def target(self):
+        return self._target
+
+
+class FindResponsePayload(Payload):
+
+    format_list = ['H', 'raw']
+
+    def __init__(self, identifier, nodes):
+        super(FindResponsePayload, self).__init__()
+        self._identifier = identifier % 65536
+        self._nodes = nodes
+
+    def to_pack_list(self):
+        encoded_nodes = [pack(">20s4sH", mid, inet_aton(address[0]), address[1]) for mid, address in self._nodes]
+        data = [('H', self._identifier),
+                ('raw', "".join(encoded_nodes))]
+
+        return data
+
+    @classmethod
+    def from_unpack_list(cls, identifier, nodes):
+        decoded_nodes = []
+        for i in range(0, len(nodes) - len(nodes) % 26, 26):
+            mid, ip, port = unpack(">20s4sH", nodes[i:i+26])
+            decoded_nodes.append((mid, (inet_ntoa(ip), port)))
+
+        return FindResponsePayload(identifier, decoded_nodes)
+
+    @property
+    def identifier(self):
+        return self._identifier
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+
 class DiscoveryIntroductionRequestPayload(IntroductionRequestPayload):
 
     format_list = ['c20s', '4SH', '4SH', '4SH', 'bits', 'H']
 
     def __init__(self, introduce_to, destination_address, source_lan_address, source_wan_address, advice,
-                 connection_type, sync, identifier):
+                 connection_type, sync, identifier, supports_service_version=False, extra_introductions=0):
         super(DiscoveryIntroductionRequestPayload, self).__init__(destination_address, source_lan_address,
                                                                   source_wan_address, advice, connection_type, sync,
-                                                                  identifier)
+                                                                  identifier, supports_service_version,
+                                                                  extra_introductions)
         self.introduce_to = introduce_to
 
     def to_pack_list(self):
@@ -146,7 +209,7 @@ class DiscoveryIntroductionRequestPayload(IntroductionRequestPayload):
                          connection_type_0, connection_type_1, dflag0, dflag1, dflag2, tunnel, sync, advice,
                          identifier, time_low=None, time_high=None, modulo=None, modulo_offset=None,
                          functions=None, size=None, prefix_bytes=None):
-        args = [introduce_to[1:],
+        args = [introduce_to[1],
                 (inet_ntoa(destination_address[0]), destination_address[1]),
                 (inet_ntoa(source_lan_address[0]), source_lan_address[1]),
                 (inet_ntoa(source_wan_address[0]), source_wan_address[1]),
@@ -160,5 +223,7 @@ class DiscoveryIntroductionRequestPayload(IntroductionRequestPayload):
             args.append(None)
 
         args.append(identifier)
+        args.append(bool(dflag0))
+        args.append(dflag1 * 2 + dflag2)
 
         return DiscoveryIntroductionRequestPayload(*args)
@@ -3,6 +3,12 @@ import abc
 from random import choice
 from time import time
 
+from twisted.internet.defer import Deferred, succeed
+
+from .network import NetworkObserver
+from .quality import AddressScores
+from .routing import Lookup
+
 
 class DiscoveryStrategy(object):
     """
@@ -14,6 +20,12 @@ class DiscoveryStrategy(object):
     def __init__(self, overlay):
         self.overlay = overlay
 
+    def unload(self):
+        """
+        Release the resources of this strategy, once its overlay is unloaded.
+        """
+        pass
+
     @abc.abstractmethod
     def take_step(self, service_id=None):
         pass
@@ -22,48 +34,85 @@ class DiscoveryStrategy(object):
 class RandomWalk(DiscoveryStrategy):
     """
     Walk randomly through the network.
+
+    Out of a small random sample of walkable addresses, addresses which are likely to respond are preferred.
     """
 
-    def __init__(self, overlay, timeout=3.0, window_size=5):
+    def __init__(self, overlay, timeout=3.0, window_size=5, sample_size=4):
+        """
+        Create a new RandomWalk.
+
+        :param overlay: the overlay to walk for
+        :param timeout: the time to wait for a walkable address to respond
+        :param window_size: the maximum number of outstanding walks, or 0 for no limit
+        :param sample_size: the number of walkable addresses to choose from per step
+        """
         super(RandomWalk, self).__init__(overlay)
         self.intro_timeouts = {}
         self.node_timeout = timeout
         self.window_size = window_size
+        self.sample_size = sample_size
+        self.scores = AddressScores()
+        # The introducers of the addresses in intro_timeouts
+        self._introducers = {}
+
+    def _choose_address(self, service_id):
+        """
+        Choose a walkable address which we are not walking to already, avoiding quarantined addresses.
+        """
+        network = self.overlay.network
+        candidates = [(address, introducer) for address, introducer
+                      in network.sample_walkable_addresses(self.sample_size, service_id)
+                      if address not in self.intro_timeouts]
+        for address, _ in candidates:
+            if self.scores.is_quarantined(address):
+                # Known to fail, don't keep it around
+                network.remove_by_address(address)
+        address = self.scores.choose(candidates)
+        if address is None and not candidates:
+            # All of the sampled addresses are being walked to already
+            address = network.get_random_walkable_address(service_id, self.intro_timeouts)
+            if address and self.scores.is_quarantined(address):
+                network.remove_by_address(address)
+                address = None
+        return address
 
     def take_step(self, service_id=None):
         """
         Walk to random walkable peer.
         """
-        # Sanitize unreachable nodes
-        to_remove = []
-        for node in self.intro_timeouts:
-            if self.intro_timeouts[node] + self.node_timeout < time():
-                to_remove.append(node)
-        for node in to_remove:
-            del self.intro_timeouts[node]
-            if not self.overlay.network.get_verified_by_address(node):
+        # Register responding nodes and sanitize unreachable nodes
+        now = time()
+        for node in self.intro_timeouts.keys():
+            if self.overlay.network.get_verified_by_address(node):
+                del self.intro_timeouts[node]
+                self.scores.record(node, self._introducers.pop(node, None), True, now)
+            elif self.intro_timeouts[node] + self.node_timeout < now:
+                del self.intro_timeouts[node]
+                self.scores.record(node, self._introducers.pop(node, None), False, now)
                 self.overlay.network.remove_by_address(node)
         # If a valid window size (>0) is specified and we are waiting for (at least) this many pings: return
         if self.window_size and self.window_size > 0 and len(self.intro_timeouts) >= self.window_size:
             return
         # Take step
-        known = self.overlay.network.get_walkable_addresses(service_id)
-        available = list(set(known) - set(self.intro_timeouts.keys()))
+        peer = self._choose_address(service_id)
 
-        if available:
-            peer = choice(available)
+        if peer:
+            self._introducers[peer] = self.overlay.network.get_introducer(peer)
             self.overlay.walk_to(peer)
             self.intro_timeouts[peer] = time()
         else:
             self.overlay.get_new_introduction(service_id=service_id)
 
 
-class EdgeWalk(DiscoveryStrategy):
+class EdgeWalk(DiscoveryStrategy, NetworkObserver):
     """
     Walk through the network by using edges.
 
     This will perform a depth-first search in the network starting from your direct neighborhood.
     When a certain depth is reached, we teleport home and start again from our neighborhood.
+
+    The Network notifies us of the verified peers introduced by the ends of our edges, so we don't poll for them.
     """
 
     def __init__(self, overlay, edge_length=4, neighborhood_size=6, edge_timeout=3.0):
@@ -78,6 +127,35 @@ class EdgeWalk(DiscoveryStrategy):
         self.neighborhood_size = neighborhood_size
         self.edge_timeout = edge_timeout
 
+        # The verified peers introduced by the mids of the peers at the end of our edges
+        self._introduced = {}
+        self.overlay.network.add_observer(self)
+
+    def unload(self):
+        """
+        Stop following the introductions of the (shared) Network.
+        """
+        self.overlay.network.remove_observer(self)
+        self._introduced.clear()
+
+    def on_introduced_peer(self, introducer, peer):
+        # This may be called from any thread, only add to the introductions we are waiting for
+        introduced = self._introduced.get(introducer)
+        if introduced is not None:
+            introduced.append(peer)
+
+    def await_introductions(self, peer):
+        """
+        Start collecting the verified peers introduced by a certain peer, including the ones we already know.
+
+        :param peer: the peer at the end of an edge
+        """
+        self._introduced[peer.mid] = []
+        for intro in self.overlay.network.get_introductions_from(peer):
+            verified = self.overlay.network.get_verified_by_address(intro)
+            if verified:
+                self._introduced[peer.mid].append(verified)
+
     def get_available_root(self):
         """
         Get a root, if it exists, which is not busy constructing an edge for us.
@@ -99,19 +177,17 @@ class EdgeWalk(DiscoveryStrategy):
             if waiting_root:
                 self.under_construction[waiting_root] = [waiting_root]
                 self.last_edge_responses[waiting_root] = time()
+                self.await_introductions(waiting_root)
                 self.overlay.get_new_introduction(waiting_root.address, service_id=service_id)
             else:
                 # Check if our introduced peer has answered yet
                 completed = []
                 for root in self.under_construction:
                     last_verified = self.under_construction[root][-1]
-                    introductions = []
-                    for intro in self.overlay.network.get_introductions_from(last_verified):
-                        verified = self.overlay.network.get_verified_by_address(intro)
-                        if verified:
-                            introductions.append(verified)
+                    introductions = self._introduced.get(last_verified.mid)
                     if introductions:
                         # We got (multiple?) introductions from this peer, add it as verified
+                        del self._introduced[last_verified.mid]
                         self.last_edge_responses[root] = time()
                         next_in_edge = choice(introductions)
                         self.under_construction[root].append(next_in_edge)
@@ -121,11 +197,90 @@ class EdgeWalk(DiscoveryStrategy):
                             completed.append(root)
                         else:
                             # Take this edge a step further
+                            self.await_introductions(next_in_edge)
                             self.overlay.walk_to(next_in_edge.address)
                     elif self.last_edge_responses[root] + self.edge_timeout < time():
                         # This edge isn't growing, mark it as complete
+                        self._introduced.pop(last_verified.mid, None)
                         if len(self.under_construction[root]) > 1:
                             self.complete_edges.append(self.under_construction[root])
                         completed.append(root)
                 for root in completed:
                     del self.under_construction[root]
+
+
+class PeerLookup(DiscoveryStrategy):
+    """
+    Find specific peers by their mid, with iterative Kademlia lookups.
+
+    The overlay should provide a routing_table (a RoutingTable) and send_find_request(lookup, mid, address), like
+    the DiscoveryCommunity. Every step sends at most alpha parallel find requests per lookup, so a peer is found in
+    O(log N) hops. Once the address of the target is known, we walk to it to verify its key.
+    """
+
+    def __init__(self, overlay, alpha=3, timeout=3.0):
+        """
+        Create a new PeerLookup.
+
+        :param overlay: the overlay to look up peers with
+        :param alpha: the maximum number of parallel find requests per lookup
+        :param timeout: the time to wait for a find request or a walk to the target to be answered
+        """
+        super(PeerLookup, self).__init__(overlay)
+        self.alpha = alpha
+        self.timeout = timeout
+        # Map of target mid to (Lookup, [Deferred])
+        self.lookups = {}
+        # Map of target mid to the (address, time) we walked to
+        self._walks = {}
+
+    def lookup(self, mid):
+        """
+        Start looking up a peer.
+
+        :param mid: the mid of the peer to find
+        :return: a Deferred firing with the verified Peer, or None if it could not be found
+        """
+        peer = self.overlay.network.get_verified_by_mid(mid)
+        if peer:
+            return succeed(peer)
+        deferred = Deferred()
+        if mid in self.lookups:
+            self.lookups[mid][1].append(deferred)
+        else:
+            routing_table = self.overlay.routing_table
+            lookup = Lookup(mid, routing_table.bucket_size, self.alpha, self.timeout)
+            lookup.add_nodes([(peer.mid, peer.address) for peer in routing_table.closest(mid)])
+            self.lookups[mid] = (lookup, [deferred])
+        return deferred
+
+    def _finish(self, mid, peer):
+        _, deferreds = self.lookups.pop(mid)
+        self._walks.pop(mid, None)
+        for deferred in deferreds:
+            deferred.callback(peer)
+
+    def take_step(self, service_id=None):
+        """
+        Advance all lookups by one step.
+        """
+        now = time()
+        for mid, (lookup, _) in self.lookups.items():
+            peer = self.overlay.network.get_verified_by_mid(mid)
+            if peer:
+                self._finish(mid, peer)
+                continue
+            address = lookup.get_address(mid)
+            if address:
+                # We know where the target is, see if it responds (again, if a closer node reported another address)
+                walked_address, walked = self._walks.get(mid, (None, 0))
+                if address != walked_address:
+                    self._walks[mid] = (address, now)
+                    self.overlay.walk_to(address)
+                elif now - walked > self.timeout:
+                    self._finish(mid, None)
+                continue
+            for node_mid, node_address in lookup.next_queries(now):
+                self.overlay.send_find_request(lookup, node_mid, node_address)
+            if lookup.exhausted:
+                self._finish(mid, None)
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from time import time
+
+
+class PendingRequests(object):
+    """
+    Remember when requests were sent, to measure the round-trip time when the matching response arrives.
+
+    Only a bounded number of recent requests is kept, unanswered requests are forgotten.
+    """
+
+    def __init__(self, max_size=1024, max_age=30.0):
+        """
+        Create a new PendingRequests.
+
+        :param max_size: the maximum number of outstanding requests to remember
+        :param max_age: the time after which a request is considered unanswered, in seconds
+        """
+        self.max_size = max_size
+        self.max_age = max_age
+        self._requests = OrderedDict()
+
+    def add(self, address, identifier, now=None):
+        """
+        Register a request which was sent.
+
+        :param address: the (ip, port) address the request was sent to
+        :param identifier: the identifier the response will echo
+        :param now: the time the request was sent, by default time()
+        """
+        key = (address, identifier)
+        self._requests.pop(key, None)
+        self._requests[key] = time() if now is None else now
+        while len(self._requests) > self.max_size:
+            self._requests.popitem(last=False)
+
+    def pop(self, address, identifier, now=None):
+        """
+        Match a response to its request.
+
+        :param address: the (ip, port) address the response was received from
+        :param identifier: the identifier echoed by the response
+        :param now: the time the response was received, by default time()
+        :return: the round-trip time in seconds or None if there is no (recent) matching request
+        """
+        sent = self._requests.pop((address, identifier), None)
+        if sent is None:
+            return None
+        rtt = (time() if now is None else now) - sent
+        return rtt if 0 <= rtt <= self.max_age else None
+
+    def __len__(self):
+        return len(self._requests)
+
+
+def lowest_latency(peers):
+    """
+    Get the peer with the lowest smoothed round-trip time, peers which have not been measured come last.
+
+    :param peers: the peers to choose from
+    :return: the chosen peer or None if there are no peers
+    """
+    best = None
+    for peer in peers:
+        if peer is None:
+            continue
+        if best is None or (peer.srtt is not None and (best.srtt is None or peer.srtt < best.srtt)):
+            best = peer
+    return best
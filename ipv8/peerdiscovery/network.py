@@ -1,32 +1,347 @@
 from base64 import b64encode
+from collections import OrderedDict
 from hashlib import sha1
+import logging
+from operator import attrgetter
+from random import sample
 from threading import RLock
 from socket import inet_aton, inet_ntoa
-from struct import pack, unpack
+from struct import error as StructError, pack, Struct, unpack
 
-from networkx import draw, Graph, circular_layout
+from ..keyvault.crypto import ECCrypto
+from ..peer import Peer
+from .sampling import RandomAccessSet
+
+# Every exported peer consists of: the IPv4 address, the port, the last response time, the introducer mid,
+# the length of the public key and the number of services, followed by the public key and the services
+PEER_HEADER = Struct(">4sHd20sHB")
+SERVICE_HEADER = Struct(">B")
+
+# The number of eviction candidates to compare when a table is full
+EVICTION_SAMPLE_SIZE = 8
+
+
+class NetworkObserver(object):
+    """
+    Handler for changes to the verified peers of a Network.
+
+    These callbacks are called while the Network is locked, from any thread: they should return quickly.
+    """
+
+    def on_peer_added(self, peer):
+        """
+        A peer has been verified.
+
+        :param peer: the verified Peer
+        """
+        pass
+
+    def on_peer_removed(self, peer):
+        """
+        A verified peer has been removed.
+
+        :param peer: the removed Peer
+        """
+        pass
+
+    def on_introduced_peer(self, introducer, peer):
+        """
+        A verified peer uses an address which was introduced to us by another peer.
+
+        :param introducer: the mid of the introducer
+        :param peer: the verified Peer
+        """
+        pass
 
 
 class Network(object):
 
-    def __init__(self):
-        # All known IP:port addresses
+    def __init__(self, max_addresses=10000, max_verified_peers=None, max_peers_per_service=None):
+        """
+        Create a new Network.
+
+        :param max_addresses: the maximum number of addresses without a verified peer, or None for no limit
+        :param max_verified_peers: the maximum number of verified peers, or None for no limit
+        :param max_peers_per_service: the maximum number of verified peers per service, or None for no limit
+        """
+        # All known IP:port addresses, mapped to the mid of the peer that introduced them (or '')
         self._all_addresses = {}
+        # The addresses introduced by each introducer mid
+        self._introductions = {}
+        # The mids of all verified peers and introducers, which have not been removed
+        self._known_mids = set()
+        # All known addresses without a verified peer, globally and per service of their introducer
+        self._walkable = RandomAccessSet()
+        self._walkable_per_service = {}
+        # The same addresses in the order they were discovered or lost their verified peer
+        self._unverified_order = OrderedDict()
         # All verified Peer objects (Peer.address must be in _all_addresses)
         self.verified_peers = []
-        # The networkx graph containing the addresses and peers
-        self.graph = Graph()
+        # Indexes of the verified Peer objects
+        self._verified_by_address = {}
+        self._verified_by_mid = {}
+        self._verified_by_key_bin = {}
+        # Writers hold the graph_lock, readers use the immutable snapshots (which are discarded on every change)
         self.graph_lock = RLock()
+        self._snapshots = {}
+        # The capacity of the tables and the number of entries evicted because of it
+        self.max_addresses = max_addresses
+        self.max_verified_peers = max_verified_peers
+        self.max_peers_per_service = max_peers_per_service
+        self.evicted_addresses = 0
+        self.evicted_peers = 0
+        # The NetworkObservers to notify of changes
+        self._observers = []
         # Peers we should not add to the network
         # For example, bootstrap peers
-        self.blacklist = []
+        self.blacklist = set()
         # Excluded mids
-        self.blacklist_mids = []
-
-        # Map of advertised services (set) per peer
-        self.services_per_peer = {}
+        self.blacklist_mids = set()
+
+        # Every advertised service is interned to a small integer, which is reused once no peer advertises it
+        self._service_indices = {}
+        self._services = []
+        self._service_counts = []
+        self._free_service_indices = []
+        # Map of peer mids to the bitmask of the (interned) services they advertised
+        self._service_masks = {}
+        # The services (frozenset) of every bitmask in use, shared by all peers with the same services
+        self._service_sets = {}
+        self._service_set_counts = {}
+        # Map of service identifiers to the verified peers (by mid) supporting them
+        self._peers_per_service = {}
         # Map of service identifiers to local overlays
         self.service_overlays = {}
+        # The version of our services, which changes whenever an overlay is registered
+        self.service_version = self._get_service_version()
+        # Map of peer mids to the version of the services they advertised
+        self._service_versions = {}
+
+    def _invalidate_snapshots(self):
+        """
+        Discard all snapshots, this needs to be called (while holding the graph_lock) after every change.
+
+        Invalidating only after a change has been applied ensures no intermediate state is left in the snapshots.
+        """
+        self._snapshots = {}
+
+    def _get_snapshot(self, key, build):
+        """
+        Get an immutable snapshot of some query result, building it if it does not exist yet.
+
+        Readers only take the graph_lock if the snapshot needs to be (re)built after a change.
+
+        :param key: the key of the query result
+        :param build: the function to build the snapshot with, while holding the graph_lock
+        :return: the snapshot
+        """
+        snapshots = self._snapshots
+        snapshot = snapshots.get(key)
+        if snapshot is None:
+            with self.graph_lock:
+                snapshot = build()
+            snapshots[key] = snapshot
+        return snapshot
+
+    def _set_introducer(self, address, mid):
+        """
+        Register an address as introduced by a certain peer, replacing its previous introducer.
+
+        :param address: the introduced address
+        :param mid: the (interned) mid of the introducer, or '' for no introducer
+        """
+        self._remove_address(address)
+        self._all_addresses[address] = mid
+        if mid:
+            self._introductions.setdefault(mid, set()).add(address)
+            self._notify_introduced(address, self._verified_by_address.get(address, ()))
+        self._add_walkable(address)
+        self._add_unverified(address)
+
+    def _remove_address(self, address):
+        """
+        Forget about a known address and its introducer.
+
+        :param address: the address to remove
+        """
+        self._remove_walkable(address)
+        self._unverified_order.pop(address, None)
+        introducer = self._all_addresses.pop(address, '')
+        if introducer:
+            introduced = self._introductions[introducer]
+            introduced.discard(address)
+            if not introduced:
+                del self._introductions[introducer]
+
+    def _services_of(self, mid):
+        """
+        Get the services advertised by a peer, this does not require the graph_lock.
+
+        :param mid: the mid of the peer
+        :return: the frozenset of service identifiers
+        """
+        return self._service_sets.get(self._service_masks.get(mid, 0), frozenset())
+
+    def _set_service_mask(self, mid, mask):
+        """
+        Change the bitmask of the services of a peer.
+
+        The services of the new bitmask are made available before the peer refers to it, so lock-free readers
+        always find them.
+
+        :param mid: the mid of the peer
+        :param mask: the new bitmask, 0 to remove the services of the peer
+        """
+        if mask:
+            if mask not in self._service_sets:
+                services = []
+                remaining = mask
+                while remaining:
+                    lowest = remaining & -remaining
+                    services.append(self._services[lowest.bit_length() - 1])
+                    remaining ^= lowest
+                self._service_sets[mask] = frozenset(services)
+            self._service_set_counts[mask] = self._service_set_counts.get(mask, 0) + 1
+            old_mask = self._service_masks.get(mid, 0)
+            self._service_masks[intern(mid)] = mask
+        else:
+            old_mask = self._service_masks.pop(mid, 0)
+        if old_mask:
+            self._service_set_counts[old_mask] -= 1
+            if not self._service_set_counts[old_mask]:
+                del self._service_set_counts[old_mask]
+                del self._service_sets[old_mask]
+
+    def _intern_service(self, service):
+        """
+        Get the index of a service which is advertised by one more peer, allocating an index if required.
+
+        :param service: the service identifier
+        :return: the index of the service
+        """
+        index = self._service_indices.get(service)
+        if index is None:
+            if self._free_service_indices:
+                index = self._free_service_indices.pop()
+                self._services[index] = service
+            else:
+                index = len(self._services)
+                self._services.append(service)
+                self._service_counts.append(0)
+            self._service_indices[service] = index
+        self._service_counts[index] += 1
+        return index
+
+    def _release_services(self, mask):
+        """
+        Register that one peer less advertises the services in a bitmask, freeing indices no longer in use.
+
+        :param mask: the bitmask of the services
+        """
+        while mask:
+            lowest = mask & -mask
+            index = lowest.bit_length() - 1
+            mask ^= lowest
+            self._service_counts[index] -= 1
+            if not self._service_counts[index]:
+                del self._service_indices[self._services[index]]
+                self._services[index] = None
+                self._free_service_indices.append(index)
+
+    def _add_walkable(self, address):
+        """
+        Make a known address walkable, if there is no verified peer using it.
+
+        :param address: the address to make walkable
+        """
+        if address not in self._all_addresses or address in self._verified_by_address:
+            return
+        self._walkable.add(address)
+        for service in self._services_of(self._all_addresses[address]):
+            self._walkable_per_service.setdefault(service, RandomAccessSet()).add(address)
+        self._invalidate_snapshots()
+
+    def _remove_walkable(self, address):
+        """
+        Make an address no longer walkable.
+
+        This needs to be called before the introducer or its services are changed.
+
+        :param address: the address to remove
+        """
+        if address not in self._walkable:
+            return
+        self._walkable.remove(address)
+        for service in self._services_of(self._all_addresses[address]):
+            walkable = self._walkable_per_service[service]
+            walkable.discard(address)
+            if not len(walkable):
+                del self._walkable_per_service[service]
+        self._invalidate_snapshots()
+
+    def _add_unverified(self, address):
+        """
+        Register an address as the most recently discovered address without a verified peer.
+
+        If this exceeds the maximum number of these addresses, the least valuable old address is evicted.
+
+        :param address: the address to register
+        """
+        if address not in self._all_addresses or address in self._verified_by_address:
+            return
+        self._unverified_order.pop(address, None)
+        self._unverified_order[address] = None
+        if self.max_addresses is not None and len(self._unverified_order) > self.max_addresses:
+            # Prefer the oldest address of which the introducer is gone, otherwise the oldest address
+            oldest = []
+            for candidate in self._unverified_order:
+                if len(oldest) == EVICTION_SAMPLE_SIZE:
+                    break
+                oldest.append(candidate)
+            stale = [candidate for candidate in oldest if self._all_addresses[candidate] not in self._known_mids]
+            self._remove_address(stale[0] if stale else oldest[0])
+            self.evicted_addresses += 1
+
+    def _eviction_score(self, peer):
+        """
+        Get the ordering key of a verified peer for eviction, the lowest scoring peer is evicted first.
+
+        Peers which never responded come first, then peers without services we provide, then the least
+        recently responding peers.
+
+        :param peer: the peer to score
+        :return: the sortable score of this peer
+        """
+        services = self._services_of(peer.mid)
+        return (peer.last_response != 0,
+                any(service in self.service_overlays for service in services),
+                peer.last_response)
+
+    def _evict_peer(self, candidates, keep):
+        """
+        Remove the lowest scoring peer out of a random sample of candidates.
+
+        :param candidates: the random sample of verified peers to choose from
+        :param keep: the peer which may not be evicted
+        """
+        candidates = [peer for peer in candidates if peer is not keep]
+        if candidates:
+            self.remove_peer(min(candidates, key=self._eviction_score))
+            self.evicted_peers += 1
+
+    def _enforce_peer_capacity(self, peer):
+        """
+        Evict other peers if a verified peer makes the network or one of its services exceed its capacity.
+
+        :param peer: the verified peer which was added or changed
+        """
+        if self.max_verified_peers is not None and len(self.verified_peers) > self.max_verified_peers:
+            self._evict_peer(sample(self.verified_peers, min(len(self.verified_peers), EVICTION_SAMPLE_SIZE)), peer)
+        if self.max_peers_per_service is not None:
+            for service in self._services_of(peer.mid):
+                peers = self._peers_per_service.get(service)
+                if peers is not None and len(peers) > self.max_peers_per_service:
+                    self._evict_peer(peers.sample(EVICTION_SAMPLE_SIZE), peer)
 
     def discover_address(self, peer, address):
         """
@@ -40,33 +355,145 @@ class Network(object):
             return
 
         self.graph_lock.acquire()
-        if (address not in self._all_addresses) or (not self.graph.has_node(self._all_addresses[address])):
+        introducer = intern(peer.mid)
+        if (address not in self._all_addresses) or (self._all_addresses[address] not in self._known_mids):
             # This is a new address, or our previous parent has been removed
-            self._all_addresses[address] = b64encode(peer.mid)
-
-        if not self.get_verified_by_address(address) and not self.graph.has_edge(self._all_addresses[address], address):
-            # Don't remap already verified peers and don't add an edge which already exists.
-            if address in self.graph.node and address not in self.graph.adj:
-                del self.graph.node[address]
-            self.graph.add_edge(b64encode(peer.mid), address, color='orange')
+            self._set_introducer(address, introducer)
+        self._known_mids.add(introducer)
         self.graph_lock.release()
 
         self.add_verified_peer(peer)
 
-    def discover_services(self, peer, services):
+    def discover_services(self, peer, services, version=None):
         """
         A peer has advertised some services he can use.
 
         :param peer: the peer to update the services for
         :param services: the list of services to register
+        :param version: the version of the complete list of services of the peer, if known
         """
         self.graph_lock.acquire()
-        if peer.public_key.key_to_bin() not in self.services_per_peer:
-            self.services_per_peer[peer.public_key.key_to_bin()] = set(services)
-        else:
-            self.services_per_peer[peer.public_key.key_to_bin()] |= set(services)
+        if version is not None:
+            self._service_versions[intern(peer.mid)] = version
+        known_mask = self._service_masks.get(peer.mid, 0)
+        new_services = []
+        for service in set(services):
+            index = self._service_indices.get(service)
+            if index is None or not (known_mask >> index) & 1:
+                new_services.append(service)
+        if not new_services:
+            # Nothing changed, keep our snapshots
+            self.graph_lock.release()
+            return
+        introduced = self._introductions.get(peer.mid, [])
+        for address in introduced:
+            self._remove_walkable(address)
+        mask = known_mask
+        for service in new_services:
+            mask |= 1 << self._intern_service(service)
+        self._set_service_mask(peer.mid, mask)
+        for address in introduced:
+            self._add_walkable(address)
+        verified = self._verified_by_key_bin.get(peer.key_bin)
+        if verified:
+            for service in new_services:
+                self._peers_per_service.setdefault(service, RandomAccessSet(key=attrgetter('mid'))).add(verified)
+        self._invalidate_snapshots()
+        if verified:
+            self._enforce_peer_capacity(verified)
         self.graph_lock.release()
 
+    def _index_verified_peer(self, peer):
+        """
+        Add a verified peer to the verified peers and their indexes.
+
+        :param peer: the peer to add
+        """
+        self.verified_peers.append(peer)
+        self._add_address_index(peer)
+        self._verified_by_mid[peer.mid] = peer
+        self._verified_by_key_bin[peer.key_bin] = peer
+        for service in self._services_of(peer.mid):
+            self._peers_per_service.setdefault(service, RandomAccessSet(key=attrgetter('mid'))).add(peer)
+        self._invalidate_snapshots()
+        for observer in self._observers:
+            observer.on_peer_added(peer)
+
+    def _unindex_verified_peer(self, peer):
+        """
+        Remove a verified peer from the verified peers and their indexes.
+
+        :param peer: the peer to remove
+        """
+        self.verified_peers.remove(peer)
+        self._remove_address_index(peer)
+        self._verified_by_mid.pop(peer.mid, None)
+        self._verified_by_key_bin.pop(peer.key_bin, None)
+        self._invalidate_snapshots()
+        for observer in self._observers:
+            observer.on_peer_removed(peer)
+
+    def _remove_services(self, peer):
+        """
+        Forget about the services of a peer.
+
+        :param peer: the peer to remove the services for
+        """
+        introduced = self._introductions.get(peer.mid, [])
+        for address in introduced:
+            self._remove_walkable(address)
+        for service in self._services_of(peer.mid):
+            peers = self._peers_per_service.get(service)
+            if peers is not None:
+                peers.discard(peer)
+                if not len(peers):
+                    del self._peers_per_service[service]
+        mask = self._service_masks.get(peer.mid, 0)
+        self._set_service_mask(peer.mid, 0)
+        self._release_services(mask)
+        self._service_versions.pop(peer.mid, None)
+        for address in introduced:
+            self._add_walkable(address)
+        self._invalidate_snapshots()
+
+    def _add_address_index(self, peer):
+        """
+        Add a verified peer to the index by address.
+
+        :param peer: the peer to add
+        """
+        self._remove_walkable(peer.address)
+        self._unverified_order.pop(peer.address, None)
+        self._verified_by_address[peer.address] = self._verified_by_address.get(peer.address, ()) + (peer, )
+        self._notify_introduced(peer.address, (peer, ))
+
+    def _notify_introduced(self, address, peers):
+        """
+        Notify the observers of verified peers using an introduced address.
+
+        :param address: the address which was introduced or is used by a new verified peer
+        :param peers: the verified peers using this address
+        """
+        introducer = self._all_addresses.get(address)
+        if introducer and self._observers:
+            for peer in peers:
+                for observer in self._observers:
+                    observer.on_introduced_peer(introducer, peer)
+
+    def _remove_address_index(self, peer):
+        """
+        Remove a verified peer from the index by address.
+
+        :param peer: the peer to remove
+        """
+        same_address = tuple(other for other in self._verified_by_address.get(peer.address, ()) if other is not peer)
+        if same_address:
+            self._verified_by_address[peer.address] = same_address
+        else:
+            self._verified_by_address.pop(peer.address, None)
+            self._add_walkable(peer.address)
+            self._add_unverified(peer.address)
+
     def add_verified_peer(self, peer):
         """
         The holepunching layer has a new peer for us.
@@ -77,29 +504,41 @@ class Network(object):
             return
         self.graph_lock.acquire()
         # This may just be an address update
-        for known in self.verified_peers:
-            if known.mid == peer.mid:
+        known = self._verified_by_mid.get(peer.mid)
+        if known:
+            if known.address != peer.address:
+                self._remove_address_index(known)
                 known.address = peer.address
-                self.graph_lock.release()
-                return
-        if peer.address in self._all_addresses and self.graph.has_node(peer.address):
-            introducer = self._all_addresses[peer.address]
-            self.graph.remove_node(peer.address)
-            self.graph.add_node(b64encode(peer.mid))
-            self.graph.add_edge(introducer, b64encode(peer.mid), color='green')
-            if peer not in self.verified_peers:
-                # This should always happen, unless someone edits the verified_peers dict directly.
-                # This would be a programmer 'error', but we will allow it.
-                self.verified_peers.append(peer)
-        elif (peer.address not in self.blacklist):
+                self._add_address_index(known)
+            self.graph_lock.release()
+            return
+        if peer.address in self._all_addresses or peer.address not in self.blacklist:
             if peer.address not in self._all_addresses:
                 self._all_addresses[peer.address] = ''
-            if not self.graph.has_node(b64encode(peer.mid)):
-                self.graph.add_node(b64encode(peer.mid))
-            if peer not in self.verified_peers:
-                self.verified_peers.append(peer)
+            self._known_mids.add(intern(peer.mid))
+            self._index_verified_peer(peer)
+            self._enforce_peer_capacity(peer)
         self.graph_lock.release()
 
+    def add_observer(self, observer):
+        """
+        Start notifying a NetworkObserver of changes.
+
+        :param observer: the NetworkObserver to add
+        """
+        with self.graph_lock:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Stop notifying a NetworkObserver of changes.
+
+        :param observer: the NetworkObserver to remove
+        """
+        with self.graph_lock:
+            if observer in self._observers:
+                self._observers.remove(observer)
+
     def register_service_provider(self, service_id, overlay):
         """
         Register an overlay to provide a certain service id.
@@ -109,22 +548,27 @@ class Network(object):
         """
         self.graph_lock.acquire()
         self.service_overlays[service_id] = overlay
+        self.service_version = self._get_service_version()
         self.graph_lock.release()
 
+    def _get_service_version(self):
+        """
+        Derive the version of our services from the registered service identifiers.
+
+        The version only depends on the services, so it does not change when we restart.
+
+        :return: the 32 bit version number, never 0 (which means no version in introduction responses)
+        """
+        return unpack(">I", sha1("".join(sorted(self.service_overlays))).digest()[:4])[0] or 1
+
     def get_peers_for_service(self, service_id):
         """
         Get peers which support a certain service.
 
         :param service_id: the service name/id to fetch peers for
         """
-        out = []
-        with self.graph_lock:
-            for peer in self.verified_peers:
-                key_bin = peer.public_key.key_to_bin()
-                if key_bin in self.services_per_peer:
-                    if service_id in self.services_per_peer[key_bin]:
-                        out.append(peer)
-        return out
+        return list(self._get_snapshot(('peers', service_id),
+                                       lambda: tuple(self._peers_per_service.get(service_id, ()))))
 
     def get_services_for_peer(self, peer):
         """
@@ -132,8 +576,16 @@ class Network(object):
 
         :param peer: the peer to check services for
         """
-        with self.graph_lock:
-            return self.services_per_peer.get(peer.public_key.key_to_bin(), set())
+        return self._services_of(peer.mid)
+
+    def get_service_version(self, peer):
+        """
+        Get the version of the services of a peer, when we last received its complete list of services.
+
+        :param peer: the peer to get the version for
+        :return: the version or None if it is unknown
+        """
+        return self._service_versions.get(peer.mid)
 
     def get_walkable_addresses(self, service_id=None):
         """
@@ -141,20 +593,57 @@ class Network(object):
 
         :param service_id: the service_id to filter on
         """
+        if service_id:
+            return list(self._get_snapshot(('walkable', service_id),
+                                           lambda: tuple(self._walkable_per_service.get(service_id, ()))))
+        return list(self._get_snapshot(('walkable', None), lambda: tuple(self._walkable)))
+
+    def get_random_walkable_address(self, service_id=None, exclude=()):
+        """
+        Get a random address ready to be walked to, in constant time.
+
+        :param service_id: the service_id to filter on
+        :param exclude: the addresses which may not be chosen
+        :return: a random (ip, port) address or None if there are no eligible addresses
+        """
         with self.graph_lock:
-            verified = [peer.address for peer in self.verified_peers]
-            out = list(set(self._all_addresses.keys()) - set(verified))
-            if service_id:
-                new_out = []
-                for address in out:
-                    b64mid_intro = self._all_addresses[address]
-                    encoded_services_per_peer = {b64encode(sha1(k).digest()): v for k, v in
-                                                 self.services_per_peer.iteritems()}
-                    services = encoded_services_per_peer.get(b64mid_intro, [])
-                    if service_id in services:
-                        new_out.append(address)
-                out = new_out
-            return out
+            walkable = self._walkable_per_service.get(service_id) if service_id else self._walkable
+            return walkable.choice(exclude) if walkable is not None else None
+
+    def sample_walkable_addresses(self, size, service_id=None):
+        """
+        Get a number of distinct random addresses ready to be walked to, with the peers that introduced them.
+
+        :param size: the maximum number of addresses to get
+        :param service_id: the service_id to filter on
+        :return: the list of ((ip, port) address, introducer mid) tuples, the mid is '' if there is no introducer
+        """
+        with self.graph_lock:
+            walkable = self._walkable_per_service.get(service_id) if service_id else self._walkable
+            if walkable is None:
+                return []
+            return [(address, self._all_addresses[address]) for address in walkable.sample(size)]
+
+    def get_introducer(self, address):
+        """
+        Get the peer that introduced an address.
+
+        :param address: the (ip, port) address
+        :return: the mid of the introducer, '' if there is no introducer or None if the address is unknown
+        """
+        return self._all_addresses.get(address)
+
+    def get_random_peer_for_service(self, service_id, exclude=()):
+        """
+        Get a random peer which supports a certain service, in constant time.
+
+        :param service_id: the service name/id to fetch a peer for
+        :param exclude: the peers which may not be chosen
+        :return: a random Peer or None if there are no eligible peers
+        """
+        with self.graph_lock:
+            peers = self._peers_per_service.get(service_id)
+            return peers.choice(exclude) if peers is not None else None
 
     def get_verified_by_address(self, address):
         """
@@ -163,13 +652,8 @@ class Network(object):
         :param address: the (IP, port) tuple to search for
         :return: the Peer object for this address or None
         """
-        self.graph_lock.acquire()
-        for i in range(len(self.verified_peers)):
-            if self.verified_peers[i].address == address:
-                out = self.verified_peers[i]
-                self.graph_lock.release()
-                return out
-        self.graph_lock.release()
+        same_address = self._verified_by_address.get(address)
+        return same_address[0] if same_address else None
 
     def get_verified_by_public_key_bin(self, public_key_bin):
         """
@@ -178,13 +662,16 @@ class Network(object):
         :param public_key_bin: the string representation of the public key
         :return: the Peer object for this public_key_bin or None
         """
-        self.graph_lock.acquire()
-        for i in range(len(self.verified_peers)):
-            if self.verified_peers[i].public_key.key_to_bin() == public_key_bin:
-                out = self.verified_peers[i]
-                self.graph_lock.release()
-                return out
-        self.graph_lock.release()
+        return self._verified_by_key_bin.get(public_key_bin)
+
+    def get_verified_by_mid(self, mid):
+        """
+        Get a verified Peer by its member id.
+
+        :param mid: the sha1 hash of the public key bin of the peer
+        :return: the Peer object for this mid or None
+        """
+        return self._verified_by_mid.get(mid)
 
     def get_introductions_from(self, peer):
         """
@@ -194,7 +681,7 @@ class Network(object):
         :return: a list of the introduced addresses (ip, port)
         """
         with self.graph_lock:
-            return [k for k, v in self._all_addresses.iteritems() if v == b64encode(peer.mid)]
+            return list(self._introductions.get(peer.mid, []))
 
     def remove_by_address(self, address):
         """
@@ -203,22 +690,11 @@ class Network(object):
         :param address: the (ip, port) address to remove
         """
         self.graph_lock.acquire()
-        if address in self._all_addresses:
-            del self._all_addresses[address]
-        to_remove = []
-        for i in range(len(self.verified_peers)):
-            if self.verified_peers[i].address == address:
-                to_remove.insert(0, i)
-                graph_node = b64encode(self.verified_peers[i].mid)
-                if self.graph.has_node(graph_node):
-                    self.graph.remove_node(graph_node)
-                key_bin = self.verified_peers[i].public_key.key_to_bin()
-                if key_bin in self.services_per_peer:
-                    del self.services_per_peer[key_bin]
-        for index in to_remove:
-            self.verified_peers.pop(index)
-        if self.graph.has_node(address):
-            self.graph.remove_node(address)
+        self._remove_address(address)
+        for peer in self._verified_by_address.get(address, ()):
+            self._known_mids.discard(peer.mid)
+            self._remove_services(peer)
+            self._unindex_verified_peer(peer)
         self.graph_lock.release()
 
     def remove_peer(self, peer):
@@ -228,18 +704,12 @@ class Network(object):
         :param peer: the Peer to remove
         """
         self.graph_lock.acquire()
-        if peer.address in self._all_addresses:
-            del self._all_addresses[peer.address]
-        if peer in self.verified_peers:
-            self.verified_peers.remove(peer)
-        graph_node = b64encode(peer.mid)
-        if self.graph.has_node(graph_node):
-            self.graph.remove_node(graph_node)
-        if self.graph.has_node(peer.address):
-            self.graph.remove_node(peer.address)
-        key_bin = peer.public_key.key_to_bin()
-        if key_bin in self.services_per_peer:
-            del self.services_per_peer[key_bin]
+        self._remove_address(peer.address)
+        known = self._verified_by_mid.get(peer.mid)
+        if known and known == peer:
+            self._unindex_verified_peer(known)
+        self._known_mids.discard(peer.mid)
+        self._remove_services(peer)
         self.graph_lock.release()
 
     def snapshot(self):
@@ -263,7 +733,6 @@ class Network(object):
         """
         snaplen = len(snapshot)
         if (snaplen % 6) != 0:
-            import logging
             logging.error("Snapshot has invalid length! Aborting snapshot load.")
             return
         with self.graph_lock:
@@ -271,16 +740,111 @@ class Network(object):
                 sub = snapshot[i:i+6]
                 ip = inet_ntoa(sub[0:4])
                 port = unpack(">H", sub[4:])[0]
-                self._all_addresses[(ip, port)] = ''
+                self._set_introducer((ip, port), '')
+
+    def export_peers(self):
+        """
+        Export all verified peers, including their public key, services, last response and introducer.
+
+        :return: the serialization (str) of all verified peers
+        """
+        out = []
+        with self.graph_lock:
+            for peer in self.verified_peers:
+                if not peer.address or peer.address == ('0.0.0.0', 0):
+                    continue
+                key_bin = peer.key_bin
+                services = [service for service in self._services_of(peer.mid) if len(service) < 256]
+                out.append(PEER_HEADER.pack(inet_aton(peer.address[0]), peer.address[1], peer.last_response,
+                                            self._all_addresses.get(peer.address, ''), len(key_bin),
+                                            len(services)))
+                out.append(key_bin)
+                for service in services:
+                    out.append(SERVICE_HEADER.pack(len(service)) + service)
+        return "".join(out)
+
+    def import_peers(self, serialization):
+        """
+        Load peers exported by export_peers() as verified peers.
+
+        The imported peers keep their last response time, so they are not considered alive before they respond.
+
+        :param serialization: the serialization (created by export_peers())
+        :return: the list of imported peers
+        """
+        crypto = ECCrypto()
+        peers = []
+        introducers = []
+        offset = 0
+        try:
+            while offset < len(serialization):
+                ip, port, last_response, introducer, key_length, service_count = \
+                    PEER_HEADER.unpack_from(serialization, offset)
+                offset += PEER_HEADER.size
+                key_bin = serialization[offset:offset + key_length]
+                offset += key_length
+                services = []
+                for _ in xrange(service_count):
+                    service_length, = SERVICE_HEADER.unpack_from(serialization, offset)
+                    offset += SERVICE_HEADER.size
+                    services.append(serialization[offset:offset + service_length])
+                    offset += service_length
+                if offset > len(serialization) or not crypto.is_valid_public_bin(key_bin):
+                    raise ValueError("Truncated or invalid peer")
+                peer = Peer(key_bin, (inet_ntoa(ip), port))
+                peer.last_response = last_response
+                peers.append((peer, services))
+                introducers.append(None if introducer == '\x00' * 20 else introducer)
+        except (StructError, ValueError):
+            logging.error("Exported peers are malformed! Aborting peer import.")
+            return []
+        with self.graph_lock:
+            for peer, services in peers:
+                if services:
+                    self.discover_services(peer, services)
+                self.add_verified_peer(peer)
+            for (peer, _), introducer in zip(peers, introducers):
+                if introducer in self._known_mids and not self._all_addresses.get(peer.address) \
+                        and peer.mid in self._verified_by_mid:
+                    self._set_introducer(peer.address, intern(introducer))
+        return [peer for peer, _ in peers if peer.mid in self._verified_by_mid]
+
+    def export_graph(self):
+        """
+        Export the known peers and introductions as a networkx graph.
+
+        This requires the optional networkx dependency.
+
+        :return: the networkx Graph of all known peers (b64 encoded mids) and unverified addresses
+        """
+        from networkx import Graph
+        graph = Graph()
+        with self.graph_lock:
+            for mid in self._known_mids:
+                graph.add_node(b64encode(mid))
+            for address, introducer in self._all_addresses.iteritems():
+                if introducer and introducer not in self._known_mids:
+                    introducer = ''
+                verified = self._verified_by_address.get(address, [])
+                for peer in verified:
+                    if introducer:
+                        graph.add_edge(b64encode(introducer), b64encode(peer.mid), color='green')
+                if not verified and introducer:
+                    graph.add_edge(b64encode(introducer), address, color='orange')
+        return graph
 
     def draw(self, filename="network_view.png"):
         """
         Draw this graph to a file, for debugging.
+
+        This requires the optional networkx and matplotlib dependencies.
         """
         import matplotlib.pyplot as plt
+        from networkx import draw, circular_layout
+        graph = self.export_graph()
         plt.clf()
-        pos = circular_layout(self.graph)
-        draw(self.graph, pos, with_labels=False, arrows=False, hold=False,
-             edge_color=[self.graph[u][v]['color'] for u,v in self.graph.edges()],
-             node_color=['orange' if v in self._all_addresses else 'green' for v in self.graph.nodes()])
+        pos = circular_layout(graph)
+        draw(graph, pos, with_labels=False, arrows=False, hold=False,
+             edge_color=[graph[u][v]['color'] for u,v in graph.edges()],
+             node_color=['orange' if v in self._all_addresses else 'green' for v in graph.nodes()])
         plt.savefig(filename)
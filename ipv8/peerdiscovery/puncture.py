@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from time import time
+
+
+class PunctureEntry(object):
+    """
+    The NAT mapping of a single address pair.
+    """
+
+    __slots__ = ['last_active', 'lifetime']
+
+    def __init__(self, last_active, lifetime):
+        self.last_active = last_active
+        self.lifetime = lifetime
+
+
+class PunctureCache(object):
+    """
+    Remember which address pairs recently punctured their NATs, and for how long the NAT mappings stay alive.
+
+    A mapping is refreshed by all traffic over it. The lifetime of a mapping starts out at a conservative default
+    and grows to the longest silence after which traffic still came through it.
+    """
+
+    def __init__(self, max_size=4096, lifetime=30.0, max_lifetime=120.0, margin=5.0):
+        """
+        Create a new PunctureCache.
+
+        :param max_size: the maximum number of address pairs to remember
+        :param lifetime: the lifetime of mappings which have not been observed yet, in seconds
+        :param max_lifetime: the maximum lifetime of mappings, in seconds
+        :param margin: the time before the end of the lifetime of a mapping it is no longer trusted to be alive
+        """
+        self.max_size = max_size
+        self.lifetime = lifetime
+        self.max_lifetime = max_lifetime
+        self.margin = margin
+        self._entries = OrderedDict()
+
+    def _touch(self, pair):
+        entry = self._entries.pop(pair, None)
+        if entry is None:
+            entry = PunctureEntry(None, self.lifetime)
+        self._entries[pair] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def punctured(self, pair, now=None):
+        """
+        Register that traffic was sent for an address pair, opening or refreshing its mapping.
+
+        :param pair: the (local address, remote address) tuple
+        :param now: the current time, by default time()
+        """
+        self._touch(pair).last_active = time() if now is None else now
+
+    def seen(self, pair, now=None):
+        """
+        Register that traffic came through the mapping of an address pair.
+
+        :param pair: the (local address, remote address) tuple
+        :param now: the current time, by default time()
+        """
+        now = time() if now is None else now
+        entry = self._touch(pair)
+        if entry.last_active is not None:
+            # The mapping survived this silence
+            entry.lifetime = max(entry.lifetime, min(self.max_lifetime, now - entry.last_active))
+        entry.last_active = now
+
+    def get_keep_alive_time(self, pair):
+        """
+        Get the time the mapping of an address pair needs traffic to stay alive.
+
+        :param pair: the (local address, remote address) tuple
+        :return: the time or None if the mapping is unknown
+        """
+        entry = self._entries.get(pair)
+        if entry is None or entry.last_active is None:
+            return None
+        return entry.last_active + entry.lifetime - self.margin
+
+    def is_alive(self, pair, now=None):
+        """
+        Is the mapping of an address pair known to be alive, so it doesn't need to be punctured.
+
+        :param pair: the (local address, remote address) tuple
+        :param now: the current time, by default time()
+        """
+        keep_alive_time = self.get_keep_alive_time(pair)
+        return keep_alive_time is not None and (time() if now is None else now) < keep_alive_time
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from random import random
+from time import time
+
+
+class AddressStatistics(object):
+    """
+    The outcomes of the walks to a single address.
+    """
+
+    __slots__ = ['attempts', 'responses', 'failures', 'last_seen', 'quarantined_until']
+
+    def __init__(self):
+        self.attempts = 0
+        self.responses = 0
+        # The number of consecutive failed walks
+        self.failures = 0
+        self.last_seen = None
+        self.quarantined_until = 0
+
+
+class AddressScores(object):
+    """
+    Score walkable addresses by their response rate, the reputation of their introducer and their freshness.
+
+    Addresses which keep failing are quarantined for exponentially increasing periods of time. The statistics
+    outlive the addresses in the Network, so an unreachable address which is introduced again stays quarantined.
+    """
+
+    def __init__(self, max_size=10000, quarantine_failures=2, quarantine_time=60.0, max_quarantine_time=3600.0,
+                 freshness_time=300.0):
+        """
+        Create a new AddressScores.
+
+        :param max_size: the maximum number of addresses and introducers to keep statistics of
+        :param quarantine_failures: the number of consecutive failures after which an address is quarantined
+        :param quarantine_time: the time an address is quarantined for at first, in seconds
+        :param max_quarantine_time: the maximum time an address is quarantined for, in seconds
+        :param freshness_time: the time after which an address which responded is no longer considered fresh
+        """
+        self.max_size = max_size
+        self.quarantine_failures = quarantine_failures
+        self.quarantine_time = quarantine_time
+        self.max_quarantine_time = max_quarantine_time
+        self.freshness_time = freshness_time
+        self._addresses = OrderedDict()
+        # Map of introducer mids to [attempts, responses] of the walks to their introductions
+        self._introducers = OrderedDict()
+
+    def _touch(self, table, key, default):
+        value = table.pop(key, None)
+        if value is None:
+            value = default()
+        table[key] = value
+        while len(table) > self.max_size:
+            table.popitem(last=False)
+        return value
+
+    def record(self, address, introducer, responded, now=None):
+        """
+        Register the outcome of a walk to an address.
+
+        :param address: the (ip, port) address which was walked to
+        :param introducer: the mid of the peer which introduced the address, or None if unknown
+        :param responded: whether the address responded in time
+        :param now: the current time, by default time()
+        """
+        now = time() if now is None else now
+        statistics = self._touch(self._addresses, address, AddressStatistics)
+        statistics.attempts += 1
+        if responded:
+            statistics.responses += 1
+            statistics.failures = 0
+            statistics.last_seen = now
+            statistics.quarantined_until = 0
+        else:
+            statistics.failures += 1
+            if statistics.failures >= self.quarantine_failures:
+                period = self.quarantine_time * 2 ** (statistics.failures - self.quarantine_failures)
+                statistics.quarantined_until = now + min(self.max_quarantine_time, period)
+        if introducer:
+            reputation = self._touch(self._introducers, introducer, lambda: [0, 0])
+            reputation[0] += 1
+            reputation[1] += int(responded)
+
+    def is_quarantined(self, address, now=None):
+        """
+        Should we refrain from walking to an address.
+
+        :param address: the (ip, port) address to check
+        :param now: the current time, by default time()
+        """
+        statistics = self._addresses.get(address)
+        return statistics is not None and statistics.quarantined_until > (time() if now is None else now)
+
+    def score(self, address, introducer, now=None):
+        """
+        Get the relative probability of a walk to an address succeeding.
+
+        Unknown addresses and introducers get a neutral response rate of 0.5.
+
+        :param address: the (ip, port) address to score
+        :param introducer: the mid of the peer which introduced the address, or None if unknown
+        :param now: the current time, by default time()
+        :return: the score, larger is better
+        """
+        now = time() if now is None else now
+        statistics = self._addresses.get(address)
+        if statistics is None:
+            response_rate = 0.5
+            freshness = 0.0
+        else:
+            response_rate = (statistics.responses + 1) / float(statistics.attempts + 2)
+            freshness = max(0.0, 1.0 - (now - statistics.last_seen) / self.freshness_time) \
+                if statistics.last_seen is not None else 0.0
+        attempts, responses = self._introducers.get(introducer, (0, 0))
+        reputation = (responses + 1) / float(attempts + 2)
+        return response_rate * reputation * (1.0 + freshness)
+
+    def choose(self, candidates, now=None):
+        """
+        Choose one of the candidate addresses at random, weighted by their score, skipping quarantined addresses.
+
+        :param candidates: the list of (address, introducer mid) tuples to choose from
+        :param now: the current time, by default time()
+        :return: the chosen address or None if all candidates are quarantined
+        """
+        now = time() if now is None else now
+        scored = [(address, self.score(address, introducer, now)) for address, introducer in candidates
+                  if not self.is_quarantined(address, now)]
+        remaining = random() * sum(score for _, score in scored)
+        for address, score in scored:
+            remaining -= score
+            if remaining <= 0:
+                return address
+        return scored[-1][0] if scored else None
+
+    def __len__(self):
+        return len(self._addresses)
@@ -0,0 +1,224 @@
+from binascii import hexlify
+from collections import OrderedDict
+from heapq import nsmallest
+from threading import Lock
+from time import time
+
+from .network import NetworkObserver
+
+
+def mid_to_long(mid):
+    """
+    Convert a mid to a number, so XOR distances can be computed.
+
+    :param mid: the 20 byte mid
+    """
+    return long(hexlify(mid), 16)
+
+
+def distance(mid1, mid2):
+    """
+    Get the XOR distance between two mids.
+    """
+    return mid_to_long(mid1) ^ mid_to_long(mid2)
+
+
+class RoutingTable(NetworkObserver):
+    """
+    A Kademlia routing table of k-buckets, filled with the verified peers of a Network.
+
+    Bucket i holds the peers at an XOR distance in [2^i, 2^(i+1)) from us. Full buckets keep their longest known
+    peers: a slot only frees up when the Network removes a peer (for instance, when it stops responding to pings).
+    The most recent peers which did not fit in a bucket are kept as replacements, to fill the freed slots.
+    """
+
+    def __init__(self, my_mid, network, bucket_size=8):
+        """
+        Create a new RoutingTable and start following the verified peers of a Network.
+
+        :param my_mid: the mid of our own peer
+        :param network: the Network to take the peers from
+        :param bucket_size: the maximum number of peers per bucket (k)
+        """
+        self.my_mid = my_mid
+        self.network = network
+        self.bucket_size = bucket_size
+        self._my_id = mid_to_long(my_mid)
+        self._buckets = [OrderedDict() for _ in xrange(len(my_mid) * 8)]
+        self._replacements = [OrderedDict() for _ in xrange(len(my_mid) * 8)]
+        self._lock = Lock()
+
+        network.add_observer(self)
+        with network.graph_lock:
+            for peer in network.verified_peers:
+                self.on_peer_added(peer)
+
+    def unload(self):
+        """
+        Stop following the Network.
+        """
+        self.network.remove_observer(self)
+
+    def _bucket_index(self, mid):
+        """
+        Get the index of the bucket a mid belongs in, or -1 for our own mid.
+        """
+        return (self._my_id ^ mid_to_long(mid)).bit_length() - 1
+
+    def on_peer_added(self, peer):
+        index = self._bucket_index(peer.mid)
+        if index < 0:
+            return
+        with self._lock:
+            bucket = self._buckets[index]
+            if peer.mid in bucket:
+                return
+            if len(bucket) < self.bucket_size:
+                bucket[peer.mid] = peer
+            else:
+                replacements = self._replacements[index]
+                replacements.pop(peer.mid, None)
+                replacements[peer.mid] = peer
+                if len(replacements) > self.bucket_size:
+                    replacements.popitem(last=False)
+
+    def on_peer_removed(self, peer):
+        index = self._bucket_index(peer.mid)
+        if index < 0:
+            return
+        with self._lock:
+            bucket = self._buckets[index]
+            replacements = self._replacements[index]
+            if bucket.get(peer.mid) is peer:
+                del bucket[peer.mid]
+                if replacements:
+                    # Promote the most recent replacement
+                    mid, replacement = replacements.popitem()
+                    bucket[mid] = replacement
+            elif replacements.get(peer.mid) is peer:
+                del replacements[peer.mid]
+
+    def closest(self, target, count=None, exclude=()):
+        """
+        Get the peers closest to a mid, by XOR distance.
+
+        :param target: the mid to find the closest peers of
+        :param count: the maximum number of peers to return, by default the bucket size
+        :param exclude: the addresses of the peers which may not be returned
+        :return: the list of Peers, closest first
+        """
+        target_id = mid_to_long(target)
+        with self._lock:
+            peers = [peer for bucket in self._buckets for peer in bucket.itervalues() if peer.address not in exclude]
+        return nsmallest(count or self.bucket_size, peers, key=lambda peer: mid_to_long(peer.mid) ^ target_id)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(bucket) for bucket in self._buckets)
+
+
+class Lookup(object):
+    """
+    The state of an iterative lookup of a single mid.
+
+    The shortlist holds the closest nodes we heard of. Every step, up to alpha of the closest nodes which were not
+    queried yet are queried in parallel. The lookup ends once the target is found, or once the closest nodes have
+    all been queried without getting any closer.
+
+    Responses are unauthenticated, so only responses to pending queries are accepted, from the queried address. If
+    a node is reported at multiple addresses, the address reported by the node closest to the target wins.
+    """
+
+    def __init__(self, target, bucket_size=8, alpha=3, timeout=3.0):
+        """
+        Create a new Lookup.
+
+        :param target: the mid to look up
+        :param bucket_size: the number of closest nodes to query before giving up (k)
+        :param alpha: the maximum number of parallel queries
+        :param timeout: the time to wait for a node to respond
+        """
+        self.target = target
+        self.bucket_size = bucket_size
+        self.alpha = alpha
+        self.timeout = timeout
+        self._target_id = mid_to_long(target)
+        # Map of mid to the address of every node we heard of
+        self._shortlist = {}
+        # Map of mid to the distance to the target of the node which reported its address, -1 if we knew it
+        self._reporters = {}
+        self._queried = set()
+        # Map of mid to the (address, time) a query was sent to, for the queries we are waiting for
+        self._pending = {}
+        self._lock = Lock()
+        # The number of find requests this lookup sent
+        self.queries = 0
+
+    def add_nodes(self, nodes, responder=None, source_address=None):
+        """
+        Add the nodes a queried node told us about.
+
+        :param nodes: the list of (mid, address) tuples
+        :param responder: the mid of the node which responded, or None for the nodes we know ourselves
+        :param source_address: the address the response came from
+        :return: whether the nodes were accepted, which requires a pending query to the responder at this address
+        """
+        with self._lock:
+            if responder is None:
+                reporter_distance = -1
+            else:
+                pending = self._pending.get(responder)
+                if pending is None or pending[0] != source_address:
+                    return False
+                del self._pending[responder]
+                reporter_distance = mid_to_long(responder) ^ self._target_id
+            for mid, address in nodes:
+                if address == ("0.0.0.0", 0) or mid in self._queried:
+                    continue
+                if reporter_distance < self._reporters.get(mid, reporter_distance + 1):
+                    self._shortlist[mid] = address
+                    self._reporters[mid] = reporter_distance
+            return True
+
+    def get_address(self, mid):
+        """
+        Get the address a node is known by.
+
+        :param mid: the mid of the node
+        :return: the (ip, port) address or None
+        """
+        return self._shortlist.get(mid)
+
+    def _closest(self):
+        return nsmallest(self.bucket_size, self._shortlist.iteritems(),
+                         key=lambda item: mid_to_long(item[0]) ^ self._target_id)
+
+    def next_queries(self, now=None):
+        """
+        Claim the nodes to query now, expiring the queries which timed out.
+
+        :param now: the current time, by default time()
+        :return: the list of (mid, address) tuples to query
+        """
+        now = time() if now is None else now
+        with self._lock:
+            for mid, (_, sent) in self._pending.items():
+                if now - sent > self.timeout:
+                    del self._pending[mid]
+            free = self.alpha - len(self._pending)
+            queries = [(mid, address) for mid, address in self._closest()
+                       if mid not in self._queried and mid != self.target][:max(0, free)]
+            for mid, address in queries:
+                self._queried.add(mid)
+                self._pending[mid] = (address, now)
+            self.queries += len(queries)
+            return queries
+
+    @property
+    def exhausted(self):
+        """
+        Have all of the closest nodes been queried, without any queries pending.
+        """
+        with self._lock:
+            return not self._pending and all(mid in self._queried or mid == self.target
+                                             for mid, _ in self._closest())
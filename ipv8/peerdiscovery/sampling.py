@@ -0,0 +1,103 @@
+from random import randrange, sample
+
+# The number of random draws before we fall back to filtering out the excluded items
+CHOICE_ATTEMPTS = 8
+
+
+class RandomAccessSet(object):
+    """
+    A set which supports adding, removing and choosing a random item in constant time.
+
+    The items are stored in a list, while a map keeps the position of every item in that list.
+    """
+
+    def __init__(self, items=(), key=None):
+        """
+        Create a new RandomAccessSet.
+
+        :param items: the initial items of this set
+        :param key: the function to get the (immutable) identity of an item with, by default the item itself
+        """
+        self._items = []
+        self._positions = {}
+        self._key = key or (lambda item: item)
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """
+        Add an item to this set, replacing an item with the same identity.
+
+        :param item: the item to add
+        """
+        key = self._key(item)
+        position = self._positions.get(key)
+        if position is None:
+            self._positions[key] = len(self._items)
+            self._items.append(item)
+        else:
+            self._items[position] = item
+
+    def discard(self, item):
+        """
+        Remove an item from this set, if it exists.
+
+        :param item: the item (or an item with the same identity) to remove
+        """
+        position = self._positions.pop(self._key(item), None)
+        if position is None:
+            return
+        last = self._items.pop()
+        if position < len(self._items):
+            # Move the last item into the hole
+            self._items[position] = last
+            self._positions[self._key(last)] = position
+
+    def remove(self, item):
+        """
+        Remove an item from this set.
+
+        :param item: the item (or an item with the same identity) to remove
+        :raises KeyError: if the item does not exist
+        """
+        if self._key(item) not in self._positions:
+            raise KeyError(item)
+        self.discard(item)
+
+    def choice(self, exclude=()):
+        """
+        Get a random item which is not excluded.
+
+        This takes constant time, unless most of the items are excluded.
+
+        :param exclude: the items (supporting the in operator) which may not be chosen
+        :return: a random item or None if there are no eligible items
+        """
+        if not self._items:
+            return None
+        for _ in xrange(CHOICE_ATTEMPTS):
+            item = self._items[randrange(len(self._items))]
+            if item not in exclude:
+                return item
+        eligible = [item for item in self._items if item not in exclude]
+        return eligible[randrange(len(eligible))] if eligible else None
+
+    def sample(self, size):
+        """
+        Get a number of distinct random items.
+
+        :param size: the maximum number of items to draw
+        :return: the list of drawn items
+        """
+        if size >= len(self._items):
+            return list(self._items)
+        return [self._items[i] for i in sample(xrange(len(self._items)), size)]
+
+    def __contains__(self, item):
+        return self._key(item) in self._positions
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
@@ -0,0 +1,119 @@
+from time import time
+
+
+class WalkScheduler(object):
+    """
+    Decide when every discovery strategy should take its next step.
+
+    Strategies of overlays which are far below their target number of peers step faster than the walker
+    interval, strategies of satisfied overlays back off exponentially. Overlays which cannot find any peers only back
+    off once they have been without peers for a while, so a cold start is never slower than the walker interval.
+    An optional global rate limit caps the number of steps per second over all strategies.
+    """
+
+    def __init__(self, walker_interval, max_steps_per_second=None, min_interval_factor=0.25,
+                 max_interval_factor=16.0, empty_backoff_time=90.0):
+        """
+        Create a new WalkScheduler.
+
+        :param walker_interval: the default time between the steps of a strategy
+        :param max_steps_per_second: the maximum number of steps of all strategies per second, or None for no limit
+        :param min_interval_factor: the fraction of the walker interval a starving strategy may step at
+        :param max_interval_factor: the multiple of the walker interval a strategy may back off to
+        :param empty_backoff_time: the time an overlay may be without peers before its strategies back off, by
+                                   default three bootstrap timeouts
+        """
+        self.walker_interval = walker_interval
+        self.max_steps_per_second = max_steps_per_second
+        self.min_interval = walker_interval * min_interval_factor
+        self.max_interval = walker_interval * max_interval_factor
+        self.empty_backoff_time = empty_backoff_time
+        self._next_step = {}
+        self._intervals = {}
+        # Map of strategy to the time its overlay was first seen without peers, since it last had peers
+        self._empty_since = {}
+        self._rotation = 0
+        self._tokens = max_steps_per_second or 0
+        self._last_refill = time()
+
+    @property
+    def tick_interval(self):
+        """
+        The time between checks for due strategies.
+        """
+        return self.min_interval
+
+    def order(self, strategies):
+        """
+        Rotate a list of strategies, so all strategies get to use the global rate limit in turn.
+
+        :param strategies: the list of (strategy, target_peers) tuples
+        :return: the rotated list
+        """
+        if not strategies:
+            return []
+        self._rotation = (self._rotation + 1) % len(strategies)
+        return strategies[self._rotation:] + strategies[:self._rotation]
+
+    def is_due(self, strategy, now):
+        """
+        Should a strategy take a step now.
+
+        :param strategy: the strategy to check
+        :param now: the current time
+        """
+        return self._next_step.get(strategy, 0) <= now
+
+    def take_token(self, now):
+        """
+        Claim a step under the global rate limit.
+
+        :param now: the current time
+        :return: whether a step may be taken
+        """
+        if self.max_steps_per_second is None:
+            return True
+        self._tokens = min(self.max_steps_per_second,
+                           self._tokens + (now - self._last_refill) * self.max_steps_per_second)
+        self._last_refill = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def schedule(self, strategy, peer_count, target_peers, now):
+        """
+        Determine when a strategy should take its next step, given the number of peers of its overlay.
+
+        :param strategy: the strategy which was checked
+        :param peer_count: the current number of peers of the overlay of the strategy
+        :param target_peers: the target number of peers of the strategy, or -1 to always step
+        :param now: the current time
+        """
+        if peer_count == 0:
+            empty_since = self._empty_since.setdefault(strategy, now)
+        else:
+            empty_since = self._empty_since.pop(strategy, None)
+        if target_peers == -1:
+            interval = self.walker_interval
+        elif peer_count >= target_peers:
+            # Satisfied, back off
+            interval = min(self.max_interval, self._intervals.get(strategy, self.walker_interval) * 2)
+        elif empty_since is not None and now - empty_since >= self.empty_backoff_time:
+            # We have been failing to find any peer (bootstrapping is failing) for a while, back off
+            interval = min(self.max_interval, max(self.walker_interval, self._intervals.get(strategy, 0) * 2))
+        else:
+            # Step faster the further we are below the target
+            interval = max(self.min_interval, self.walker_interval * peer_count / float(target_peers))
+        self._intervals[strategy] = interval
+        self._next_step[strategy] = now + interval
+
+    def remove(self, strategy):
+        """
+        Forget about a strategy.
+
+        :param strategy: the strategy to remove
+        """
+        self._next_step.pop(strategy, None)
+        self._intervals.pop(strategy, None)
+        self._empty_since.pop(strategy, None)
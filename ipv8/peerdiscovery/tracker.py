@@ -0,0 +1,294 @@
+"""
+A bootstrap server (tracker) which answers the introduction requests of all overlays, without running them.
+"""
+import logging
+from random import sample
+from time import time
+
+from twisted.internet import reactor
+
+from ..deprecated.payload import IntroductionRequestPayload, IntroductionResponsePayload, PunctureRequestPayload
+from ..deprecated.payload_headers import BinMemberAuthenticationPayload, GlobalTimeDistributionPayload
+from ..keyvault.crypto import ECCrypto
+from ..messaging.interfaces.endpoint import EndpointListener
+from ..messaging.serialization import Serializer
+from .deprecated.discovery_payload import DiscoveryIntroductionRequestPayload
+from .puncture import PunctureCache
+
+
+class TrackerPeer(object):
+    """
+    The little a tracker remembers of a peer.
+    """
+
+    __slots__ = ['address', 'public_key_bin', 'key', 'services', 'last_seen']
+
+    def __init__(self, address, public_key_bin, key, last_seen):
+        self.address = address
+        self.public_key_bin = public_key_bin
+        self.key = key
+        self.services = set()
+        self.last_seen = last_seen
+
+
+class TrackerTable(object):
+    """
+    A lean peer table, which only stores the address, key, services and last activity of every peer.
+
+    Every service keeps a list of its peers, so random peers can be drawn and removed in constant time.
+    """
+
+    def __init__(self, peer_timeout=120.0):
+        """
+        Create a new TrackerTable.
+
+        :param peer_timeout: the time after which a peer which did not contact us is forgotten, in seconds
+        """
+        self.peer_timeout = peer_timeout
+        # Map of address to TrackerPeer
+        self._peers = {}
+        # Map of service id to the list of TrackerPeers in that service
+        self._service_peers = {}
+        # Map of service id to a map of address to the index of its TrackerPeer in the service list
+        self._service_indices = {}
+
+    def get(self, address):
+        """
+        Get the peer at an address, if any.
+
+        :param address: the (ip, port) address of the peer
+        :return: the TrackerPeer or None
+        """
+        return self._peers.get(address)
+
+    def update(self, address, public_key_bin, key, service, now):
+        """
+        Register that a peer contacted us for a service.
+
+        :param address: the (ip, port) address the peer contacted us from
+        :param public_key_bin: the serialized public key of the peer
+        :param key: the public key object of the peer
+        :param service: the service id the peer contacted us for
+        :param now: the current time
+        :return: the TrackerPeer
+        """
+        peer = self._peers.get(address)
+        if peer is None or peer.public_key_bin != public_key_bin:
+            # A new peer, or a new identity at a known address
+            self.remove(address)
+            peer = self._peers[address] = TrackerPeer(address, public_key_bin, key, now)
+        peer.last_seen = now
+        if service not in peer.services:
+            peer.services.add(service)
+            peers = self._service_peers.setdefault(service, [])
+            self._service_indices.setdefault(service, {})[address] = len(peers)
+            peers.append(peer)
+        return peer
+
+    def remove(self, address):
+        """
+        Forget about the peer at an address.
+
+        :param address: the (ip, port) address of the peer
+        """
+        peer = self._peers.pop(address, None)
+        if peer is None:
+            return
+        for service in peer.services:
+            peers = self._service_peers[service]
+            indices = self._service_indices[service]
+            # Move the last peer into the slot of the removed peer
+            index = indices.pop(address)
+            last = peers.pop()
+            if last is not peer:
+                peers[index] = last
+                indices[last.address] = index
+            if not peers:
+                del self._service_peers[service]
+                del self._service_indices[service]
+
+    def expire(self, now):
+        """
+        Forget about all peers which did not contact us within the peer timeout.
+
+        :param now: the current time
+        """
+        deadline = now - self.peer_timeout
+        for address in [address for address, peer in self._peers.iteritems() if peer.last_seen < deadline]:
+            self.remove(address)
+
+    def sample(self, service, count, exclude=None):
+        """
+        Draw random peers of a service.
+
+        :param service: the service id to draw peers from
+        :param count: the maximum number of peers to draw
+        :param exclude: the address of a peer which may not be drawn
+        :return: a list of at most count distinct TrackerPeers
+        """
+        peers = self._service_peers.get(service, [])
+        size = min(len(peers), count + 1)
+        chosen = [peers[index] for index in sample(xrange(len(peers)), size)]
+        return [peer for peer in chosen if peer.address != exclude][:count]
+
+    def get_peers_for_service(self, service):
+        """
+        Get all peers of a service.
+
+        :param service: the service id to get the peers of
+        :return: the list of TrackerPeers
+        """
+        return list(self._service_peers.get(service, []))
+
+    def __len__(self):
+        return len(self._peers)
+
+
+class TrackerEndpointListener(EndpointListener):
+    """
+    Answer the introduction requests of every overlay, without running the overlays themselves.
+
+    Incoming requests are queued and answered in batches, once per reactor iteration or once the batch is full.
+    The parsed keys of known peers are reused to verify their requests and everything but the signature of a
+    response is packed from precomputed parts.
+    """
+
+    version = '\x02'
+
+    def __init__(self, endpoint, key=None, peer_timeout=120.0, batch_size=256, expire_interval=10.0):
+        """
+        Create a new TrackerEndpointListener and start listening to the endpoint.
+
+        :param endpoint: the endpoint to answer introduction requests on
+        :param key: the private key to sign responses with, by default a new (fast) curve25519 key
+        :param peer_timeout: the time after which a peer which did not contact us is forgotten, in seconds
+        :param batch_size: the maximum number of requests to answer at once
+        :param expire_interval: the time between checks for peers which timed out, in seconds
+        """
+        super(TrackerEndpointListener, self).__init__(endpoint)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.crypto = ECCrypto()
+        self.serializer = Serializer()
+        self.key = key or self.crypto.generate_key(u"curve25519")
+        self.table = TrackerTable(peer_timeout)
+        # The (introduced, walker) address pairs we recently sent puncture requests for
+        self.punctures = PunctureCache()
+        self.batch_size = batch_size
+        self.expire_interval = expire_interval
+        self.global_time = 0
+
+        # Every response carries the same authentication, so it is only packed once
+        self._auth = self.serializer.pack_multiple(
+            BinMemberAuthenticationPayload(self.key.pub().key_to_bin()).to_pack_list())
+        self._queue = []
+        self._flush_call = None
+        self._last_expire = time()
+
+        self.endpoint.add_listener(self)
+
+    def unload(self):
+        """
+        Stop answering introduction requests.
+        """
+        self.endpoint.remove_listener(self)
+        if self._flush_call and self._flush_call.active():
+            self._flush_call.cancel()
+        self._queue = []
+
+    def on_packet(self, packet):
+        source_address, data = packet
+        if len(data) < 23 or data[0] != '\x00' or data[1] != self.version or data[22] != chr(246):
+            return
+        self._queue.append(packet)
+        if len(self._queue) >= self.batch_size:
+            self.flush()
+        elif not self._flush_call or not self._flush_call.active():
+            self._flush_call = reactor.callLater(0, self.flush)
+
+    def flush(self):
+        """
+        Answer all queued introduction requests.
+        """
+        queue, self._queue = self._queue, []
+        now = time()
+        if now - self._last_expire > self.expire_interval:
+            self.table.expire(now)
+            self._last_expire = now
+        for source_address, data in queue:
+            try:
+                self.on_introduction_request(source_address, data, now)
+            except Exception as e:
+                self.logger.debug("Dropping introduction request from %s: %s", source_address, e)
+
+    def _unpack_payload(self, payload_class, data):
+        dist, payload, unknown_data = self.serializer.unpack_to_serializables(
+            [GlobalTimeDistributionPayload, payload_class], data)
+        if unknown_data:
+            raise ValueError("Incoming packet %s has extra data" % payload_class.__name__)
+        return payload
+
+    def on_introduction_request(self, source_address, data, now):
+        """
+        Answer an introduction request, of any overlay.
+
+        :param source_address: the (ip, port) address the request came from
+        :param data: the request packet
+        :param now: the current time
+        """
+        auth, _ = self.serializer.unpack_to_serializables([BinMemberAuthenticationPayload, ], data[23:])
+        public_key_bin = auth.public_key_bin
+        peer = self.table.get(source_address)
+        if peer is not None and peer.public_key_bin == public_key_bin:
+            # Only the parsed key is reused, addresses and keys are public so every request is verified
+            key = peer.key
+        else:
+            key = self.crypto.key_from_public_bin(public_key_bin)
+        signature_length = self.crypto.get_signature_length(key)
+        if not self.crypto.is_valid_signature(key, data[:-signature_length], data[-signature_length:]):
+            raise ValueError("Invalid signature")
+
+        remainder = data[25 + len(public_key_bin):-signature_length]
+        try:
+            payload = self._unpack_payload(IntroductionRequestPayload, remainder)
+        except Exception:
+            # Older discovery clients put the peer they want to be introduced to in front of the request
+            payload = self._unpack_payload(DiscoveryIntroductionRequestPayload, remainder)
+
+        prefix = data[:22]
+        service = data[2:22]
+        introductions = self.table.sample(service, 1 + payload.extra_introductions, source_address)
+        self.table.update(source_address, public_key_bin, key, service, now)
+
+        addresses = [self._introduce(prefix, introduction.address, payload.source_lan_address, source_address,
+                                     payload.identifier)
+                     for introduction in introductions]
+        introduction_lan, introduction_wan = addresses.pop(0) if addresses else (("0.0.0.0", 0), ("0.0.0.0", 0))
+        self.global_time += 1
+        response = IntroductionResponsePayload(source_address, self.my_estimated_lan, self.my_estimated_wan,
+                                               introduction_lan, introduction_wan, u"unknown", False,
+                                               payload.identifier, None, addresses)
+        packet = prefix + chr(245) + self._auth + self.serializer.pack_multiple(
+            GlobalTimeDistributionPayload(self.global_time).to_pack_list() + response.to_pack_list())
+        self.endpoint.send(source_address, packet + self.crypto.create_signature(self.key, packet))
+
+    def _introduce(self, prefix, address, lan_walker_address, wan_walker_address, identifier):
+        """
+        Ask an introduced peer to puncture the NAT towards the peer we introduce it to.
+
+        :return: the (lan, wan) introduction addresses of the introduced peer
+        """
+        introduction_lan = ("0.0.0.0", 0)
+        if self.address_is_lan(address[0]):
+            introduction_lan = address
+            introduction_wan = (self.my_estimated_wan[0], address[1])
+        else:
+            introduction_wan = address
+        pair = (address, wan_walker_address)
+        if not self.punctures.is_alive(pair):
+            self.punctures.punctured(pair)
+            self.global_time += 1
+            packet = prefix + chr(250) + self.serializer.pack_multiple(
+                GlobalTimeDistributionPayload(self.global_time).to_pack_list() +
+                PunctureRequestPayload(lan_walker_address, wan_walker_address, identifier).to_pack_list())
+            self.endpoint.send(address, packet)
+        return introduction_lan, introduction_wan
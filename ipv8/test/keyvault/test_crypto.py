@@ -1,5 +1,6 @@
 import unittest
 
+from ...keyvault import crypto
 from ...keyvault.crypto import ECCrypto
 from ...keyvault.keys import Key, PrivateKey, PublicKey
 from ...keyvault.private.m2crypto import M2CryptoPK, M2CryptoSK
@@ -131,3 +132,28 @@ class TestECCrypto(unittest.TestCase):
         Check if ECCrypto detects a valid public libnacl key as a public key.
         """
         self.assertTrue(self.ecc.is_valid_public_bin(TestECCrypto.libnacl_key.pub().key_to_bin()))
+
+    def test_key_from_public_bin_cached(self):
+        """
+        Check if ECCrypto instances share the parsed public keys.
+        """
+        public_bin = TestECCrypto.libnacl_key.pub().key_to_bin()
+
+        self.assertIs(self.ecc.key_from_public_bin(public_bin), ECCrypto().key_from_public_bin(public_bin))
+
+    def test_key_from_public_bin_evict(self):
+        """
+        Check if the least recently used public key is evicted from a full cache.
+        """
+        old_size = crypto.PUBLIC_KEY_CACHE_SIZE
+        crypto.PUBLIC_KEY_CACHE_SIZE = 1
+        try:
+            m2crypto_bin = self.ecc.generate_key(u"very-low").pub().key_to_bin()
+            libnacl_bin = self.ecc.generate_key(u"curve25519").pub().key_to_bin()
+            m2crypto_pk = self.ecc.key_from_public_bin(m2crypto_bin)
+            libnacl_pk = self.ecc.key_from_public_bin(libnacl_bin)
+
+            self.assertIsNot(m2crypto_pk, self.ecc.key_from_public_bin(m2crypto_bin))
+            self.assertIsNot(libnacl_pk, self.ecc.key_from_public_bin(libnacl_bin))
+        finally:
+            crypto.PUBLIC_KEY_CACHE_SIZE = old_size
@@ -86,6 +86,24 @@ class TestTunnelCommunity(TestBase):
         self.assertEqual(len(self.nodes[0].overlay.exit_candidates), 0)
         self.assertEqual(len(self.nodes[1].overlay.exit_candidates), 0)
 
+    @twisted_wrapper
+    def test_skip_redundant_puncture(self):
+        """
+        Check if an introducer doesn't ask a peer to puncture its NAT again, while its mapping should still be alive.
+        """
+        self.nodes[0].network.add_verified_peer(self.nodes[1].my_peer)
+        self.nodes[0].network.discover_services(self.nodes[1].my_peer, [self.nodes[0].overlay.master_peer.mid])
+        walker = self.create_node()
+        self.nodes.append(walker)
+        sniffer = MockEndpointListener(self.nodes[1].endpoint)
+
+        walker.overlay.walk_to(self.nodes[0].endpoint.wan_address)
+        yield self.deliver_messages()
+        walker.overlay.walk_to(self.nodes[0].endpoint.wan_address)
+        yield self.deliver_messages()
+
+        self.assertEqual(1, len([data for _, data in sniffer.received_packets if data[22] == chr(250)]))
+
     @twisted_wrapper
     def test_create_circuit(self):
         """
@@ -1,7 +1,7 @@
 import socket
 
 from .....messaging.interfaces.endpoint import EndpointListener
-from .....messaging.interfaces.udp.endpoint import UDPEndpoint, UDP_MAX_SIZE
+from .....messaging.interfaces.udp.endpoint import MultiUDPEndpoint, UDPEndpoint, UDP_MAX_SIZE
 from .....test.util import twisted_wrapper
 from ....base import TestBase
 
@@ -125,3 +125,92 @@ class TestUDPEndpoint(TestBase):
         self.assertEqual(len(self.endpoint2_listener.incoming), 101)
         self.assertSetEqual({data for _, data in self.endpoint2_listener.incoming},
                             {str(i) for i in xrange(2, 103)})
+
+
+class TestMultiUDPEndpoint(TestBase):
+    """
+    This class contains various tests for the multi-homed UDP endpoint.
+    """
+
+    def setUp(self):
+        super(TestMultiUDPEndpoint, self).setUp()
+        self.endpoint1 = MultiUDPEndpoint([("127.0.0.1", 8082), ("127.0.0.1", 8083)])
+        self.endpoint1.open()
+        self.endpoint2 = UDPEndpoint(8084)
+        self.endpoint2.open()
+
+        self.endpoint1_listener = DummyEndpointListener(self.endpoint1)
+        self.endpoint1.add_listener(self.endpoint1_listener)
+        self.endpoint2_listener = DummyEndpointListener(self.endpoint2)
+        self.endpoint2.add_listener(self.endpoint2_listener)
+
+    @twisted_wrapper
+    def tearDown(self):
+        super(TestMultiUDPEndpoint, self).tearDown()
+
+        yield self.endpoint1.close()
+        yield self.endpoint2.close()
+
+    @twisted_wrapper
+    def test_receive_all_sockets(self):
+        """
+        Test if messages arriving on any of the sockets are delivered to the listeners.
+        """
+        for _, port in self.endpoint1.get_addresses():
+            self.endpoint2.send(("127.0.0.1", port), 'a' * 10)
+        yield self.sleep(0.05)
+        self.assertEqual(len(self.endpoint1_listener.incoming), 2)
+
+    @twisted_wrapper
+    def test_send_message(self):
+        """
+        Test sending a basic message through the multi-homed endpoint.
+        """
+        self.endpoint1.send(("127.0.0.1", 8084), 'a' * 10)
+        yield self.sleep(0.05)
+        self.assertTrue(self.endpoint2_listener.incoming)
+
+    @twisted_wrapper
+    def test_reply_same_socket(self):
+        """
+        Test if we respond to a peer over the socket it last reached us on.
+        """
+        target = self.endpoint1.endpoints[1]
+        self.endpoint2.send(target.get_address(), 'a' * 10)
+        yield self.sleep(0.05)
+        self.endpoint1.send(("127.0.0.1", 8084), 'b' * 10)
+        yield self.sleep(0.05)
+
+        self.assertEqual(self.endpoint1.get_route(("127.0.0.1", 8084)), target)
+        self.assertEqual(self.endpoint2_listener.incoming[0][0][1], target.get_address()[1])
+
+    def test_route_by_hash(self):
+        """
+        Test if unknown destinations are spread over the sockets deterministically.
+        """
+        route = self.endpoint1.get_route(("1.2.3.4", 5))
+
+        self.assertIn(route, self.endpoint1.endpoints)
+        self.assertEqual(route, self.endpoint1.get_route(("1.2.3.4", 5)))
+
+    def test_max_routes(self):
+        """
+        Test if the amount of remembered routes is bounded.
+        """
+        self.endpoint1.max_routes = 2
+        for i in xrange(5):
+            self.endpoint1.on_datagram(self.endpoint1.endpoints[0], 'a', ("1.2.3.4", i))
+
+        self.assertEqual(len(self.endpoint1._routes), 2)
+
+    def test_max_routes_least_recent(self):
+        """
+        Test if the least recently used route is forgotten when there are too many routes.
+        """
+        self.endpoint1.max_routes = 2
+        self.endpoint1.on_datagram(self.endpoint1.endpoints[1], 'a', ("1.2.3.4", 0))
+        self.endpoint1.on_datagram(self.endpoint1.endpoints[1], 'a', ("1.2.3.4", 1))
+        self.endpoint1.get_route(("1.2.3.4", 0))
+        self.endpoint1.on_datagram(self.endpoint1.endpoints[1], 'a', ("1.2.3.4", 2))
+
+        self.assertListEqual([("1.2.3.4", 0), ("1.2.3.4", 2)], self.endpoint1._routes.keys())
@@ -0,0 +1,157 @@
+import os
+import socket
+import stat
+
+from twisted.test.proto_helpers import StringTransport
+
+from .....messaging.interfaces.udp.endpoint import UDPEndpoint, UDP_MAX_SIZE
+from .....messaging.interfaces.unix.endpoint import encode_frame, FramedPacketProtocol, UnixEndpoint, \
+    UnixEndpointServer
+from .....test.util import twisted_wrapper
+from ....base import TestBase
+from ..udp.test_endpoint import DummyEndpointListener
+
+
+class TestUnixEndpoint(TestBase):
+    """
+    This class contains various tests for the Unix domain socket endpoint.
+    """
+
+    def setUp(self):
+        super(TestUnixEndpoint, self).setUp()
+        self.path = os.path.join(self.temporary_directory(), "ipv8.sock")
+
+        self.shared_endpoint = UDPEndpoint(8085)
+        self.shared_endpoint.open()
+        self.server = UnixEndpointServer(self.shared_endpoint, self.path)
+        self.server.start()
+
+        self.remote_endpoint = UDPEndpoint(8086)
+        self.remote_endpoint.open()
+        self.remote_listener = DummyEndpointListener(self.remote_endpoint)
+        self.remote_endpoint.add_listener(self.remote_listener)
+
+        self.local_endpoint = UnixEndpoint(self.path)
+        self.local_listener = DummyEndpointListener(self.local_endpoint)
+        self.local_endpoint.add_listener(self.local_listener)
+
+    @twisted_wrapper
+    def tearDown(self):
+        yield self.local_endpoint.close()
+        yield self.server.stop()
+        yield self.shared_endpoint.close()
+        yield self.remote_endpoint.close()
+
+        # This removes the temporary directory holding the socket, so we do this last
+        super(TestUnixEndpoint, self).tearDown()
+
+    @twisted_wrapper
+    def test_send_message(self):
+        """
+        Test sending a message from a co-located process through the shared endpoint.
+        """
+        yield self.local_endpoint.open()
+        self.local_endpoint.send(("127.0.0.1", 8086), 'a' * 10)
+        yield self.sleep(0.05)
+
+        self.assertEqual(len(self.remote_listener.incoming), 1)
+        self.assertEqual(self.remote_listener.incoming[0][1], 'a' * 10)
+
+    @twisted_wrapper
+    def test_send_before_connected(self):
+        """
+        Test if messages sent while connecting are delivered once connected.
+        """
+        deferred = self.local_endpoint.open()
+        self.local_endpoint.send(("127.0.0.1", 8086), 'a' * 10)
+        yield deferred
+        yield self.sleep(0.05)
+
+        self.assertEqual(len(self.remote_listener.incoming), 1)
+
+    @twisted_wrapper
+    def test_send_batch(self):
+        """
+        Test sending a batch of messages from a co-located process through the shared endpoint.
+        """
+        yield self.local_endpoint.open()
+        self.local_endpoint.send_batch([(("127.0.0.1", 8086), str(i)) for i in xrange(50)])
+        yield self.sleep(0.05)
+
+        self.assertSetEqual({data for _, data in self.remote_listener.incoming}, {str(i) for i in xrange(50)})
+
+    @twisted_wrapper
+    def test_receive_message(self):
+        """
+        Test if messages arriving at the shared endpoint are delivered to co-located processes.
+        """
+        yield self.local_endpoint.open()
+        yield self.sleep(0.05)
+        self.remote_endpoint.send(("127.0.0.1", 8085), 'a' * 10)
+        yield self.sleep(0.05)
+
+        self.assertEqual(len(self.local_listener.incoming), 1)
+        self.assertEqual(self.local_listener.incoming[0], (("127.0.0.1", 8086), 'a' * 10))
+
+    def test_frame_decode_partial(self):
+        """
+        Test if frames split over multiple reads are reassembled.
+        """
+        received = []
+        framed = FramedPacketProtocol(lambda address, packet: received.append((address, packet)))
+        data = encode_frame(("1.2.3.4", 5), 'a' * 10) + encode_frame(("6.7.8.9", 10), 'b' * 20)
+
+        framed.dataReceived(data[:7])
+        framed.dataReceived(data[7:30])
+        framed.dataReceived(data[30:])
+
+        self.assertListEqual(received, [(("1.2.3.4", 5), 'a' * 10), (("6.7.8.9", 10), 'b' * 20)])
+
+    def test_frame_no_size_limit(self):
+        """
+        Test if frames are not limited to the maximum UDP size.
+        """
+        received = []
+        framed = FramedPacketProtocol(lambda address, packet: received.append((address, packet)))
+
+        framed.dataReceived(encode_frame(("1.2.3.4", 5), 'a' * (UDP_MAX_SIZE * 2)))
+
+        self.assertEqual(len(received[0][1]), UDP_MAX_SIZE * 2)
+
+    def test_frame_oversized(self):
+        """
+        Test if a frame larger than the maximum frame size drops the connection, without waiting for its data.
+        """
+        received = []
+        framed = FramedPacketProtocol(lambda address, packet: received.append((address, packet)), max_frame_size=10)
+        framed.makeConnection(StringTransport())
+
+        framed.dataReceived(encode_frame(("1.2.3.4", 5), 'a' * 10) + encode_frame(("6.7.8.9", 10), 'b' * 11)[:20])
+
+        self.assertListEqual(received, [(("1.2.3.4", 5), 'a' * 10)])
+        self.assertTrue(framed.transport.disconnecting)
+
+    def test_socket_mode(self):
+        """
+        Test if only our own user can connect to the socket.
+        """
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    @twisted_wrapper
+    def test_stale_socket(self):
+        """
+        Test if the socket file of a process which did not shut down cleanly is replaced.
+        """
+        yield self.server.stop()
+        # A crashed process leaves its socket file and a lock file pointing to its (no longer valid) pid behind
+        stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale_socket.bind(self.path)
+        stale_socket.close()
+        os.symlink(str(2 ** 22 + 1), self.path + ".lock")
+        self.server.start()
+
+        yield self.local_endpoint.open()
+        self.local_endpoint.send(("127.0.0.1", 8086), 'a' * 10)
+        yield self.sleep(0.05)
+
+        self.assertEqual(len(self.remote_listener.incoming), 1)
@@ -20,4 +20,4 @@ class MockCommunity(DiscoveryCommunity):
 
     def bootstrap(self):
         super(MockCommunity, self).bootstrap()
-        self.last_bootstrap = 0
+        self.bootstrap_coordinator.reset(self)
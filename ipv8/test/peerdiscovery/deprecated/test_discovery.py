@@ -1,7 +1,9 @@
 from ....deprecated.community import _DEFAULT_ADDRESSES
+from ....deprecated.payload import IntroductionRequestPayload, IntroductionResponsePayload
 from ....deprecated.payload_headers import BinMemberAuthenticationPayload, GlobalTimeDistributionPayload
 from ...base import TestBase
 from ...mocking.community import MockCommunity
+from ...mocking.endpoint import MockEndpointListener
 from ....peerdiscovery.deprecated.discovery_payload import DiscoveryIntroductionRequestPayload
 from ...util import twisted_wrapper
 
@@ -68,3 +70,131 @@ class TestDiscoveryCommunity(TestBase):
             self.assertEqual(len(intros), 1)
             self.assertNotIn(overlay.my_peer.mid, intros)
             self.assertNotIn(self.tracker.my_peer.mid, intros)
+
+    @twisted_wrapper
+    def test_introduction_rtt(self):
+        """
+        Check if an introduction response updates the round-trip time of the responding peer.
+        """
+        self.overlays[0].walk_to(self.overlays[1].endpoint.wan_address)
+        yield self.deliver_messages()
+
+        peer = self.overlays[0].network.get_verified_by_address(self.overlays[1].endpoint.wan_address)
+        self.assertIsNotNone(peer.srtt)
+
+    def _similarity_requests(self, sniffer):
+        return [data for _, data in sniffer.received_packets if data[22] == chr(1)]
+
+    @twisted_wrapper
+    def test_similarity_unchanged(self):
+        """
+        Check if the services of a peer are only requested once, if they do not change.
+        """
+        sniffer = MockEndpointListener(self.overlays[1].endpoint)
+        address = self.overlays[1].endpoint.wan_address
+
+        self.overlays[0].walk_to(address)
+        yield self.deliver_messages()
+        self.overlays[0].walk_to(address)
+        yield self.deliver_messages()
+
+        peer = self.overlays[0].network.get_verified_by_address(address)
+        self.assertEqual(1, len(self._similarity_requests(sniffer)))
+        self.assertEqual(self.overlays[1].network.service_version, self.overlays[0].network.get_service_version(peer))
+
+    @twisted_wrapper
+    def test_similarity_changed(self):
+        """
+        Check if the services of a peer are requested again, once they change.
+        """
+        sniffer = MockEndpointListener(self.overlays[1].endpoint)
+        address = self.overlays[1].endpoint.wan_address
+
+        self.overlays[0].walk_to(address)
+        yield self.deliver_messages()
+        self.overlays[1].network.register_service_provider("a" * 20, self.overlays[1])
+        self.overlays[0].walk_to(address)
+        yield self.deliver_messages()
+
+        peer = self.overlays[0].network.get_verified_by_address(address)
+        self.assertEqual(2, len(self._similarity_requests(sniffer)))
+        self.assertIn("a" * 20, self.overlays[0].network.get_services_for_peer(peer))
+
+    def _introduce_to_tracker(self, count):
+        peers = []
+        for _ in range(count):
+            overlay = MockCommunity()
+            self.overlays.append(overlay)
+            self.tracker.network.add_verified_peer(overlay.my_peer)
+            self.tracker.network.discover_services(overlay.my_peer, [self.tracker.master_peer.mid])
+            peers.append(overlay.my_peer)
+        return peers
+
+    @twisted_wrapper
+    def test_multiple_introductions(self):
+        """
+        Check if we get multiple introductions at once, while we have few peers.
+        """
+        self._introduce_to_tracker(4)
+
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        self.assertEqual(4, len(self.overlays[0].network.get_introductions_from(self.tracker.my_peer)))
+
+    @twisted_wrapper
+    def test_single_introduction(self):
+        """
+        Check if we get a single introduction if we don't ask for more.
+        """
+        self._introduce_to_tracker(4)
+        self.overlays[0].max_introductions = 1
+
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        self.assertEqual(1, len(self.overlays[0].network.get_introductions_from(self.tracker.my_peer)))
+
+    def test_introduction_payloads(self):
+        """
+        Check if the optional fields of introduction requests and responses survive serialization.
+        """
+        serializer = self.tracker.serializer
+        request = IntroductionRequestPayload(("1.2.3.4", 1), ("1.2.3.4", 2), ("1.2.3.4", 3), True, u"unknown",
+                                             None, 42, True, 3)
+        response = IntroductionResponsePayload(("1.2.3.4", 1), ("1.2.3.4", 2), ("1.2.3.4", 3), ("0.0.0.0", 0),
+                                               ("5.6.7.8", 4), u"unknown", False, 42, None,
+                                               [(("0.0.0.0", 0), ("5.6.7.8", 5)), (("10.0.0.1", 6), ("5.6.7.8", 6))])
+        legacy = IntroductionResponsePayload(("1.2.3.4", 1), ("1.2.3.4", 2), ("1.2.3.4", 3), ("0.0.0.0", 0),
+                                             ("5.6.7.8", 4), u"unknown", False, 42)
+
+        request, = serializer.unpack_to_serializables([IntroductionRequestPayload],
+                                                      serializer.pack_multiple(request.to_pack_list()))[:1]
+        response, = serializer.unpack_to_serializables([IntroductionResponsePayload],
+                                                       serializer.pack_multiple(response.to_pack_list()))[:1]
+        legacy, = serializer.unpack_to_serializables([IntroductionResponsePayload],
+                                                     serializer.pack_multiple(legacy.to_pack_list()))[:1]
+
+        self.assertTrue(request.supports_service_version)
+        self.assertEqual(3, request.extra_introductions)
+        self.assertIsNone(response.service_version)
+        self.assertListEqual([(("0.0.0.0", 0), ("5.6.7.8", 5)), (("10.0.0.1", 6), ("5.6.7.8", 6))],
+                             response.extra_introductions)
+        self.assertIsNone(legacy.service_version)
+        self.assertListEqual([], legacy.extra_introductions)
+
+    @twisted_wrapper
+    def test_skip_redundant_puncture(self):
+        """
+        Check if we don't ask a peer to puncture its NAT again, while its mapping should still be alive.
+        """
+        self._introduce_to_tracker(1)
+        self.overlays[0].max_introductions = 1
+        sniffer = MockEndpointListener(self.overlays[2].endpoint)
+
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        self.assertEqual(1, len([data for _, data in sniffer.received_packets if data[22] == chr(250)]))
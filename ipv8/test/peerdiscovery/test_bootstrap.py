@@ -0,0 +1,194 @@
+import os
+from time import time
+
+from twisted.internet.defer import fail, succeed
+from twisted.names import dns
+from twisted.names.error import DNSNameError
+
+from ...peerdiscovery.bootstrap import BootstrapCoordinator, BootstrapResolver
+from ..base import TestBase
+from ..util import twisted_wrapper
+
+
+class FakeLookup(object):
+
+    def __init__(self, records, ttl=60):
+        self.records = records
+        self.ttl = ttl
+        self.queries = []
+
+    def __call__(self, hostname, timeout=None):
+        self.queries.append(hostname)
+        if hostname not in self.records:
+            return fail(DNSNameError(hostname))
+        return succeed(([dns.RRHeader(name=hostname, type=dns.A, ttl=self.ttl,
+                                      payload=dns.Record_A(ip, self.ttl)) for ip in self.records[hostname]], [], []))
+
+
+class TestBootstrapResolver(TestBase):
+    """
+    This class contains various tests for the bootstrap DNS resolution.
+    """
+
+    def setUp(self):
+        super(TestBootstrapResolver, self).setUp()
+        self.lookup = FakeLookup({"a.example": ["1.2.3.4", "5.6.7.8"], "b.example": ["1.2.3.4"]})
+        self.resolver = BootstrapResolver(lookup=self.lookup)
+
+    @twisted_wrapper
+    def test_resolve(self):
+        """
+        Check if all addresses are resolved and deduplicated.
+        """
+        addresses = yield self.resolver.resolve([("a.example", 1), ("b.example", 1), ("b.example", 2)])
+
+        self.assertListEqual([("1.2.3.4", 1), ("5.6.7.8", 1), ("1.2.3.4", 2)], addresses)
+
+    @twisted_wrapper
+    def test_resolve_failure(self):
+        """
+        Check if unresolvable addresses are skipped.
+        """
+        addresses = yield self.resolver.resolve([("c.example", 1), ("b.example", 1)])
+
+        self.assertListEqual([("1.2.3.4", 1)], addresses)
+
+    @twisted_wrapper
+    def test_cached(self):
+        """
+        Check if addresses are not resolved again before their TTL expires.
+        """
+        yield self.resolver.resolve_hostname("a.example")
+        yield self.resolver.resolve_hostname("a.example")
+
+        self.assertListEqual(["a.example"], self.lookup.queries)
+
+    @twisted_wrapper
+    def test_expired(self):
+        """
+        Check if addresses are resolved again after their TTL expires.
+        """
+        self.lookup.ttl = 1
+        yield self.resolver.resolve_hostname("a.example")
+        self.resolver._cache["a.example"] = (["1.2.3.4"], time() - 1)
+        yield self.resolver.resolve_hostname("a.example")
+
+        self.assertListEqual(["a.example", "a.example"], self.lookup.queries)
+
+    @twisted_wrapper
+    def test_zero_ttl(self):
+        """
+        Check if addresses with a TTL of 0 are not cached.
+        """
+        self.lookup.ttl = 0
+        ips = yield self.resolver.resolve_hostname("a.example")
+        yield self.resolver.resolve_hostname("a.example")
+
+        self.assertListEqual(["1.2.3.4", "5.6.7.8"], ips)
+        self.assertListEqual(["a.example", "a.example"], self.lookup.queries)
+        self.assertNotIn("a.example", self.resolver._cache)
+
+    @twisted_wrapper
+    def test_expired_fallback(self):
+        """
+        Check if expired addresses are used if the hostname can no longer be resolved.
+        """
+        self.resolver._cache["c.example"] = (["9.9.9.9"], time() - 1)
+
+        ips = yield self.resolver.resolve_hostname("c.example")
+
+        self.assertListEqual(["9.9.9.9"], ips)
+
+    @twisted_wrapper
+    def test_disk_cache(self):
+        """
+        Check if resolved addresses are loaded from disk by another resolver.
+        """
+        path = os.path.join(self.temporary_directory(), "dns.json")
+        yield BootstrapResolver(path, lookup=self.lookup).resolve([("a.example", 1)])
+
+        ips = yield BootstrapResolver(path, lookup=FakeLookup({})).resolve_hostname("a.example")
+
+        self.assertListEqual(["1.2.3.4", "5.6.7.8"], ips)
+
+    @twisted_wrapper
+    def test_set_cache_path(self):
+        """
+        Check if setting a cache file loads its addresses, without replacing more recently resolved addresses.
+        """
+        path = os.path.join(self.temporary_directory(), "dns.json")
+        yield BootstrapResolver(path, lookup=self.lookup).resolve([("a.example", 1), ("b.example", 1)])
+        self.resolver._cache["b.example"] = (["9.9.9.9"], time() + 120)
+
+        self.resolver.set_cache_path(path)
+
+        self.assertListEqual(["1.2.3.4", "5.6.7.8"], self.resolver._cache["a.example"][0])
+        self.assertListEqual(["9.9.9.9"], self.resolver._cache["b.example"][0])
+
+
+class FakeOverlay(object):
+    pass
+
+
+class TestBootstrapCoordinator(TestBase):
+    """
+    This class contains various tests for the scheduling of bootstraps.
+    """
+
+    def setUp(self):
+        super(TestBootstrapCoordinator, self).setUp()
+        self.coordinator = BootstrapCoordinator(interval=30.0, fanout=2)
+        self.trackers = [("1.1.1.1", 1), ("2.2.2.2", 2), ("3.3.3.3", 3)]
+        self.overlay = FakeOverlay()
+
+    def test_contact_all_unknown(self):
+        """
+        Check if all trackers are contacted when none of them is known to respond.
+        """
+        self.assertListEqual(self.trackers, self.coordinator.request_bootstrap(self.overlay, self.trackers, 0))
+
+    def test_interval(self):
+        """
+        Check if an overlay bootstraps at most once every interval.
+        """
+        self.coordinator.request_bootstrap(self.overlay, self.trackers, 0)
+
+        self.assertListEqual([], self.coordinator.request_bootstrap(self.overlay, self.trackers, 29))
+        self.assertNotEqual([], self.coordinator.request_bootstrap(self.overlay, self.trackers, 30))
+
+    def test_reset(self):
+        """
+        Check if a reset overlay may bootstrap immediately.
+        """
+        self.coordinator.request_bootstrap(self.overlay, self.trackers, 0)
+        self.coordinator.reset(self.overlay)
+
+        self.assertNotEqual([], self.coordinator.request_bootstrap(self.overlay, self.trackers, 10))
+
+    def test_prefer_responsive(self):
+        """
+        Check if trackers which responded faster are preferred, by all overlays.
+        """
+        self.coordinator.request_bootstrap(self.overlay, self.trackers, 0)
+        self.coordinator.on_response(self.overlay, self.trackers[2], 0.1)
+        self.coordinator.on_response(self.overlay, self.trackers[1], 0.5)
+
+        other = FakeOverlay()
+
+        self.assertListEqual([self.trackers[2], self.trackers[1]],
+                             self.coordinator.request_bootstrap(other, self.trackers, 10))
+
+    def test_response_statistics(self):
+        """
+        Check if only responses to outstanding requests are counted.
+        """
+        self.coordinator.request_bootstrap(self.overlay, self.trackers, 0)
+        self.coordinator.on_response(self.overlay, self.trackers[0], 0.2)
+        self.coordinator.on_response(self.overlay, self.trackers[0], 0.3)
+        self.coordinator.on_response(self.overlay, ("4.4.4.4", 4), 0.3)
+
+        tracker = self.coordinator.trackers[self.trackers[0]]
+        self.assertEqual(1, tracker.requests)
+        self.assertEqual(1, tracker.responses)
+        self.assertAlmostEqual(0.2, tracker.latency)
+        self.assertNotIn(("4.4.4.4", 4), self.coordinator.trackers)
@@ -0,0 +1,52 @@
+import os
+
+from ...peerdiscovery.cache import PeerCache
+from ...peerdiscovery.network import Network
+from ..base import TestBase
+from .test_network import _generate_peer
+
+
+class TestPeerCache(TestBase):
+    """
+    This class contains various tests for the persistent peer cache.
+    """
+
+    def setUp(self):
+        super(TestPeerCache, self).setUp()
+        self.path = os.path.join(self.temporary_directory(), "peers.bin")
+        self.network = Network()
+        self.cache = PeerCache(self.network, self.path)
+
+    def tearDown(self):
+        self.cache.shutdown_task_manager()
+        super(TestPeerCache, self).tearDown()
+
+    def test_load_missing(self):
+        """
+        Check if nothing is loaded if no peers have been saved.
+        """
+        self.assertListEqual([], self.cache.load())
+
+    def test_save_load(self):
+        """
+        Check if saved peers are loaded into another Network.
+        """
+        peer = _generate_peer()
+        self.network.add_verified_peer(peer)
+        self.cache.save()
+
+        network = Network()
+        PeerCache(network, self.path).load()
+
+        self.assertListEqual([peer], network.verified_peers)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_stop_saves(self):
+        """
+        Check if the peers are saved when the cache is stopped.
+        """
+        self.cache.start(3600.0)
+        self.network.add_verified_peer(_generate_peer())
+        self.cache.stop()
+
+        self.assertTrue(os.path.isfile(self.path))
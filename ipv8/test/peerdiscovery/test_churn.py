@@ -1,5 +1,7 @@
 import time
 
+from ...keyvault.crypto import ECCrypto
+from ...peer import Peer
 from ...peerdiscovery.churn import RandomChurn
 from ...deprecated.community import _DEFAULT_ADDRESSES
 from ..base import TestBase
@@ -22,6 +24,16 @@ class TestChurn(TestBase):
         for overlay in self.overlays:
             overlay.unload()
 
+    def test_unload(self):
+        """
+        Check if an unloaded strategy no longer tracks the peers added to the (shared) Network.
+        """
+        self.strategies[0].unload()
+        self.overlays[0].network.add_verified_peer(self.overlays[1].my_peer)
+
+        self.assertEqual(0, len(self.strategies[0]._added))
+        self.assertNotIn(self.strategies[0], self.overlays[0].network._observers)
+
     @twisted_wrapper
     def test_keep_reachable(self):
         """
@@ -43,6 +55,70 @@ class TestChurn(TestBase):
 
         self.assertEqual(len(self.overlays[0].network.verified_peers), 1)
 
+    @twisted_wrapper
+    def test_ping_measures_rtt(self):
+        """
+        Check if the pong of a pinged node updates its round-trip time.
+        """
+        peer = self.overlays[1].my_peer
+        peer.last_response = time.time() - 30
+        self.overlays[0].network.add_verified_peer(peer)
+
+        self.strategies[0].take_step()
+
+        yield self.deliver_messages()
+
+        self.assertIsNotNone(self.overlays[0].network.get_verified_by_mid(peer.mid).srtt)
+
+    @twisted_wrapper
+    def test_keep_alive(self):
+        """
+        Check if an active node is pinged when the NAT mapping towards it is about to expire.
+        """
+        peer = self.overlays[1].my_peer
+        peer.last_response = time.time()
+        self.overlays[0].network.add_verified_peer(peer)
+        self.overlays[0].punctures.punctured((self.overlays[0].my_estimated_lan, peer.address), time.time() - 26)
+        sniffer = MockEndpointListener(self.overlays[1].endpoint)
+
+        self.strategies[0].take_step()
+
+        yield self.deliver_messages()
+
+        self.assertEqual(len(sniffer.received_packets), 1)
+        self.assertTrue(self.overlays[0].punctures.is_alive((self.overlays[0].my_estimated_lan, peer.address)))
+
+    @twisted_wrapper
+    def test_no_keep_alive(self):
+        """
+        Check if an active node is not pinged while the NAT mapping towards it is alive.
+        """
+        peer = self.overlays[1].my_peer
+        peer.last_response = time.time()
+        self.overlays[0].network.add_verified_peer(peer)
+        self.overlays[0].punctures.punctured((self.overlays[0].my_estimated_lan, peer.address))
+        sniffer = MockEndpointListener(self.overlays[1].endpoint)
+
+        self.strategies[0].take_step()
+
+        yield self.deliver_messages()
+
+        self.assertEqual(len(sniffer.received_packets), 0)
+
+    def test_ping_interval_from_rtt(self):
+        """
+        Check if the time between pings follows the round-trip time of a node, within bounds.
+        """
+        strategy = RandomChurn(self.overlays[0], ping_interval=10.0, min_ping_interval=2.0)
+        peer = Peer(ECCrypto().generate_key(u"very-low"), ("1.2.3.4", 5))
+
+        self.assertEqual(10.0, strategy.get_ping_interval(peer))
+        peer.update_rtt(1.0)
+        self.assertAlmostEqual(3.0, strategy.get_ping_interval(peer))
+        fast_peer = Peer(ECCrypto().generate_key(u"very-low"), ("1.2.3.4", 6))
+        fast_peer.update_rtt(0.01)
+        self.assertAlmostEqual(2.0, strategy.get_ping_interval(fast_peer))
+
     @twisted_wrapper
     def test_remove_unreachable(self):
         """
@@ -125,3 +201,40 @@ class TestChurn(TestBase):
         yield self.deliver_messages()
 
         self.assertEqual(len(sniffer.received_packets), 2)
+
+    @twisted_wrapper
+    def test_only_due(self):
+        """
+        Only ping the peers which have become inactive, no matter how many active peers there are.
+        """
+        for _ in range(20):
+            self.overlays[0].network.add_verified_peer(Peer(ECCrypto().generate_key(u"very-low"),
+                                                            ("1.2.3.4", 5), False))
+        peer = self.overlays[1].my_peer
+        peer.last_response = time.time() - 30
+        self.overlays[0].network.add_verified_peer(peer)
+        self.strategies[0].sample_size = 1
+        # Hook up listener
+        sniffer = MockEndpointListener(self.overlays[1].endpoint)
+
+        # The inactive node is due first, even if we check only one node
+        self.strategies[0].take_step()
+
+        yield self.deliver_messages()
+
+        self.assertEqual(len(sniffer.received_packets), 1)
+
+    def test_forget_removed(self):
+        """
+        Peers which have been removed from the network should no longer be checked.
+        """
+        peer = self.overlays[1].my_peer
+        peer.last_response = time.time() - 30
+        self.overlays[0].network.add_verified_peer(peer)
+        self.strategies[0].take_step()
+
+        self.overlays[0].network.remove_peer(peer)
+        self.strategies[0].take_step()
+
+        self.assertDictEqual({}, self.strategies[0]._pinged)
+        self.assertListEqual([], self.strategies[0]._deadlines)
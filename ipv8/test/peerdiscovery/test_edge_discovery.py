@@ -128,3 +128,31 @@ class TestEdgeWalk(TestBase):
 
         self.assertEqual(len(self.overlays[0].network.verified_peers), 2)
         self.assertEqual(len(self.strategies[0].complete_edges), 1)
+
+    def test_introduced_peer(self):
+        """
+        Check if verified peers introduced by the end of an edge are collected without polling.
+        """
+        root = self.overlays[1].my_peer
+        self.overlays[0].network.add_verified_peer(root)
+        self.strategies[0].await_introductions(root)
+
+        self.overlays[0].network.discover_address(root, self.overlays[2].endpoint.wan_address)
+        self.overlays[0].network.add_verified_peer(self.overlays[2].my_peer)
+
+        self.assertListEqual([self.overlays[2].my_peer], self.strategies[0]._introduced[root.mid])
+
+    def test_unload(self):
+        """
+        Check if an unloaded strategy no longer collects the introductions of the (shared) Network.
+        """
+        root = self.overlays[1].my_peer
+        self.overlays[0].network.add_verified_peer(root)
+        self.strategies[0].await_introductions(root)
+        self.strategies[0].unload()
+
+        self.overlays[0].network.discover_address(root, self.overlays[2].endpoint.wan_address)
+        self.overlays[0].network.add_verified_peer(self.overlays[2].my_peer)
+
+        self.assertDictEqual({}, self.strategies[0]._introduced)
+        self.assertNotIn(self.strategies[0], self.overlays[0].network._observers)
@@ -0,0 +1,88 @@
+import unittest
+
+from ...keyvault.crypto import ECCrypto
+from ...peer import Peer
+from ...peerdiscovery.latency import lowest_latency, PendingRequests
+
+
+class TestPendingRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = PendingRequests(max_size=2, max_age=10.0)
+
+    def test_match(self):
+        """
+        Check if a response is matched to its request.
+        """
+        self.requests.add(("1.2.3.4", 5), 42, 100.0)
+
+        self.assertAlmostEqual(0.5, self.requests.pop(("1.2.3.4", 5), 42, 100.5))
+        self.assertEqual(0, len(self.requests))
+
+    def test_no_match(self):
+        """
+        Check if responses from other addresses or with other identifiers are not matched.
+        """
+        self.requests.add(("1.2.3.4", 5), 42, 100.0)
+
+        self.assertIsNone(self.requests.pop(("1.2.3.4", 6), 42, 100.5))
+        self.assertIsNone(self.requests.pop(("1.2.3.4", 5), 43, 100.5))
+
+    def test_match_once(self):
+        """
+        Check if a duplicate response is not matched.
+        """
+        self.requests.add(("1.2.3.4", 5), 42, 100.0)
+        self.requests.pop(("1.2.3.4", 5), 42, 100.5)
+
+        self.assertIsNone(self.requests.pop(("1.2.3.4", 5), 42, 100.6))
+
+    def test_expired(self):
+        """
+        Check if late responses are not measured.
+        """
+        self.requests.add(("1.2.3.4", 5), 42, 100.0)
+
+        self.assertIsNone(self.requests.pop(("1.2.3.4", 5), 42, 111.0))
+
+    def test_max_size(self):
+        """
+        Check if the oldest requests are forgotten when there are too many.
+        """
+        for identifier in range(3):
+            self.requests.add(("1.2.3.4", 5), identifier, 100.0)
+
+        self.assertEqual(2, len(self.requests))
+        self.assertIsNone(self.requests.pop(("1.2.3.4", 5), 0, 100.5))
+        self.assertIsNotNone(self.requests.pop(("1.2.3.4", 5), 2, 100.5))
+
+
+class TestLowestLatency(unittest.TestCase):
+
+    def setUp(self):
+        self.peers = [Peer(ECCrypto().generate_key(u"very-low"), ("1.2.3.4", i)) for i in range(3)]
+
+    def test_empty(self):
+        """
+        Check if no peer is chosen out of no peers.
+        """
+        self.assertIsNone(lowest_latency([]))
+        self.assertIsNone(lowest_latency([None]))
+
+    def test_lowest(self):
+        """
+        Check if the peer with the lowest round-trip time is chosen.
+        """
+        self.peers[0].update_rtt(0.5)
+        self.peers[1].update_rtt(0.1)
+
+        self.assertIs(self.peers[1], lowest_latency(self.peers))
+
+    def test_unmeasured_last(self):
+        """
+        Check if peers without round-trip time measurements are only chosen if no peer has been measured.
+        """
+        self.peers[2].update_rtt(5.0)
+
+        self.assertIs(self.peers[2], lowest_latency(self.peers))
+        self.assertIs(self.peers[0], lowest_latency(self.peers[:2]))
@@ -0,0 +1,101 @@
+from ...deprecated.community import _DEFAULT_ADDRESSES
+from ...peerdiscovery.discovery import PeerLookup
+from ..base import TestBase
+from ..mocking.community import MockCommunity
+from ..mocking.endpoint import MockEndpointListener
+from ..util import twisted_wrapper
+
+
+class TestPeerLookup(TestBase):
+
+    def setUp(self):
+        while _DEFAULT_ADDRESSES:
+            _DEFAULT_ADDRESSES.pop()
+
+        node_count = 4
+        self.overlays = [MockCommunity() for _ in range(node_count)]
+        self.strategy = PeerLookup(self.overlays[0])
+
+    def tearDown(self):
+        for overlay in self.overlays:
+            overlay.unload()
+
+    def _connect(self, i, j):
+        self.overlays[i].network.add_verified_peer(self.overlays[j].my_peer)
+        self.overlays[i].network.discover_services(self.overlays[j].my_peer, [self.overlays[j].master_peer.mid, ])
+
+    @twisted_wrapper
+    def test_lookup(self):
+        """
+        Check if we can find a peer we only know through other peers.
+
+        Unit test network layout:
+          NODE0 -> NODE1 -> NODE2 -> NODE3
+        """
+        self._connect(0, 1)
+        self._connect(1, 2)
+        self._connect(2, 3)
+        found = []
+        self.strategy.lookup(self.overlays[3].my_peer.mid).addCallback(found.append)
+
+        for _ in range(4):
+            self.strategy.take_step()
+            yield self.deliver_messages()
+
+        self.assertEqual(1, len(found))
+        self.assertEqual(self.overlays[3].my_peer.mid, found[0].mid)
+        self.assertDictEqual({}, self.strategy.lookups)
+
+    @twisted_wrapper
+    def test_lookup_unknown(self):
+        """
+        Check if a lookup of a peer nobody knows ends without a peer.
+        """
+        self._connect(0, 1)
+        self._connect(1, 2)
+        found = []
+        self.strategy.lookup(self.overlays[3].my_peer.mid).addCallback(found.append)
+
+        for _ in range(4):
+            self.strategy.take_step()
+            yield self.deliver_messages()
+
+        self.assertListEqual([None], found)
+
+    @twisted_wrapper
+    def test_find_rate_limit(self):
+        """
+        Check if the find requests of a single address are only answered up to the find response rate.
+        """
+        self._connect(1, 2)
+        sniffer = MockEndpointListener(self.overlays[0].endpoint)
+        self.overlays[1].find_response_rate = 2.0
+
+        for _ in range(5):
+            self.overlays[0].endpoint.send(self.overlays[1].endpoint.wan_address,
+                                           self.overlays[0].create_find_request(self.overlays[3].my_peer.mid))
+        yield self.deliver_messages()
+
+        self.assertEqual(2, len([data for _, data in sniffer.received_packets if data[22] == chr(6)]))
+
+    def test_find_rate_refill(self):
+        """
+        Check if an address may send find requests again after a while.
+        """
+        address = self.overlays[0].endpoint.wan_address
+        self.overlays[1].find_response_rate = 1.0
+
+        self.assertTrue(self.overlays[1]._take_find_token(address, 0.0))
+        self.assertFalse(self.overlays[1]._take_find_token(address, 0.5))
+        self.assertTrue(self.overlays[1]._take_find_token(address, 1.0))
+
+    def test_lookup_known(self):
+        """
+        Check if looking up a verified peer finishes immediately.
+        """
+        self._connect(0, 1)
+        found = []
+        self.strategy.lookup(self.overlays[1].my_peer.mid).addCallback(found.append)
+
+        self.assertEqual(self.overlays[1].my_peer.mid, found[0].mid)
+        self.assertDictEqual({}, self.strategy.lookups)
@@ -1,10 +1,11 @@
 from base64 import b64encode
 import random
+from threading import Thread
 import unittest
 
 from ...keyvault.crypto import ECCrypto
 from ...peer import Peer
-from ...peerdiscovery.network import Network
+from ...peerdiscovery.network import Network, NetworkObserver
 
 
 def _generate_peer():
@@ -34,7 +35,6 @@ class TestNetwork(unittest.TestCase):
         self.assertIn(self.peers[0], self.network.verified_peers)
         self.assertNotIn(self.peers[1], self.network.verified_peers)
         self.assertIn(self.peers[1].address, self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_edge(b64encode(self.peers[0].mid), self.peers[1].address))
 
     def test_discover_address_duplicate(self):
         """
@@ -48,7 +48,6 @@ class TestNetwork(unittest.TestCase):
         self.assertIn(self.peers[0], self.network.verified_peers)
         self.assertNotIn(self.peers[1], self.network.verified_peers)
         self.assertIn(self.peers[1].address, self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_edge(b64encode(self.peers[0].mid), self.peers[1].address))
 
     def test_discover_address_known(self):
         """
@@ -64,7 +63,6 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[1], self.network.verified_peers)
         self.assertIn(self.peers[2], self.network.verified_peers)
         self.assertIn(self.peers[1].address, self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_edge(b64encode(self.peers[0].mid), self.peers[1].address))
 
     def test_discover_address_known_parent_deceased(self):
         """
@@ -79,13 +77,12 @@ class TestNetwork(unittest.TestCase):
         self.assertIn(self.peers[2], self.network.verified_peers)
         self.assertNotIn(self.peers[1], self.network.verified_peers)
         self.assertIn(self.peers[1].address, self.network.get_introductions_from(self.peers[2]))
-        self.assertTrue(self.network.graph.has_edge(b64encode(self.peers[2].mid), self.peers[1].address))
 
     def test_discover_address_blacklist(self):
         """
         Check if an address is in the blacklist, the network isn't updated.
         """
-        self.network.blacklist.append(self.peers[2].address)
+        self.network.blacklist.add(self.peers[2].address)
         self.network.discover_address(self.peers[0], self.peers[1].address)
         self.network.discover_address(self.peers[0], self.peers[2].address)
 
@@ -96,7 +93,6 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[1], self.network.verified_peers)
         self.assertNotIn(self.peers[2], self.network.verified_peers)
         self.assertIn(self.peers[1].address, self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_edge(b64encode(self.peers[0].mid), self.peers[1].address))
 
     def test_discover_address_multiple(self):
         """
@@ -112,7 +108,6 @@ class TestNetwork(unittest.TestCase):
             self.assertIn(self.peers[other].address, self.network.get_walkable_addresses())
             self.assertNotIn(self.peers[other], self.network.verified_peers)
             self.assertIn(self.peers[other].address, self.network.get_introductions_from(self.peers[0]))
-            self.assertTrue(self.network.graph.has_edge(b64encode(self.peers[0].mid), self.peers[other].address))
 
     def test_discover_services(self):
         """
@@ -167,6 +162,89 @@ class TestNetwork(unittest.TestCase):
         self.assertIn(self.peers[0], self.network.get_peers_for_service(service1))
         self.assertIn(self.peers[0], self.network.get_peers_for_service(service2))
 
+    def test_discover_services_shared(self):
+        """
+        Check if peers with the same services share their interned services.
+        """
+        self.network.discover_services(self.peers[0], ["a", "b"])
+        self.network.discover_services(self.peers[1], ["b", "a"])
+
+        self.assertIs(self.network.get_services_for_peer(self.peers[0]),
+                      self.network.get_services_for_peer(self.peers[1]))
+        self.assertEqual(2, len(self.network._services))
+
+    def test_discover_services_release(self):
+        """
+        Check if the interned services of removed peers are reused.
+        """
+        self.network.add_verified_peer(self.peers[0])
+        self.network.add_verified_peer(self.peers[1])
+        self.network.discover_services(self.peers[0], ["a", "b"])
+        self.network.discover_services(self.peers[1], ["b"])
+        self.network.remove_peer(self.peers[0])
+        self.network.discover_services(self.peers[1], ["c"])
+
+        self.assertSetEqual({"b", "c"}, self.network.get_services_for_peer(self.peers[1]))
+        self.assertEqual(2, len(self.network._services))
+        self.assertNotIn("a", self.network._service_indices)
+        self.assertEqual(1, len(self.network._service_sets))
+
+    def test_service_version(self):
+        """
+        Check if the version of our services only depends on the registered services.
+        """
+        other = Network()
+        version = self.network.service_version
+
+        self.network.register_service_provider("a", None)
+        self.network.register_service_provider("b", None)
+        other.register_service_provider("b", None)
+        other.register_service_provider("a", None)
+
+        self.assertNotEqual(version, self.network.service_version)
+        self.assertEqual(other.service_version, self.network.service_version)
+
+    def test_discover_service_version(self):
+        """
+        Check if the version of the services of a peer is stored, until the peer is removed.
+        """
+        self.network.add_verified_peer(self.peers[0])
+        self.network.discover_services(self.peers[0], ["a"], 42)
+
+        self.assertEqual(42, self.network.get_service_version(self.peers[0]))
+        self.network.discover_services(self.peers[0], ["a"])
+        self.assertEqual(42, self.network.get_service_version(self.peers[0]))
+        self.network.remove_peer(self.peers[0])
+        self.assertIsNone(self.network.get_service_version(self.peers[0]))
+
+    def test_get_peers_for_service_removed(self):
+        """
+        Check if removed peers are no longer returned for their services.
+        """
+        service = "".join([chr(i) for i in range(20)])
+        self.network.add_verified_peer(self.peers[0])
+        self.network.add_verified_peer(self.peers[1])
+        self.network.discover_services(self.peers[0], [service])
+        self.network.discover_services(self.peers[1], [service])
+        self.network.remove_peer(self.peers[0])
+        self.network.remove_by_address(self.peers[1].address)
+
+        self.assertListEqual([], self.network.get_peers_for_service(service))
+
+    def test_get_peers_for_service_address_update(self):
+        """
+        Check if a peer is still returned for its services after its address has changed.
+        """
+        service = "".join([chr(i) for i in range(20)])
+        old_address = self.peers[0].address
+        self.network.add_verified_peer(self.peers[0])
+        self.network.discover_services(self.peers[0], [service])
+        self.network.add_verified_peer(Peer(self.peers[0].key, ("1.2.3.4", 5)))
+
+        self.assertEqual(1, len(self.network.get_peers_for_service(service)))
+        self.assertEqual(("1.2.3.4", 5), self.network.get_peers_for_service(service)[0].address)
+        self.peers[0].address = old_address
+
     def test_add_verified_peer_new(self):
         """
         Check if a new verified peer can be added to the network.
@@ -176,18 +254,16 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
         self.assertIn(self.peers[0], self.network.verified_peers)
         self.assertListEqual([], self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_node(b64encode(self.peers[0].mid)))
 
     def test_add_verified_peer_blacklist(self):
         """
         Check if a new verified peer can be added to the network.
         """
-        self.network.blacklist.append(self.peers[0].address)
+        self.network.blacklist.add(self.peers[0].address)
         self.network.add_verified_peer(self.peers[0])
 
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
         self.assertNotIn(self.peers[0], self.network.verified_peers)
-        self.assertFalse(self.network.graph.has_node(b64encode(self.peers[0].mid)))
 
     def test_add_verified_peer_duplicate(self):
         """
@@ -200,7 +276,6 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
         self.assertIn(self.peers[0], self.network.verified_peers)
         self.assertListEqual([], self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_node(b64encode(self.peers[0].mid)))
 
     def test_add_verified_peer_promote(self):
         """
@@ -212,8 +287,6 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
         self.assertIn(self.peers[0], self.network.verified_peers)
         self.assertListEqual([], self.network.get_introductions_from(self.peers[0]))
-        self.assertTrue(self.network.graph.has_node(b64encode(self.peers[0].mid)))
-        self.assertFalse(self.network.graph.has_node(self.peers[0].address))
 
     def test_get_verified_by_address(self):
         """
@@ -232,6 +305,51 @@ class TestNetwork(unittest.TestCase):
         self.assertEqual(self.peers[0],
                          self.network.get_verified_by_public_key_bin(self.peers[0].public_key.key_to_bin()))
 
+    def test_get_verified_by_mid(self):
+        """
+        Check if we can find a peer in our network by its mid.
+        """
+        self.network.add_verified_peer(self.peers[0])
+
+        self.assertEqual(self.peers[0], self.network.get_verified_by_mid(self.peers[0].mid))
+        self.assertIsNone(self.network.get_verified_by_mid(self.peers[1].mid))
+
+    def test_get_verified_by_address_updated(self):
+        """
+        Check if we can find a peer in our network by its address, after its address has changed.
+        """
+        old_address = self.peers[0].address
+        self.network.add_verified_peer(self.peers[0])
+        self.network.add_verified_peer(Peer(self.peers[0].key, ("1.2.3.4", 5)))
+
+        self.assertEqual(("1.2.3.4", 5), self.network.get_verified_by_address(("1.2.3.4", 5)).address)
+        self.assertIsNone(self.network.get_verified_by_address(old_address))
+        self.peers[0].address = old_address
+
+    def test_remove_by_address_shared(self):
+        """
+        Check if all peers sharing the same address are removed by address.
+        """
+        other = Peer(ECCrypto().generate_key(u'very-low'), self.peers[0].address)
+        self.network.add_verified_peer(self.peers[0])
+        self.network.add_verified_peer(other)
+        self.network.remove_by_address(self.peers[0].address)
+
+        self.assertListEqual([], self.network.verified_peers)
+        self.assertIsNone(self.network.get_verified_by_address(self.peers[0].address))
+        self.assertIsNone(self.network.get_verified_by_public_key_bin(other.public_key.key_to_bin()))
+
+    def test_remove_peer_indexes(self):
+        """
+        Check if a removed peer can no longer be found by its address, mid or public key.
+        """
+        self.network.add_verified_peer(self.peers[0])
+        self.network.remove_peer(self.peers[0])
+
+        self.assertIsNone(self.network.get_verified_by_address(self.peers[0].address))
+        self.assertIsNone(self.network.get_verified_by_mid(self.peers[0].mid))
+        self.assertIsNone(self.network.get_verified_by_public_key_bin(self.peers[0].public_key.key_to_bin()))
+
     def test_remove_by_address(self):
         """
         Check if we can remove a peer from our network by its address.
@@ -243,7 +361,6 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[0], self.network.verified_peers)
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
         self.assertEqual(set(), self.network.get_services_for_peer(self.peers[0]))
-        self.assertFalse(self.network.graph.has_node(b64encode(self.peers[0].mid)))
 
     def test_remove_by_address_unverified(self):
         """
@@ -253,7 +370,6 @@ class TestNetwork(unittest.TestCase):
         self.network.remove_by_address(self.peers[1].address)
 
         self.assertNotIn(self.peers[1].address, self.network.get_walkable_addresses())
-        self.assertFalse(self.network.graph.has_node(self.peers[1].address))
 
     def test_remove_by_address_unknown(self):
         """
@@ -278,7 +394,6 @@ class TestNetwork(unittest.TestCase):
 
         self.assertNotIn(self.peers[0], self.network.verified_peers)
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
-        self.assertFalse(self.network.graph.has_node(b64encode(self.peers[0].mid)))
 
     def test_remove_peer(self):
         """
@@ -291,7 +406,6 @@ class TestNetwork(unittest.TestCase):
         self.assertNotIn(self.peers[0], self.network.verified_peers)
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
         self.assertEqual(set(), self.network.get_services_for_peer(self.peers[0]))
-        self.assertFalse(self.network.graph.has_node(b64encode(self.peers[0].mid)))
 
     def test_remove_peer_external(self):
         """
@@ -301,8 +415,6 @@ class TestNetwork(unittest.TestCase):
         self.network.remove_peer(self.peers[0])
 
         self.assertNotIn(self.peers[0].address, self.network.get_walkable_addresses())
-        self.assertFalse(self.network.graph.has_node(b64encode(self.peers[0].mid)))
-        self.assertFalse(self.network.graph.has_node(self.peers[0].address))
 
     def test_remove_peer_unknown(self):
         """
@@ -329,6 +441,148 @@ class TestNetwork(unittest.TestCase):
 
         self.assertEqual([self.peers[1].address], self.network.get_walkable_addresses(service))
 
+    def test_get_introductions_from_removed(self):
+        """
+        Check if an address is no longer an introduction of its parent, once it is removed.
+        """
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.remove_by_address(self.peers[1].address)
+
+        self.assertListEqual([], self.network.get_introductions_from(self.peers[0]))
+
+    def test_export_graph(self):
+        """
+        Check if the known peers and introductions can be exported as a graph.
+        """
+        try:
+            import networkx
+        except ImportError:
+            return
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.discover_address(self.peers[0], self.peers[2].address)
+        self.network.add_verified_peer(self.peers[2])
+        graph = self.network.export_graph()
+
+        self.assertTrue(graph.has_edge(b64encode(self.peers[0].mid), self.peers[1].address))
+        self.assertTrue(graph.has_edge(b64encode(self.peers[0].mid), b64encode(self.peers[2].mid)))
+        self.assertFalse(graph.has_node(self.peers[2].address))
+
+    def test_get_walkable_by_service_late(self):
+        """
+        Check if walkable addresses are updated when the services of their parent are discovered later.
+        """
+        service = "".join([chr(i) for i in range(20)])
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+
+        self.assertListEqual([], self.network.get_walkable_addresses(service))
+
+        self.network.discover_services(self.peers[0], [service])
+
+        self.assertListEqual([self.peers[1].address], self.network.get_walkable_addresses(service))
+
+    def test_get_walkable_by_service_verified(self):
+        """
+        Check if walkable addresses by service are no longer walkable once verified.
+        """
+        service = "".join([chr(i) for i in range(20)])
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.discover_services(self.peers[0], [service])
+        self.network.add_verified_peer(self.peers[1])
+
+        self.assertListEqual([], self.network.get_walkable_addresses(service))
+        self.assertListEqual([], self.network.get_walkable_addresses())
+
+    def test_get_walkable_by_service_parent_removed(self):
+        """
+        Check if walkable addresses are no longer walkable by service once the services of their parent are removed.
+        """
+        service = "".join([chr(i) for i in range(20)])
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.discover_services(self.peers[0], [service])
+        self.network.remove_peer(self.peers[0])
+
+        self.assertListEqual([], self.network.get_walkable_addresses(service))
+        self.assertListEqual([self.peers[1].address], self.network.get_walkable_addresses())
+
+    def test_walkable_consistency(self):
+        """
+        Check if the walkable addresses stay consistent with the known and verified addresses.
+        """
+        service = "".join([chr(i) for i in range(20)])
+        peers = [_generate_peer() for _ in range(8)]
+        rng = random.Random(42)
+        for _ in range(200):
+            action = rng.randint(0, 4)
+            peer, other = rng.choice(peers), rng.choice(peers)
+            if action == 0:
+                self.network.discover_address(peer, other.address)
+            elif action == 1:
+                self.network.add_verified_peer(peer)
+            elif action == 2:
+                self.network.discover_services(peer, [service])
+            elif action == 3:
+                self.network.remove_peer(peer)
+            else:
+                self.network.remove_by_address(peer.address)
+
+            verified = {p.address for p in self.network.verified_peers}
+            expected = set(self.network._all_addresses.keys()) - verified
+            service_mids = {p.mid for p in peers if service in self.network.get_services_for_peer(p)}
+            expected_service = {a for a in expected if self.network._all_addresses[a] in service_mids}
+
+            self.assertSetEqual(expected, set(self.network.get_walkable_addresses()))
+            self.assertSetEqual(expected_service, set(self.network.get_walkable_addresses(service)))
+            self.assertSetEqual(expected, set(self.network._unverified_order))
+
+    def test_read_snapshot_invalidated(self):
+        """
+        Check if the cached query results are invalidated when the Network changes.
+        """
+        self.network.discover_services(self.peers[0], ["0"])
+        self.network.add_verified_peer(self.peers[0])
+
+        self.assertListEqual([self.peers[0]], self.network.get_peers_for_service("0"))
+        self.assertListEqual([], self.network.get_walkable_addresses())
+
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.remove_peer(self.peers[0])
+
+        self.assertListEqual([], self.network.get_peers_for_service("0"))
+        self.assertListEqual([self.peers[1].address], self.network.get_walkable_addresses())
+
+    def test_read_snapshot_copy(self):
+        """
+        Check if modifying a query result does not modify the cached query result.
+        """
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+
+        self.network.get_walkable_addresses().append(self.peers[2].address)
+
+        self.assertListEqual([self.peers[1].address], self.network.get_walkable_addresses())
+
+    def test_read_while_writing(self):
+        """
+        Check if cached query results can be read while the Network is being written to.
+        """
+        self.network.discover_services(self.peers[0], ["0"])
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.get_peers_for_service("0")
+        self.network.get_walkable_addresses("0")
+        results = []
+
+        def read():
+            results.append(self.network.get_peers_for_service("0"))
+            results.append(self.network.get_walkable_addresses("0"))
+            results.append(self.network.get_verified_by_address(self.peers[0].address))
+            results.append(self.network.get_services_for_peer(self.peers[0]))
+
+        with self.network.graph_lock:
+            reader = Thread(target=read)
+            reader.start()
+            reader.join(5.0)
+
+        self.assertListEqual([[self.peers[0]], [self.peers[1].address], self.peers[0], {"0"}], results)
+
     def test_snapshot_only_verified(self):
         """
         Check if a snapshot poperly serializes verified peers.
@@ -353,7 +607,7 @@ class TestNetwork(unittest.TestCase):
         """
         Check if a snapshot is empty without verified peers.
         """
-        self.network.blacklist_mids.append(self.peers[0].mid)
+        self.network.blacklist_mids.add(self.peers[0].mid)
         for peer in self.peers[1:]:
             self.network.discover_address(self.peers[0], peer)
         snapshot = self.network.snapshot()
@@ -404,3 +658,171 @@ class TestNetwork(unittest.TestCase):
         peers = set(self.network.get_walkable_addresses())
 
         self.assertSetEqual(peers, set())
+
+    def test_export_peers(self):
+        """
+        Check if verified peers are exported and imported with their key, services, last response and introducer.
+        """
+        self.peers[0].last_response = 1.5
+        self.network.discover_services(self.peers[0], ["a" * 20, "b"])
+        self.network.add_verified_peer(self.peers[0])
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.add_verified_peer(self.peers[1])
+
+        network = Network()
+        imported = network.import_peers(self.network.export_peers())
+
+        self.assertSetEqual({self.peers[0], self.peers[1]}, set(imported))
+        self.assertEqual(1.5, network.get_verified_by_mid(self.peers[0].mid).last_response)
+        self.assertSetEqual({"a" * 20, "b"}, network.get_services_for_peer(self.peers[0]))
+        self.assertListEqual([self.peers[1].address], network.get_introductions_from(self.peers[0]))
+        self.assertListEqual([], network.get_walkable_addresses())
+
+    def test_export_peers_zero_mid(self):
+        """
+        Check if the introducer of an exported peer survives if its mid ends in zero bytes.
+        """
+        introducer = _generate_peer()
+        while introducer.mid[-1] != '\x00':
+            introducer = _generate_peer()
+        self.network.add_verified_peer(introducer)
+        self.network.discover_address(introducer, self.peers[1].address)
+        self.network.add_verified_peer(self.peers[1])
+
+        network = Network()
+        network.import_peers(self.network.export_peers())
+
+        self.assertListEqual([self.peers[1].address], network.get_introductions_from(introducer))
+
+    def test_export_peers_empty(self):
+        """
+        Check if no peers are imported from an empty export.
+        """
+        self.assertListEqual([], Network().import_peers(self.network.export_peers()))
+
+    def test_import_peers_malformed(self):
+        """
+        Check if nothing is imported from a truncated export.
+        """
+        self.network.add_verified_peer(self.peers[0])
+        network = Network()
+
+        self.assertListEqual([], network.import_peers(self.network.export_peers()[:-1]))
+        self.assertListEqual([], network.verified_peers)
+
+    def test_max_addresses(self):
+        """
+        Check if the oldest address is evicted when there are too many addresses.
+        """
+        self.network.max_addresses = 2
+        for peer in self.peers[1:]:
+            self.network.discover_address(self.peers[0], peer.address)
+
+        self.assertSetEqual({self.peers[2].address, self.peers[3].address},
+                            set(self.network.get_walkable_addresses()))
+        self.assertEqual(1, self.network.evicted_addresses)
+
+    def test_max_addresses_stale(self):
+        """
+        Check if addresses of which the introducer is gone are evicted first.
+        """
+        self.network.max_addresses = 2
+        self.network.discover_address(self.peers[0], self.peers[2].address)
+        self.network.discover_address(self.peers[1], self.peers[3].address)
+        self.network.remove_peer(self.peers[1])
+
+        self.network.discover_address(self.peers[0], ("1.2.3.4", 5))
+
+        self.assertSetEqual({self.peers[2].address, ("1.2.3.4", 5)}, set(self.network.get_walkable_addresses()))
+
+    def test_max_verified_peers(self):
+        """
+        Check if a peer which never responded is evicted when there are too many verified peers.
+        """
+        self.network.max_verified_peers = 2
+        self.network.add_verified_peer(Peer(self.peers[0].key, self.peers[0].address))
+        self.network.add_verified_peer(Peer(self.peers[1].key, self.peers[1].address, False))
+        self.network.add_verified_peer(Peer(self.peers[2].key, self.peers[2].address, False))
+
+        self.assertSetEqual({self.peers[1].mid, self.peers[2].mid}, {peer.mid for peer in self.network.verified_peers})
+        self.assertEqual(1, self.network.evicted_peers)
+
+    def test_max_peers_per_service(self):
+        """
+        Check if the least recently responding peer of a service is evicted when it has too many peers.
+        """
+        self.network.max_peers_per_service = 1
+        old = Peer(self.peers[0].key, self.peers[0].address, False)
+        old.last_response -= 10
+        new = Peer(self.peers[1].key, self.peers[1].address, False)
+        self.network.add_verified_peer(old)
+        self.network.discover_services(old, ["0"])
+        self.network.add_verified_peer(new)
+        self.network.discover_services(new, ["0"])
+
+        self.assertListEqual([new], self.network.get_peers_for_service("0"))
+        self.assertListEqual([new], self.network.verified_peers)
+
+    def test_random_walkable_address(self):
+        """
+        Check if a random walkable address is chosen, respecting the exclusions.
+        """
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.discover_address(self.peers[0], self.peers[2].address)
+
+        self.assertEqual(self.peers[2].address,
+                         self.network.get_random_walkable_address(exclude={self.peers[1].address}))
+        self.assertIsNone(self.network.get_random_walkable_address("0"))
+
+    def test_random_peer_for_service(self):
+        """
+        Check if a random peer of a service is chosen, respecting the exclusions.
+        """
+        for peer in self.peers[:2]:
+            self.network.add_verified_peer(peer)
+            self.network.discover_services(peer, ["0"])
+
+        self.assertEqual(self.peers[1], self.network.get_random_peer_for_service("0", (self.peers[0], )))
+        self.assertIsNone(self.network.get_random_peer_for_service("1"))
+
+    def test_observer(self):
+        """
+        Check if observers are notified of added and removed verified peers.
+        """
+        events = []
+
+        class Observer(NetworkObserver):
+
+            def on_peer_added(self, peer):
+                events.append(("added", peer))
+
+            def on_peer_removed(self, peer):
+                events.append(("removed", peer))
+
+        observer = Observer()
+        self.network.add_observer(observer)
+        self.network.add_verified_peer(self.peers[0])
+        self.network.remove_peer(self.peers[0])
+        self.network.remove_observer(observer)
+        self.network.add_verified_peer(self.peers[0])
+
+        self.assertListEqual([("added", self.peers[0]), ("removed", self.peers[0])], events)
+
+    def test_observer_introduced(self):
+        """
+        Check if observers are notified of verified peers using introduced addresses.
+        """
+        introduced = []
+
+        class Observer(NetworkObserver):
+
+            def on_introduced_peer(self, introducer, peer):
+                introduced.append((introducer, peer))
+
+        self.network.add_observer(Observer())
+        self.network.discover_address(self.peers[0], self.peers[1].address)
+        self.network.add_verified_peer(self.peers[1])
+        self.network.add_verified_peer(self.peers[2])
+        self.network.discover_address(self.peers[0], self.peers[2].address)
+
+        self.assertListEqual([(self.peers[0].mid, self.peers[1]), (self.peers[0].mid, self.peers[2])], introduced)
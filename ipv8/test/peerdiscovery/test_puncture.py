@@ -0,0 +1,59 @@
+from ...peerdiscovery.puncture import PunctureCache
+from ..base import TestBase
+
+
+class TestPunctureCache(TestBase):
+
+    def setUp(self):
+        self.cache = PunctureCache(max_size=2, lifetime=30.0, max_lifetime=120.0, margin=5.0)
+        self.pair = (("1.2.3.4", 5), ("5.6.7.8", 9))
+
+    def test_unknown(self):
+        """
+        Check if an unknown mapping is not alive and needs no keep-alive.
+        """
+        self.assertFalse(self.cache.is_alive(self.pair, 0))
+        self.assertIsNone(self.cache.get_keep_alive_time(self.pair))
+
+    def test_punctured(self):
+        """
+        Check if a punctured mapping is alive until just before its lifetime ends.
+        """
+        self.cache.punctured(self.pair, 100)
+
+        self.assertTrue(self.cache.is_alive(self.pair, 124))
+        self.assertFalse(self.cache.is_alive(self.pair, 125))
+        self.assertEqual(125, self.cache.get_keep_alive_time(self.pair))
+
+    def test_observed_lifetime(self):
+        """
+        Check if the lifetime grows to the longest silence the mapping survived, within bounds.
+        """
+        self.cache.punctured(self.pair, 0)
+        self.cache.seen(self.pair, 60)
+        self.assertEqual(115, self.cache.get_keep_alive_time(self.pair))
+
+        self.cache.seen(self.pair, 1060)
+        self.assertEqual(1175, self.cache.get_keep_alive_time(self.pair))
+
+    def test_short_silence(self):
+        """
+        Check if a short silence does not shrink the lifetime.
+        """
+        self.cache.punctured(self.pair, 0)
+        self.cache.seen(self.pair, 10)
+
+        self.assertEqual(35, self.cache.get_keep_alive_time(self.pair))
+
+    def test_bounded(self):
+        """
+        Check if the least recently used pairs are forgotten when the cache is full.
+        """
+        self.cache.punctured(self.pair, 0)
+        self.cache.punctured((("1.2.3.4", 5), ("5.6.7.8", 10)), 0)
+        self.cache.seen(self.pair, 1)
+        self.cache.punctured((("1.2.3.4", 5), ("5.6.7.8", 11)), 0)
+
+        self.assertEqual(2, len(self.cache))
+        self.assertTrue(self.cache.is_alive(self.pair, 1))
+        self.assertIsNone(self.cache.get_keep_alive_time((("1.2.3.4", 5), ("5.6.7.8", 10))))
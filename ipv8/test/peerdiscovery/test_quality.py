@@ -0,0 +1,93 @@
+import unittest
+
+from ...peerdiscovery.quality import AddressScores
+
+
+class TestAddressScores(unittest.TestCase):
+
+    def setUp(self):
+        self.scores = AddressScores(max_size=2, quarantine_failures=2, quarantine_time=10.0,
+                                    max_quarantine_time=25.0, freshness_time=100.0)
+        self.address = ("1.2.3.4", 5)
+
+    def test_unknown(self):
+        """
+        Check if unknown addresses get a neutral score and are not quarantined.
+        """
+        self.assertAlmostEqual(0.25, self.scores.score(self.address, None, 0))
+        self.assertFalse(self.scores.is_quarantined(self.address, 0))
+
+    def test_response_rate(self):
+        """
+        Check if addresses which responded score higher than addresses which failed.
+        """
+        other = ("1.2.3.4", 6)
+        self.scores.record(self.address, None, True, 0)
+        self.scores.record(other, None, False, 0)
+
+        self.assertGreater(self.scores.score(self.address, None, 1000), self.scores.score(other, None, 1000))
+
+    def test_introducer_reputation(self):
+        """
+        Check if addresses introduced by peers which introduce unreachable addresses score lower.
+        """
+        self.scores.record(("1.2.3.4", 6), "a" * 20, False, 0)
+        self.scores.record(("1.2.3.4", 7), "b" * 20, True, 0)
+
+        self.assertLess(self.scores.score(self.address, "a" * 20, 0), self.scores.score(self.address, "b" * 20, 0))
+
+    def test_freshness(self):
+        """
+        Check if addresses which responded recently score higher.
+        """
+        self.scores.record(self.address, None, True, 0)
+
+        self.assertGreater(self.scores.score(self.address, None, 10), self.scores.score(self.address, None, 1000))
+
+    def test_quarantine(self):
+        """
+        Check if addresses are quarantined after consecutive failures, for increasing periods.
+        """
+        self.scores.record(self.address, None, False, 0)
+        self.assertFalse(self.scores.is_quarantined(self.address, 0))
+
+        self.scores.record(self.address, None, False, 0)
+        self.assertTrue(self.scores.is_quarantined(self.address, 9))
+        self.assertFalse(self.scores.is_quarantined(self.address, 11))
+
+        self.scores.record(self.address, None, False, 20)
+        self.assertTrue(self.scores.is_quarantined(self.address, 39))
+        self.assertFalse(self.scores.is_quarantined(self.address, 41))
+
+        self.scores.record(self.address, None, False, 50)
+        self.assertTrue(self.scores.is_quarantined(self.address, 74))
+        self.assertFalse(self.scores.is_quarantined(self.address, 76))
+
+    def test_quarantine_lifted(self):
+        """
+        Check if a response lifts the quarantine of an address.
+        """
+        self.scores.record(self.address, None, False, 0)
+        self.scores.record(self.address, None, False, 0)
+        self.scores.record(self.address, None, True, 1)
+
+        self.assertFalse(self.scores.is_quarantined(self.address, 1))
+
+    def test_choose(self):
+        """
+        Check if quarantined addresses are never chosen.
+        """
+        self.scores.record(self.address, None, False, 0)
+        self.scores.record(self.address, None, False, 0)
+
+        self.assertIsNone(self.scores.choose([(self.address, None)], 1))
+        self.assertEqual(("1.2.3.4", 6), self.scores.choose([(self.address, None), (("1.2.3.4", 6), None)], 1))
+
+    def test_max_size(self):
+        """
+        Check if only the statistics of the most recently walked addresses are kept.
+        """
+        for port in range(3):
+            self.scores.record(("1.2.3.4", port), None, True, 0)
+
+        self.assertEqual(2, len(self.scores))
@@ -111,3 +111,50 @@ class TestRandomWalk(TestBase):
 
         self.assertEqual(len(self.overlays[0].network.get_walkable_addresses()), 1)
         self.assertEqual(len(self.overlays[0].network.verified_peers), 1)
+
+    @twisted_wrapper
+    def test_quarantine_step_into(self):
+        """
+        Check if we don't walk to an introduced node which keeps failing.
+
+        Unit test network layout:
+          NODE0 <-> (NODE1) <-> NODE2
+          NODE0 -> NODE2
+        """
+        self.overlays[0].network.add_verified_peer(self.overlays[1].my_peer)
+        self.overlays[0].network.discover_services(self.overlays[1].my_peer, [self.overlays[1].master_peer.mid, ])
+        self.strategies[0].node_timeout = 0.0
+        address = self.overlays[2].endpoint.wan_address
+        self.overlays[2].endpoint.close()
+
+        # NODE0 fails to reach NODE2 twice, even though NODE1 keeps introducing it
+        for _ in range(2):
+            self.overlays[0].network.discover_address(self.overlays[1].my_peer, address)
+            self.strategies[0].take_step()
+            yield self.deliver_messages()
+            self.strategies[0].take_step()
+            yield self.deliver_messages()
+
+        self.overlays[0].network.discover_address(self.overlays[1].my_peer, address)
+        self.strategies[0].take_step()
+
+        self.assertTrue(self.strategies[0].scores.is_quarantined(address))
+        self.assertNotIn(address, self.strategies[0].intro_timeouts)
+        self.assertNotIn(address, self.overlays[0].network.get_walkable_addresses())
+
+    @twisted_wrapper
+    def test_register_response(self):
+        """
+        Check if a responding node frees its walk slot and is scored.
+        """
+        self.overlays[0].network.add_verified_peer(self.overlays[1].my_peer)
+        self.overlays[0].network.discover_address(self.overlays[1].my_peer, self.overlays[2].endpoint.wan_address)
+        self.overlays[0].network.discover_services(self.overlays[1].my_peer, [self.overlays[1].master_peer.mid, ])
+        self.strategies[0].node_timeout = 100000.0
+
+        self.strategies[0].take_step()
+        yield self.deliver_messages()
+        self.strategies[0].take_step()
+
+        self.assertNotIn(self.overlays[2].endpoint.wan_address, self.strategies[0].intro_timeouts)
+        self.assertEqual(1, len(self.strategies[0].scores))
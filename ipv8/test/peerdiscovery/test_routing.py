@@ -0,0 +1,173 @@
+from ...keyvault.crypto import ECCrypto
+from ...peer import Peer
+from ...peerdiscovery.network import Network
+from ...peerdiscovery.routing import distance, Lookup, RoutingTable
+from ..base import TestBase
+
+
+class TestRoutingTable(TestBase):
+
+    def setUp(self):
+        self.network = Network()
+        self.routing_table = RoutingTable("\x00" * 20, self.network, bucket_size=2)
+
+    def tearDown(self):
+        self.routing_table.unload()
+
+    def _add_peer(self, mid, port):
+        peer = Peer(ECCrypto().generate_key(u"very-low"), ("1.2.3.4", port))
+        peer._mid = mid
+        self.network.add_verified_peer(peer)
+        return peer
+
+    def test_follow_network(self):
+        """
+        Check if the routing table follows the verified peers of the Network.
+        """
+        peer = self._add_peer("\x01" * 20, 1)
+        self.assertEqual(1, len(self.routing_table))
+
+        self.network.remove_peer(peer)
+        self.assertEqual(0, len(self.routing_table))
+
+    def test_existing_peers(self):
+        """
+        Check if the peers which were verified before the routing table was created are added.
+        """
+        self._add_peer("\x01" * 20, 1)
+        routing_table = RoutingTable("\x00" * 20, self.network)
+
+        self.assertEqual(1, len(routing_table))
+        routing_table.unload()
+
+    def test_full_bucket(self):
+        """
+        Check if a full bucket keeps its oldest peers, until one of them is replaced after its removal.
+        """
+        first = self._add_peer("\x80" + "\x00" * 19, 1)
+        self._add_peer("\x81" + "\x00" * 19, 2)
+        third = self._add_peer("\x82" + "\x00" * 19, 3)
+
+        self.assertEqual(2, len(self.routing_table))
+        self.assertNotIn(third, self.routing_table.closest("\x82" + "\x00" * 19))
+
+        self.network.remove_peer(first)
+        self.assertEqual(2, len(self.routing_table))
+        self.assertIn(third, self.routing_table.closest("\x82" + "\x00" * 19))
+
+    def test_closest(self):
+        """
+        Check if the closest peers are ordered by XOR distance to the target.
+        """
+        far = self._add_peer("\x80" + "\x00" * 19, 1)
+        near = self._add_peer("\x00" * 19 + "\x07", 2)
+        middle = self._add_peer("\x00" * 10 + "\x01" + "\x00" * 9, 3)
+
+        self.assertListEqual([near, middle, far], self.routing_table.closest("\x00" * 19 + "\x05", 3))
+        self.assertListEqual([near, middle], self.routing_table.closest("\x00" * 19 + "\x05", 3,
+                                                                        exclude=(("1.2.3.4", 1), )))
+
+    def test_distance(self):
+        """
+        Check if the distance is the XOR of the mids.
+        """
+        self.assertEqual(0, distance("\x05" * 20, "\x05" * 20))
+        self.assertEqual(3, distance("\x00" * 19 + "\x05", "\x00" * 19 + "\x06"))
+
+
+class TestLookup(TestBase):
+
+    def setUp(self):
+        self.lookup = Lookup("\x00" * 20, bucket_size=3, alpha=2, timeout=3.0)
+        self.candidates = [("\x00" * 19 + chr(i), ("1.2.3.4", i)) for i in range(1, 6)]
+
+    def test_alpha(self):
+        """
+        Check if at most alpha queries are outstanding, closest nodes first.
+        """
+        self.lookup.add_nodes(self.candidates)
+
+        self.assertListEqual(self.candidates[:2], self.lookup.next_queries(0))
+        self.assertListEqual([], self.lookup.next_queries(1))
+
+    def test_response(self):
+        """
+        Check if a response frees its query and adds closer nodes.
+        """
+        self.lookup.add_nodes(self.candidates[2:])
+        first, second = self.lookup.next_queries(0)
+
+        self.lookup.add_nodes(self.candidates[:2], *first)
+
+        self.assertListEqual(self.candidates[:1], self.lookup.next_queries(1))
+
+    def test_timeout(self):
+        """
+        Check if a query which timed out frees its slot.
+        """
+        self.lookup.add_nodes(self.candidates)
+        self.lookup.next_queries(0)
+
+        self.assertListEqual(self.candidates[2:3], self.lookup.next_queries(4))
+
+    def test_exhausted(self):
+        """
+        Check if a lookup is exhausted once the closest nodes have been queried and answered.
+        """
+        self.lookup.add_nodes(self.candidates)
+        self.assertFalse(self.lookup.exhausted)
+
+        queried = self.lookup.next_queries(0) + self.lookup.next_queries(4)
+        self.assertFalse(self.lookup.exhausted)
+        for mid, address in queried:
+            self.lookup.add_nodes([], mid, address)
+
+        self.assertTrue(self.lookup.exhausted)
+        self.assertEqual(3, self.lookup.queries)
+
+    def test_target_address(self):
+        """
+        Check if the address of the target is remembered, but the target is not queried.
+        """
+        self.lookup.add_nodes([("\x00" * 20, ("1.2.3.4", 0))])
+
+        self.assertEqual(("1.2.3.4", 0), self.lookup.get_address("\x00" * 20))
+        self.assertListEqual([], self.lookup.next_queries(0))
+
+    def test_unsolicited_response(self):
+        """
+        Check if responses of nodes we did not query, or from another address than we queried, are ignored.
+        """
+        self.lookup.add_nodes(self.candidates[2:])
+        first, _ = self.lookup.next_queries(0)
+
+        self.assertFalse(self.lookup.add_nodes([("\x00" * 20, ("6.6.6.6", 6))], self.candidates[4][0],
+                                               self.candidates[4][1]))
+        self.assertFalse(self.lookup.add_nodes([("\x00" * 20, ("6.6.6.6", 6))], first[0], ("6.6.6.6", 6)))
+        self.assertIsNone(self.lookup.get_address("\x00" * 20))
+        self.assertTrue(self.lookup.add_nodes([], *first))
+        self.assertFalse(self.lookup.add_nodes([("\x00" * 20, ("6.6.6.6", 6))], *first))
+
+    def test_closest_reporter(self):
+        """
+        Check if the address reported by the node closest to the target replaces other reported addresses.
+        """
+        self.lookup.add_nodes(self.candidates[2:4])
+        far, close = sorted(self.lookup.next_queries(0), key=lambda item: item[0], reverse=True)
+
+        self.lookup.add_nodes([("\x00" * 20, ("6.6.6.6", 6))], *far)
+        self.lookup.add_nodes([("\x00" * 20, ("1.2.3.4", 0))], *close)
+
+        self.assertEqual(("1.2.3.4", 0), self.lookup.get_address("\x00" * 20))
+
+    def test_farther_reporter(self):
+        """
+        Check if the address reported by a node farther from the target does not replace a reported address.
+        """
+        self.lookup.add_nodes(self.candidates[2:4])
+        far, close = sorted(self.lookup.next_queries(0), key=lambda item: item[0], reverse=True)
+
+        self.lookup.add_nodes([("\x00" * 20, ("1.2.3.4", 0))], *close)
+        self.lookup.add_nodes([("\x00" * 20, ("6.6.6.6", 6))], *far)
+
+        self.assertEqual(("1.2.3.4", 0), self.lookup.get_address("\x00" * 20))
@@ -0,0 +1,87 @@
+import unittest
+
+from ...peerdiscovery.sampling import RandomAccessSet
+
+
+class TestRandomAccessSet(unittest.TestCase):
+
+    def setUp(self):
+        self.set = RandomAccessSet([1, 2, 3])
+
+    def test_add(self):
+        """
+        Check if items are only added once.
+        """
+        self.set.add(4)
+        self.set.add(4)
+
+        self.assertEqual(4, len(self.set))
+        self.assertIn(4, self.set)
+
+    def test_discard(self):
+        """
+        Check if discarded items are removed, while other items remain.
+        """
+        self.set.discard(1)
+        self.set.discard(1)
+
+        self.assertNotIn(1, self.set)
+        self.assertSetEqual({2, 3}, set(self.set))
+
+    def test_remove_missing(self):
+        """
+        Check if removing a missing item raises a KeyError.
+        """
+        self.assertRaises(KeyError, self.set.remove, 4)
+
+    def test_choice(self):
+        """
+        Check if a random item is chosen.
+        """
+        self.assertIn(self.set.choice(), {1, 2, 3})
+
+    def test_choice_exclude(self):
+        """
+        Check if excluded items are never chosen.
+        """
+        for _ in xrange(20):
+            self.assertEqual(2, self.set.choice(exclude={1, 3}))
+
+    def test_choice_all_excluded(self):
+        """
+        Check if nothing is chosen if all items are excluded.
+        """
+        self.assertIsNone(self.set.choice(exclude={1, 2, 3}))
+
+    def test_choice_empty(self):
+        """
+        Check if nothing is chosen from an empty set.
+        """
+        self.assertIsNone(RandomAccessSet().choice())
+
+    def test_sample(self):
+        """
+        Check if a sample of distinct items is drawn.
+        """
+        sample = self.set.sample(2)
+
+        self.assertEqual(2, len(set(sample)))
+        self.assertTrue(set(sample) <= {1, 2, 3})
+
+    def test_sample_all(self):
+        """
+        Check if all items are drawn if the sample is larger than the set.
+        """
+        self.assertSetEqual({1, 2, 3}, set(self.set.sample(10)))
+
+    def test_key(self):
+        """
+        Check if items are identified by their key.
+        """
+        keyed = RandomAccessSet(key=lambda item: item[0])
+        keyed.add((1, "a"))
+        keyed.add((1, "b"))
+
+        self.assertListEqual([(1, "b")], list(keyed))
+        keyed.discard((1, "c"))
+        self.assertEqual(0, len(keyed))
@@ -0,0 +1,111 @@
+import unittest
+
+from ...peerdiscovery.scheduling import WalkScheduler
+
+
+class TestWalkScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = WalkScheduler(1.0)
+        self.strategy = object()
+
+    def test_due_initially(self):
+        """
+        Check if a new strategy is due immediately.
+        """
+        self.assertTrue(self.scheduler.is_due(self.strategy, 0.0))
+
+    def test_starving(self):
+        """
+        Check if a strategy far below its target steps faster than the walker interval.
+        """
+        self.scheduler.schedule(self.strategy, 1, 20, 0.0)
+
+        self.assertTrue(self.scheduler.is_due(self.strategy, 0.25))
+
+    def test_almost_satisfied(self):
+        """
+        Check if a strategy close to its target steps at about the walker interval.
+        """
+        self.scheduler.schedule(self.strategy, 19, 20, 0.0)
+
+        self.assertFalse(self.scheduler.is_due(self.strategy, 0.9))
+        self.assertTrue(self.scheduler.is_due(self.strategy, 0.95))
+
+    def test_satisfied_backoff(self):
+        """
+        Check if a satisfied strategy backs off exponentially, up to the maximum interval.
+        """
+        for _ in range(10):
+            self.scheduler.schedule(self.strategy, 20, 20, 0.0)
+
+        self.assertFalse(self.scheduler.is_due(self.strategy, 15.9))
+        self.assertTrue(self.scheduler.is_due(self.strategy, 16.0))
+
+    def test_empty_backoff(self):
+        """
+        Check if a strategy which keeps finding no peers backs off exponentially, after the backoff time.
+        """
+        self.scheduler.schedule(self.strategy, 0, 20, 0.0)
+        self.assertTrue(self.scheduler.is_due(self.strategy, 0.25))
+
+        self.scheduler.schedule(self.strategy, 0, 20, 90.0)
+        self.assertFalse(self.scheduler.is_due(self.strategy, 90.9))
+        self.assertTrue(self.scheduler.is_due(self.strategy, 91.0))
+
+        self.scheduler.schedule(self.strategy, 0, 20, 91.0)
+        self.assertFalse(self.scheduler.is_due(self.strategy, 92.9))
+        self.assertTrue(self.scheduler.is_due(self.strategy, 93.0))
+
+    def test_empty_reset(self):
+        """
+        Check if finding a peer resets the backoff time of a strategy without peers.
+        """
+        self.scheduler.schedule(self.strategy, 0, 20, 0.0)
+        self.scheduler.schedule(self.strategy, 1, 20, 80.0)
+        self.scheduler.schedule(self.strategy, 0, 20, 100.0)
+
+        self.assertTrue(self.scheduler.is_due(self.strategy, 100.25))
+
+    def test_cold_start(self):
+        """
+        Check if a strategy without peers never steps slower than the walker interval during a cold start.
+        """
+        scheduler = WalkScheduler(0.5)
+        now = 0.0
+        steps = []
+        while now < 60.0:
+            if scheduler.is_due(self.strategy, now):
+                steps.append(now)
+                scheduler.schedule(self.strategy, 0, 20, now)
+            now += scheduler.tick_interval
+
+        self.assertLessEqual(max(b - a for a, b in zip(steps, steps[1:])), 0.5)
+        self.assertGreaterEqual(len(steps), 120)
+
+    def test_always(self):
+        """
+        Check if a strategy without a target steps at the walker interval.
+        """
+        self.scheduler.schedule(self.strategy, 100, -1, 0.0)
+
+        self.assertFalse(self.scheduler.is_due(self.strategy, 0.9))
+        self.assertTrue(self.scheduler.is_due(self.strategy, 1.0))
+
+    def test_rate_limit(self):
+        """
+        Check if the global rate limit caps the number of steps.
+        """
+        scheduler = WalkScheduler(1.0, max_steps_per_second=2)
+        now = scheduler._last_refill
+
+        self.assertListEqual([True, True, False], [scheduler.take_token(now) for _ in range(3)])
+        self.assertTrue(scheduler.take_token(now + 0.5))
+
+    def test_order(self):
+        """
+        Check if every strategy gets to go first in turn.
+        """
+        strategies = [(1, -1), (2, -1)]
+
+        self.assertSetEqual({1, 2}, {self.scheduler.order(strategies)[0][0] for _ in range(2)})
@@ -0,0 +1,181 @@
+from ...deprecated.community import _DEFAULT_ADDRESSES
+from ...keyvault.crypto import ECCrypto
+from ...peerdiscovery.tracker import TrackerEndpointListener, TrackerTable
+from ..base import TestBase
+from ..mocking.community import MockCommunity
+from ..mocking.endpoint import AutoMockEndpoint
+from ..util import twisted_wrapper
+
+
+class TestTrackerTable(TestBase):
+
+    def setUp(self):
+        self.table = TrackerTable(peer_timeout=10.0)
+        self.key = ECCrypto().generate_key(u"very-low").pub()
+        self.key_bin = self.key.key_to_bin()
+
+    def test_update(self):
+        """
+        Check if a peer which contacts us for multiple services is stored once.
+        """
+        self.table.update(("1.2.3.4", 5), self.key_bin, self.key, "a" * 20, 0)
+        self.table.update(("1.2.3.4", 5), self.key_bin, self.key, "b" * 20, 1)
+
+        self.assertEqual(1, len(self.table))
+        self.assertSetEqual({"a" * 20, "b" * 20}, self.table.get(("1.2.3.4", 5)).services)
+        self.assertEqual(1, self.table.get(("1.2.3.4", 5)).last_seen)
+
+    def test_update_new_key(self):
+        """
+        Check if a new identity at a known address replaces the old one, including its services.
+        """
+        other_key = ECCrypto().generate_key(u"very-low").pub()
+        self.table.update(("1.2.3.4", 5), self.key_bin, self.key, "a" * 20, 0)
+        self.table.update(("1.2.3.4", 5), other_key.key_to_bin(), other_key, "b" * 20, 0)
+
+        self.assertEqual(other_key.key_to_bin(), self.table.get(("1.2.3.4", 5)).public_key_bin)
+        self.assertListEqual([], self.table.get_peers_for_service("a" * 20))
+
+    def test_remove(self):
+        """
+        Check if the remaining peers of a service can still be found after a removal.
+        """
+        for port in range(5):
+            self.table.update(("1.2.3.4", port), self.key_bin, self.key, "a" * 20, 0)
+
+        self.table.remove(("1.2.3.4", 0))
+        self.table.remove(("1.2.3.4", 3))
+
+        self.assertSetEqual({("1.2.3.4", 1), ("1.2.3.4", 2), ("1.2.3.4", 4)},
+                            {peer.address for peer in self.table.get_peers_for_service("a" * 20)})
+        self.assertSetEqual({("1.2.3.4", 1), ("1.2.3.4", 2), ("1.2.3.4", 4)},
+                            {peer.address for peer in self.table.sample("a" * 20, 5)})
+
+    def test_expire(self):
+        """
+        Check if peers which did not contact us for a while are forgotten.
+        """
+        self.table.update(("1.2.3.4", 5), self.key_bin, self.key, "a" * 20, 0)
+        self.table.update(("1.2.3.4", 6), self.key_bin, self.key, "a" * 20, 5)
+
+        self.table.expire(12)
+
+        self.assertIsNone(self.table.get(("1.2.3.4", 5)))
+        self.assertListEqual([("1.2.3.4", 6)], [peer.address for peer in self.table.get_peers_for_service("a" * 20)])
+
+    def test_sample_exclude(self):
+        """
+        Check if a sample never contains the excluded peer, while still containing enough peers.
+        """
+        for port in range(3):
+            self.table.update(("1.2.3.4", port), self.key_bin, self.key, "a" * 20, 0)
+
+        for _ in range(20):
+            sampled = [peer.address for peer in self.table.sample("a" * 20, 2, ("1.2.3.4", 0))]
+            self.assertListEqual([("1.2.3.4", 1), ("1.2.3.4", 2)], sorted(sampled))
+
+    def test_sample_unknown_service(self):
+        """
+        Check if sampling a service without peers returns nothing.
+        """
+        self.assertListEqual([], self.table.sample("a" * 20, 1))
+
+
+class TestTrackerEndpointListener(TestBase):
+
+    def setUp(self):
+        while _DEFAULT_ADDRESSES:
+            _DEFAULT_ADDRESSES.pop()
+        endpoint = AutoMockEndpoint()
+        endpoint.open()
+        self.tracker = TrackerEndpointListener(endpoint)
+        _DEFAULT_ADDRESSES.append(endpoint.wan_address)
+
+        self.overlays = [MockCommunity() for _ in range(3)]
+
+    def tearDown(self):
+        self.tracker.unload()
+        for overlay in self.overlays:
+            overlay.unload()
+
+    @twisted_wrapper
+    def test_introduce(self):
+        """
+        Check if the tracker introduces the peers of an overlay to each other.
+        """
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+        self.overlays[1].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        # The introduced peer punctured its NAT towards the second peer
+        self.assertEqual(2, len(self.tracker.table))
+        self.assertIn(self.overlays[0].my_peer.public_key.key_to_bin(),
+                      [peer.public_key.key_to_bin() for peer in self.overlays[1].get_peers()])
+
+    @twisted_wrapper
+    def test_extra_introductions(self):
+        """
+        Check if the tracker introduces a peer to multiple peers at once, if asked to.
+        """
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        self.overlays[1].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+        self.overlays[2].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        self.assertEqual(2, len(self.overlays[2].get_peers()))
+
+    @twisted_wrapper
+    def test_no_service_version(self):
+        """
+        Check if the tracker, which has no services, does not announce a service version with its introductions.
+        """
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        self.overlays[1].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+        self.overlays[2].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        self.assertDictEqual({}, dict(self.overlays[2]._announced_versions))
+
+    @twisted_wrapper
+    def test_invalid_signature(self):
+        """
+        Check if the tracker ignores introduction requests with an invalid signature.
+        """
+        packet = self.overlays[0].create_introduction_request(self.tracker.endpoint.wan_address)
+        packet = packet[:-1] + chr((ord(packet[-1]) + 1) % 256)
+        self.overlays[0].endpoint.send(self.tracker.endpoint.wan_address, packet)
+        yield self.deliver_messages()
+
+        self.assertEqual(0, len(self.tracker.table))
+
+    @twisted_wrapper
+    def test_invalid_signature_known(self):
+        """
+        Check if the tracker ignores forged introduction requests from an address it already knows.
+        """
+        self.overlays[0].walk_to(self.tracker.endpoint.wan_address)
+        yield self.deliver_messages()
+
+        packet = self.overlays[0].create_introduction_request(self.tracker.endpoint.wan_address)
+        packet = packet[:2] + 'X' * 20 + packet[22:-1] + chr((ord(packet[-1]) + 1) % 256)
+        self.overlays[0].endpoint.send(self.tracker.endpoint.wan_address, packet)
+        yield self.deliver_messages()
+
+        self.assertSetEqual({self.overlays[0].master_peer.mid},
+                            self.tracker.table.get(self.overlays[0].endpoint.wan_address).services)
+
+    def test_batch(self):
+        """
+        Check if a full batch is answered immediately.
+        """
+        self.tracker.batch_size = 2
+        packet = self.overlays[0].create_introduction_request(self.tracker.endpoint.wan_address)
+        self.tracker.on_packet((self.overlays[0].endpoint.wan_address, packet))
+        self.assertEqual(0, len(self.tracker.table))
+        self.tracker.on_packet((self.overlays[1].endpoint.wan_address,
+                                self.overlays[1].create_introduction_request(self.tracker.endpoint.wan_address)))
+
+        self.assertEqual(2, len(self.tracker.table))
@@ -71,3 +71,53 @@ class TestPeer(unittest.TestCase):
         Check if the __str__ method functions properly.
         """
         self.assertEqual(str(self.peer), "Peer<1.2.3.4:5, %s>" % self.peer.mid.encode('base64')[:-1])
+
+    def test_mid(self):
+        """
+        Check if the mid of a Peer is the hash of its public key.
+        """
+        self.assertEqual(self.peer.mid, TestPeer.test_key.key_to_hash())
+
+    def test_key_bin(self):
+        """
+        Check if the key bin of a Peer is the serialized public key.
+        """
+        self.assertEqual(self.peer.key_bin, TestPeer.test_key.pub().key_to_bin())
+
+    def test_hash_address_update(self):
+        """
+        Check if the hash of a Peer follows its address.
+        """
+        other = Peer(self.peer.key, ("1.2.3.4", 6))
+
+        other.address = self.peer.address
+
+        self.assertEqual(hash(self.peer), hash(other))
+        self.assertIn(other, {self.peer})
+
+    def test_default_rtt(self):
+        """
+        Check if the round-trip time of a new Peer is unknown and its timeout is the default.
+        """
+        self.assertIsNone(self.peer.srtt)
+        self.assertEqual(3.0, self.peer.get_timeout(3.0))
+
+    def test_first_rtt(self):
+        """
+        Check if the first round-trip time measurement initializes the estimate.
+        """
+        self.peer.update_rtt(0.2)
+
+        self.assertAlmostEqual(0.2, self.peer.srtt)
+        self.assertAlmostEqual(0.1, self.peer.rttvar)
+        self.assertAlmostEqual(0.6, self.peer.get_timeout(3.0))
+
+    def test_smoothed_rtt(self):
+        """
+        Check if later round-trip time measurements are smoothed.
+        """
+        self.peer.update_rtt(0.2)
+        self.peer.update_rtt(1.0)
+
+        self.assertAlmostEqual(0.3, self.peer.srtt)
+        self.assertAlmostEqual(0.275, self.peer.rttvar)
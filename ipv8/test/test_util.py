@@ -1,14 +1,28 @@
+import os
+
 from twisted.internet.defer import fail, inlineCallbacks, returnValue, succeed
 from twisted.internet.task import deferLater
 from twisted.internet.threads import deferToThread
 
 from base import TestBase
-from ..util import blocking_call_on_reactor_thread
+from ..util import atomic_write, blocking_call_on_reactor_thread
 from util import reactor, twisted_wrapper
 
 
 class TestUtil(TestBase):
 
+    def test_atomic_write(self):
+        """
+        Check if an atomic write replaces an existing file, without leaving its temporary file behind.
+        """
+        path = os.path.join(self.temporary_directory(), "data.bin")
+        atomic_write(path, "a" * 10)
+        atomic_write(path, "b" * 5)
+
+        with open(path, 'rb') as f:
+            self.assertEqual("b" * 5, f.read())
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
     @twisted_wrapper
     def test_blocking_call(self):
         """
@@ -1,5 +1,6 @@
 import Queue
 import logging
+import os
 import traceback
 
 from twisted.internet import reactor, defer
@@ -9,6 +10,27 @@ from twisted.python.threadable import isInIOThread
 logger = logging.getLogger(__name__)
 
 
+def atomic_write(path, data):
+    """
+    Replace the contents of a file, without ever leaving a partially written file behind.
+
+    The data is written to a temporary file next to the file first, which then replaces the file.
+
+    :param path: the file path to write to
+    :param data: the data (str) to write
+    :raises IOError, OSError: if the file could not be written
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.name == 'nt' and os.path.isfile(path):
+        # Windows does not allow renaming onto an existing file
+        os.remove(path)
+    os.rename(temporary_path, path)
+
+
 def blocking_call_on_reactor_thread(func):
     def helper(*args, **kargs):
         return blockingCallFromThread(reactor, func, *args, **kargs)
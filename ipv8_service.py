@@ -2,6 +2,7 @@ import logging
 from os.path import isfile
 import sys
 from threading import RLock
+from time import time
 
 from twisted.internet import reactor
 from twisted.internet.defer import DeferredList, inlineCallbacks, maybeDeferred
@@ -14,12 +15,15 @@ from ipv8.keyvault.crypto import ECCrypto
 from ipv8.keyvault.private.m2crypto import M2CryptoSK
 from ipv8.messaging.anonymization.community import TunnelCommunity
 from ipv8.messaging.anonymization.hidden_services import HiddenTunnelCommunity
-from ipv8.messaging.interfaces.udp.endpoint import UDPEndpoint
+from ipv8.messaging.interfaces.udp.endpoint import MultiUDPEndpoint, UDPEndpoint
+from ipv8.messaging.interfaces.unix.endpoint import UnixEndpointServer
 from ipv8.peer import Peer
+from ipv8.peerdiscovery.cache import PeerCache
 from ipv8.peerdiscovery.churn import RandomChurn
 from ipv8.peerdiscovery.deprecated.discovery import DiscoveryCommunity
-from ipv8.peerdiscovery.discovery import EdgeWalk, RandomWalk
+from ipv8.peerdiscovery.discovery import EdgeWalk, PeerLookup, RandomWalk
 from ipv8.peerdiscovery.network import Network
+from ipv8.peerdiscovery.scheduling import WalkScheduler
 
 
 _COMMUNITIES = {
@@ -34,6 +38,7 @@ _COMMUNITIES = {
 
 _WALKERS = {
     'EdgeWalk': EdgeWalk,
+    'PeerLookup': PeerLookup,
     'RandomChurn': RandomChurn,
     'RandomWalk': RandomWalk
 }
@@ -44,11 +49,26 @@ class IPv8(object):
     def __init__(self, configuration, endpoint_override=None):
         if endpoint_override:
             self.endpoint = endpoint_override
+        elif configuration.get('interfaces'):
+            self.endpoint = MultiUDPEndpoint([(interface['address'], interface['port'])
+                                              for interface in configuration['interfaces']])
+            self.endpoint.open()
         else:
             self.endpoint = UDPEndpoint(port=configuration['port'], ip=configuration['address'])
             self.endpoint.open()
 
-        self.network = Network()
+        self.ipc_server = None
+        if configuration.get('ipc_socket'):
+            self.ipc_server = UnixEndpointServer(self.endpoint, configuration['ipc_socket'])
+            self.ipc_server.start()
+
+        self.network = Network(**configuration.get('network', {}))
+
+        self.peer_cache = None
+        if configuration.get('peer_cache'):
+            self.peer_cache = PeerCache(self.network, configuration['peer_cache'])
+            self.peer_cache.load()
+            self.peer_cache.start(configuration.get('peer_cache_interval', 60.0))
 
         # Load/generate keys
         self.keys = {}
@@ -96,21 +116,34 @@ class IPv8(object):
             for config in overlay['on_start']:
                 reactor.callWhenRunning(getattr(overlay_instance, config[0]), *config[1:])
 
+        self.walk_scheduler = WalkScheduler(configuration['walker_interval'],
+                                            configuration.get('max_walks_per_second'))
         self.state_machine_lc = LoopingCall(self.on_tick)
-        self.state_machine_lc.start(configuration['walker_interval'], False)
+        self.state_machine_lc.start(self.walk_scheduler.tick_interval, False)
 
     def on_tick(self):
         if self.endpoint.is_open():
+            now = time()
             with self.overlay_lock:
-                for strategy, target_peers in self.strategies:
+                for strategy, target_peers in self.walk_scheduler.order(self.strategies):
+                    if not self.walk_scheduler.is_due(strategy, now):
+                        continue
                     service = strategy.overlay.master_peer.mid
                     peer_count = len(self.network.get_peers_for_service(service))
                     if (target_peers == -1) or (peer_count < target_peers):
+                        if not self.walk_scheduler.take_token(now):
+                            # Out of walks for now, try again next tick
+                            continue
                         strategy.take_step(service)
+                    self.walk_scheduler.schedule(strategy, peer_count, target_peers, now)
 
     def unload_overlay(self, instance):
         with self.overlay_lock:
             self.overlays = [overlay for overlay in self.overlays if overlay != instance]
+            for strategy, _ in self.strategies:
+                if strategy.overlay == instance:
+                    self.walk_scheduler.remove(strategy)
+                    strategy.unload()
             self.strategies = [(strategy, target_peers) for (strategy, target_peers) in self.strategies
                                if strategy.overlay != instance]
             return maybeDeferred(instance.unload)
@@ -121,6 +154,10 @@ class IPv8(object):
         with self.overlay_lock:
             unload_list = [self.unload_overlay(overlay) for overlay in self.overlays[:]]
             yield DeferredList(unload_list)
+            if self.peer_cache:
+                self.peer_cache.stop()
+            if self.ipc_server:
+                yield self.ipc_server.stop()
             yield self.endpoint.close()
         if stop_reactor:
             reactor.callFromThread(reactor.stop)
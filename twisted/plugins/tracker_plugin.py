@@ -0,0 +1,74 @@
+"""
+This twistd plugin enables to start a dedicated IPv8 bootstrap server (tracker) using the twistd command.
+"""
+
+import os
+import signal
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from twisted.application.service import MultiService, IServiceMaker
+from twisted.internet import reactor
+from twisted.plugin import IPlugin
+from twisted.python import usage
+from twisted.python.log import msg
+from zope.interface import implements
+
+from ipv8.messaging.interfaces.udp.endpoint import UDPEndpoint
+from ipv8.peerdiscovery.tracker import TrackerEndpointListener
+
+
+class Options(usage.Options):
+    optParameters = [["listen_port", "p", 6421, "The UDP port to answer introduction requests on", int],
+                     ["batch_size", "b", 256, "The maximum number of requests to answer at once", int]]
+    optFlags = []
+
+
+class TrackerServiceMaker(object):
+    implements(IServiceMaker, IPlugin)
+    tapname = "ipv8_tracker"
+    description = "IPv8 tracker twistd plugin, starts an IPv8 bootstrap server as a service"
+    options = Options
+
+    def __init__(self):
+        """
+        Initialize the variables of the TrackerServiceMaker.
+        """
+        self.endpoint = None
+        self.tracker = None
+        self._stopping = False
+
+    def start_tracker(self, options):
+        """
+        Main method to startup the tracker.
+        """
+        self.endpoint = UDPEndpoint(options['listen_port'])
+        self.endpoint.open()
+        self.tracker = TrackerEndpointListener(self.endpoint, batch_size=options['batch_size'])
+
+        def signal_handler(sig, _):
+            msg("Received shut down signal %s" % sig)
+            if not self._stopping:
+                self._stopping = True
+                self.tracker.unload()
+                self.endpoint.close()
+                reactor.stop()
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+
+        msg("Starting tracker on port %d" % options['listen_port'])
+
+    def makeService(self, options):
+        """
+        Construct a tracker service.
+        """
+        tracker_service = MultiService()
+        tracker_service.setName("IPv8Tracker")
+
+        reactor.callWhenRunning(self.start_tracker, options)
+
+        return tracker_service
+
+service_maker = TrackerServiceMaker()